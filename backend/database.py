@@ -3,15 +3,26 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 
 import os
 
-# Ensure the data directory exists
-import os
-os.makedirs("backend/data", exist_ok=True)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, "backend", "data", "docsign.db")
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
+DATA_DIR = os.path.join(BASE_DIR, "backend", "data")
+DB_PATH = os.path.join(DATA_DIR, "docsign.db")
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+# Relative to the working directory, like the file paths stored on documents
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+
+# "sync" serves handlers from Starlette's threadpool, "async" from the event loop
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+ASYNC_DB_MODE = DB_MODE == "async"
 
+# Sized to Starlette's 40-thread pool so sync handlers don't queue on connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args=connect_args,
+    pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -23,3 +34,37 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def ensure_directories():
+    """Create the data and upload directories. Called from startup, not at import."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+def get_async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    return url
+
+async_engine = None
+AsyncSessionLocal = None
+
+if ASYNC_DB_MODE:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    # aiosqlite runs on a NullPool and rejects pool sizing
+    pool_args = {} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {
+        "pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW
+    }
+    async_engine = create_async_engine(get_async_url(SQLALCHEMY_DATABASE_URL), **pool_args)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
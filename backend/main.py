@@ -1,23 +1,72 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
-import models
-from routers import auth, documents
+from fastapi.middleware.gzip import GZipMiddleware
+from .database import ensure_directories, UPLOAD_DIR, ASYNC_DB_MODE
+from . import migrations
+from .routers import auth, documents, templates, bulk_send, events
+from .utils.pdf_processor import active_flattens, wait_for_flattens, flatten_stats, check_save_profile
+from .utils.rate_limit import RateLimitMiddleware, RATE_LIMIT_ENABLED, limiter
+from .utils.idempotency import IdempotencyMiddleware
+from sqlalchemy.orm.exc import StaleDataError
 from fastapi.staticfiles import StaticFiles
 import os
+import re
 
-# Create uploads directory
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # optional; plain gzip when brotli isn't installed
+    BrotliMiddleware = None
 
-# Create tables immediately for simplicity in dev
-Base.metadata.create_all(bind=engine)
+# Responses smaller than this aren't worth compressing
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Server-Sent Event streams must reach the client frame by frame, never buffered
+UNCOMPRESSED_PATHS = [r"/events$"]
 
-app = FastAPI(title="DocSign App", version="1.0.0")
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    def __init__(self, app, excluded_handlers: list = (), **kwargs):
+        super().__init__(app, **kwargs)
+        self.excluded_handlers = [re.compile(p) for p in excluded_handlers]
 
-# Mount uploads
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and any(p.search(scope["path"]) for p in self.excluded_handlers):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Give in-flight flattens a chance to finish before the worker exits (SIGTERM drain)
+FLATTEN_DRAIN_TIMEOUT = float(os.getenv("FLATTEN_DRAIN_TIMEOUT", "30"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: nothing touches the disk or the database at import time
+    # A mistyped PDF_SAVE_PROFILE fails the boot, not every flatten after it
+    check_save_profile()
+    ensure_directories()
+    migrations.upgrade()
+    yield
+    # Shutdown
+    pending = active_flattens()
+    if pending:
+        print(f"Waiting for {pending} in-flight flatten(s) before shutdown...")
+        if not await run_in_threadpool(wait_for_flattens, FLATTEN_DRAIN_TIMEOUT):
+            print(f"WARNING: {active_flattens()} flatten(s) still running after {FLATTEN_DRAIN_TIMEOUT}s")
+
+app = FastAPI(title="DocSign App", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Mount uploads (the directory is created during startup)
+app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR, check_dir=False), name="uploads")
+
+# Replay stored responses for retried uploads/sends/signs (Idempotency-Key). Innermost,
+# so replays still count against the rate limits below.
+app.add_middleware(IdempotencyMiddleware)
+
+# Throttle login and public signing links before routing, so a rejected request never
+# opens a DB session or runs bcrypt. Added before CORS so 429s still carry CORS headers.
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
 
 # CORS - Allow frontend access
 app.add_middleware(
@@ -30,8 +79,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # So the frontend can read document versions for If-Match / If-None-Match
+    expose_headers=["ETag", "Idempotent-Replayed"],
 )
 
+# Compress large JSON payloads (brotli when available, gzip fallback for other clients)
+if BrotliMiddleware is not None:
+    app.add_middleware(
+        BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True,
+        excluded_handlers=UNCOMPRESSED_PATHS
+    )
+else:
+    app.add_middleware(
+        StreamAwareGZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE,
+        excluded_handlers=UNCOMPRESSED_PATHS
+    )
+
 # Root endpoints
 @app.get("/")
 async def root():
@@ -41,9 +104,36 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/api/metrics/rate-limits")
+async def rate_limit_metrics():
+    """Allowed/rejected request counts per rate limit policy (this worker only)."""
+    return {"enabled": RATE_LIMIT_ENABLED, "policies": limiter.stats()}
+
+@app.get("/api/metrics/flatten")
+async def flatten_metrics():
+    """Flatten memory budget use and RSS readings (this worker only)."""
+    return flatten_stats()
+
 # Include routers
+# In async mode the async twins are registered first so they win route matching;
+# everything they don't cover falls through to the sync routers below.
+if ASYNC_DB_MODE:
+    from .routers import auth_async, documents_async
+    app.include_router(auth_async.router, include_in_schema=False)
+    app.include_router(documents_async.router, include_in_schema=False)
 app.include_router(auth.router)
+app.include_router(events.router)
 app.include_router(documents.router)
+app.include_router(templates.router)
+app.include_router(bulk_send.router)
+
+# Lost a race with another writer between the If-Match check and commit (utils/etag.py)
+@app.exception_handler(StaleDataError)
+async def stale_document_handler(request: Request, exc: StaleDataError):
+    return JSONResponse(
+        status_code=412,
+        content={"detail": "Document was changed by another request; fetch it again and retry"}
+    )
 
 # Robust error logging
 @app.exception_handler(Exception)
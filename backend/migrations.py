@@ -0,0 +1,193 @@
+"""
+Versioned schema migrations.
+
+Applied automatically during app startup (see the lifespan in main.py) and runnable
+by hand from the project root:
+
+    python -m backend.migrations            # upgrade to the latest version
+    python -m backend.migrations --status   # list applied / pending versions
+
+Each migration runs in its own transaction and is recorded in `schema_migrations`.
+Migrations must tolerate databases created by older `create_all` calls, so column and
+index additions check before they alter. Append new migrations to MIGRATIONS; never
+renumber or edit one that has shipped.
+"""
+import argparse
+import os
+
+from sqlalchemy import inspect, text
+
+from . import models  # noqa: F401  (registers every table on Base.metadata)
+from .database import Base, engine, DATA_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes run a single process, no lock needed
+    fcntl = None
+
+LOCK_PATH = os.path.join(DATA_DIR, ".migrations.lock")
+
+def _columns(conn, table: str) -> set:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+def _add_column(conn, table: str, column: str, ddl_type: str):
+    if column not in _columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
+def _create_tables(conn, *names: str):
+    Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables[n] for n in names])
+
+def m001_baseline(conn):
+    _create_tables(conn, "users", "documents", "signature_fields", "audit_logs")
+
+def m002_legacy_columns(conn):
+    # Columns that early databases predate (formerly migrate_db.py / final_db_fix.py)
+    _add_column(conn, "documents", "signed_file_path", "VARCHAR")
+    _add_column(conn, "documents", "signing_token", "VARCHAR")
+    _add_column(conn, "signature_fields", "signer_email", "VARCHAR")
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_documents_signing_token ON documents (signing_token)"
+    ))
+
+def m003_summary_indexes(conn):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_documents_user_id_status ON documents (user_id, status)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_signature_fields_document_id_status ON signature_fields (document_id, status)"
+    ))
+
+def m004_templates(conn):
+    _create_tables(conn, "templates", "template_fields")
+
+def m005_bulk_send(conn):
+    _create_tables(conn, "bulk_send_jobs", "email_outbox")
+
+def m006_audit_log_index(conn):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_document_id_created_at ON audit_logs (document_id, created_at)"
+    ))
+
+def m007_audit_hash_chain(conn):
+    from .utils.audit_chain import seal_existing
+
+    _add_column(conn, "audit_logs", "seq", "INTEGER")
+    _add_column(conn, "audit_logs", "prev_hash", "VARCHAR(64)")
+    _add_column(conn, "audit_logs", "entry_hash", "VARCHAR(64)")
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_audit_logs_document_id_seq ON audit_logs (document_id, seq)"
+    ))
+    _create_tables(conn, "audit_checkpoints")
+    # Existing history is sealed as of this migration
+    seal_existing(conn)
+
+def m008_document_version(conn):
+    _add_column(conn, "documents", "version", "INTEGER NOT NULL DEFAULT 1")
+
+def m009_idempotency_keys(conn):
+    _create_tables(conn, "idempotency_keys")
+
+def m010_document_search(conn):
+    from .utils.search import ensure_search_index
+    # Existing documents are indexed by `python -m backend.utils.search --reindex`
+    ensure_search_index(conn)
+
+def m011_pdf_validation(conn):
+    # Existing documents stay unvalidated (NULL validated_at) until first use
+    _add_column(conn, "documents", "page_count", "INTEGER")
+    _add_column(conn, "documents", "pdf_encrypted", "BOOLEAN")
+    _add_column(conn, "documents", "pdf_error", "VARCHAR")
+    _add_column(conn, "documents", "validated_at", "TIMESTAMP")
+
+def m012_idempotency_lease(conn):
+    # In-progress rows without a lease count as stale and can be reclaimed
+    _add_column(conn, "idempotency_keys", "locked_until", "TIMESTAMP")
+
+def m013_document_completed_at(conn):
+    _add_column(conn, "documents", "completed_at", "TIMESTAMP")
+    # Documents completed before this: when their last "complete" audit entry was written
+    conn.execute(text(
+        "UPDATE documents SET completed_at = ("
+        "SELECT MAX(audit_logs.created_at) FROM audit_logs "
+        "WHERE audit_logs.document_id = documents.id AND audit_logs.action = 'complete'"
+        ") WHERE status = :completed AND completed_at IS NULL"
+    ), {"completed": models.DocumentStatus.COMPLETED.name})
+
+MIGRATIONS = [
+    (1, "baseline schema", m001_baseline),
+    (2, "legacy document/field columns", m002_legacy_columns),
+    (3, "document summary indexes", m003_summary_indexes),
+    (4, "field templates", m004_templates),
+    (5, "bulk send jobs and email outbox", m005_bulk_send),
+    (6, "audit log pagination index", m006_audit_log_index),
+    (7, "hash-chained audit log", m007_audit_hash_chain),
+    (8, "document version for ETags", m008_document_version),
+    (9, "idempotency keys", m009_idempotency_keys),
+    (10, "document full-text search index", m010_document_search),
+    (11, "cached PDF validation results", m011_pdf_validation),
+    (12, "idempotency claim leases", m012_idempotency_lease),
+    (13, "document completion time", m013_document_completed_at),
+]
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "name VARCHAR NOT NULL, "
+        "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+
+def applied_versions(bind=None) -> set:
+    bind = bind or engine
+    with bind.begin() as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def _upgrade(bind) -> list:
+    done = applied_versions(bind)
+    applied = []
+    for version, name, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with bind.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n)"),
+                {"v": version, "n": name},
+            )
+        applied.append(version)
+        print(f"Applied migration {version:03d}: {name}")
+    return applied
+
+def upgrade(bind=None) -> list:
+    """
+    Apply pending migrations and return the versions applied. Serialized through an
+    exclusive file lock so several workers booting on one host never race.
+    """
+    bind = bind or engine
+    os.makedirs(DATA_DIR, exist_ok=True)
+    if fcntl is None:
+        return _upgrade(bind)
+    with open(LOCK_PATH, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            return _upgrade(bind)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply DocSign schema migrations")
+    parser.add_argument("--status", action="store_true", help="show migration status and exit")
+    args = parser.parse_args()
+
+    if args.status:
+        done = applied_versions()
+        for version, name, _ in MIGRATIONS:
+            print(f"[{'x' if version in done else ' '}] {version:03d} {name}")
+        return
+
+    applied = upgrade()
+    print(f"Database at version {MIGRATIONS[-1][0]} ({len(applied)} migration(s) applied)")
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,5 @@
-from models.user import User
-from models.document import Document, SignatureField, DocumentStatus, AuditLog
+from .user import User
+from .document import Document, SignatureField, DocumentStatus, AuditLog, AuditCheckpoint
+from .template import Template, TemplateField
+from .bulk_send import BulkSendJob, EmailOutbox
+from .idempotency import IdempotencyKey
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+
+class BulkSendJob(Base):
+    __tablename__ = "bulk_send_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=True)
+    source_document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+    title = Column(String, nullable=False)
+    status = Column(String, default="queued") # queued, running, completed, failed
+    total = Column(Integer, default=0)
+    created_count = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    owner = relationship("User")
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bulk_job_id = Column(Integer, ForeignKey("bulk_send_jobs.id"), nullable=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"))
+    recipient = Column(String, nullable=False)
+    document_title = Column(String, nullable=False)
+    signing_token = Column(String, nullable=False)
+    sender_name = Column(String, nullable=True)
+    status = Column(String, default="pending", index=True) # pending, sent, failed
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, JSON, Index, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
-from database import Base
+from ..database import Base
 import enum
 
 class DocumentStatus(str, enum.Enum):
@@ -14,6 +14,10 @@ class DocumentStatus(str, enum.Enum):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Dashboard summary: counts per status for one owner
+        Index("ix_documents_user_id_status", "user_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -23,6 +27,17 @@ class Document(Base):
     signed_file_path = Column(String, nullable=True)
     signing_token = Column(String, unique=True, index=True, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by every document/field change (utils/etag.py); UPDATEs also check it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Cached result of the sandboxed upload check (utils/pdf_validation.py); NULL validated_at = never checked
+    page_count = Column(Integer, nullable=True)
+    pdf_encrypted = Column(Boolean, nullable=True)
+    pdf_error = Column(String, nullable=True)
+    validated_at = Column(DateTime(timezone=True), nullable=True)
+    # When the last field was signed (utils/transitions.py); cleared by a recall
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __mapper_args__ = {"version_id_col": version, "version_id_generator": False}
 
     owner = relationship("User", back_populates="documents")
     signature_fields = relationship("SignatureField", back_populates="document", cascade="all, delete-orphan")
@@ -30,6 +45,10 @@ class Document(Base):
 
 class SignatureField(Base):
     __tablename__ = "signature_fields"
+    __table_args__ = (
+        # Signing progress: signed / total per document
+        Index("ix_signature_fields_document_id_status", "document_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"))
@@ -46,6 +65,12 @@ class SignatureField(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Audit trail pages and date-range exports (the rowid tie-breaker rides along on SQLite)
+        Index("ix_audit_logs_document_id_created_at", "document_id", "created_at"),
+        # One entry per chain position; also serves chain-head lookups
+        Index("ux_audit_logs_document_id_seq", "document_id", "seq", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"))
@@ -53,6 +78,25 @@ class AuditLog(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     details = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Hash chain (see utils/audit_chain.py)
+    seq = Column(Integer, nullable=True)
+    prev_hash = Column(String(64), nullable=True)
+    entry_hash = Column(String(64), nullable=True)
 
     document = relationship("Document", back_populates="audit_logs")
     user = relationship("User")
+
+class AuditCheckpoint(Base):
+    """Merkle root over a block of a document's audit entries, chained to the previous root."""
+    __tablename__ = "audit_checkpoints"
+    __table_args__ = (
+        Index("ix_audit_checkpoints_document_id_seq_end", "document_id", "seq_end"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    seq_start = Column(Integer, nullable=False)
+    seq_end = Column(Integer, nullable=False)
+    root_hash = Column(String(64), nullable=False)
+    prev_root_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Index
+from ..database import Base
+
+class IdempotencyKey(Base):
+    """A request made with an Idempotency-Key and the response to replay for retries of it."""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ux_idempotency_keys_scope_key", "scope", "key", unique=True),
+        # Expired keys are purged with a range delete
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String(64), nullable=False)  # sha256 of method, path and caller
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=True)
+    # NULL while the first request is still running
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    etag = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)  # zlib-compressed
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    # Lease on an in-progress claim; past it, the worker is presumed dead and a retry reclaims the key
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
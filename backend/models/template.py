@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+
+class Template(Base):
+    __tablename__ = "templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, index=True)
+    file_path = Column(String, nullable=False) # Stored original, shared by every instantiated document
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    owner = relationship("User")
+    fields = relationship("TemplateField", back_populates="template", cascade="all, delete-orphan")
+
+class TemplateField(Base):
+    __tablename__ = "template_fields"
+
+    id = Column(Integer, primary_key=True, index=True)
+    template_id = Column(Integer, ForeignKey("templates.id"), index=True)
+    page_number = Column(Integer, nullable=False)
+    x_position = Column(Float, nullable=False)
+    y_position = Column(Float, nullable=False)
+    width = Column(Float, nullable=False)
+    height = Column(Float, nullable=False)
+    signer_email = Column(String, nullable=True)
+
+    template = relationship("Template", back_populates="fields")
@@ -0,0 +1,127 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Optional
+import csv
+import io
+from .. import models, database
+from ..schemas.bulk_send import BulkRecipient, BulkSendCreate, BulkSendJobResponse
+from .auth import get_current_user
+from ..utils.bulk_send import run_bulk_send
+from ..utils.outbox import outbox_counts
+
+router = APIRouter(
+    prefix="/api/bulk-sends",
+    tags=["bulk-send"]
+)
+
+MAX_BULK_RECIPIENTS = 10000
+
+def job_response(db: Session, job: models.BulkSendJob) -> dict:
+    data = BulkSendJobResponse.model_validate(job).model_dump()
+    data["emails"] = outbox_counts(db, job.id)
+    return data
+
+def start_bulk_send(
+    db: Session,
+    background_tasks: BackgroundTasks,
+    current_user: models.User,
+    recipients: list,
+    template_id: Optional[int],
+    document_id: Optional[int],
+    title: Optional[str]
+) -> dict:
+    if (template_id is None) == (document_id is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of template_id or document_id")
+    if not recipients:
+        raise HTTPException(status_code=400, detail="No recipients provided")
+    if len(recipients) > MAX_BULK_RECIPIENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_RECIPIENTS} recipients per bulk send")
+
+    if template_id is not None:
+        source = db.query(models.Template).filter(models.Template.id == template_id).first()
+        layout = source.fields if source else None
+    else:
+        source = db.query(models.Document).filter(models.Document.id == document_id).first()
+        layout = source.signature_fields if source else None
+    if not source:
+        raise HTTPException(status_code=404, detail="Template or document not found")
+    if source.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not layout:
+        raise HTTPException(status_code=400, detail="Source has no signature fields")
+
+    job = models.BulkSendJob(
+        user_id=current_user.id,
+        template_id=template_id,
+        source_document_id=document_id,
+        title=title or source.title,
+        status="queued",
+        total=len(recipients),
+        created_count=0
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    # The job outlives this request's session; give it its own on the same engine
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    background_tasks.add_task(
+        run_bulk_send, session_factory, job.id,
+        [r.model_dump() for r in recipients],
+        current_user.full_name or current_user.email
+    )
+    return job_response(db, job)
+
+@router.post("/", response_model=BulkSendJobResponse, status_code=202)
+def create_bulk_send(
+    data: BulkSendCreate,
+    background_tasks: BackgroundTasks,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """Send one template or prepared document to many recipients (JSON recipient list)."""
+    return start_bulk_send(
+        db, background_tasks, current_user, data.recipients,
+        data.template_id, data.document_id, data.title
+    )
+
+@router.post("/csv", response_model=BulkSendJobResponse, status_code=202)
+def create_bulk_send_csv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    template_id: Optional[int] = None,
+    document_id: Optional[int] = None,
+    title: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """Same as the JSON variant, with recipients from a CSV with `email` and optional `name` columns."""
+    try:
+        text = file.file.read().decode("utf-8-sig")
+        rows = csv.DictReader(io.StringIO(text))
+        recipients = [
+            BulkRecipient(email=row["email"].strip(), name=(row.get("name") or "").strip() or None)
+            for row in rows
+            if (row.get("email") or "").strip()
+        ]
+    except (KeyError, UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 with an 'email' header column")
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid recipient email: {e.errors()[0]['input']}")
+
+    return start_bulk_send(db, background_tasks, current_user, recipients, template_id, document_id, title)
+
+@router.get("/{job_id}", response_model=BulkSendJobResponse)
+def get_bulk_send(
+    job_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """Progress of a bulk send: documents created so far and email delivery counts."""
+    job = db.query(models.BulkSendJob).filter(models.BulkSendJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Bulk send not found")
+    if job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return job_response(db, job)
@@ -1,5 +1,10 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse, RedirectResponse
+from sqlalchemy import func, case, exists
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import datetime
+from typing import Optional
 from .. import models, database
 from ..schemas.document import (
     DocumentResponse, 
@@ -7,86 +12,245 @@ from ..schemas.document import (
     SignatureFieldCreate, 
     SignatureFieldUpdate, 
     DocumentStatus,
-    SignatureUpdate
+    SignatureUpdate,
+    DocumentSummary,
+    AuditLogPage,
+    DocumentSearchPage
 )
 from .auth import get_current_user
-import shutil
+import logging
 import os
 import uuid
 from ..utils.pdf_processor import merge_signatures
+from ..utils.email_service import send_signing_request
+from ..utils.serialization import render_document, render_documents, check_view
+from ..utils.events import publish_document_event
+from ..utils.audit import audit_page, stream_audit_export, AUDIT_EXPORT_FORMATS
+from ..utils.audit_chain import append_audit_log, verify_trail, prove_entry
+from ..utils.storage import get_storage, storage_for
+from ..utils.cold_tier import thaw
+from ..utils.signatures import normalize_signature
+from ..utils.etag import not_modified, require_if_match, bump_version, with_etag
+from ..utils.transitions import reset_signatures, complete_if_signed
+from ..utils.search import index_document_text, search_documents, SEARCH_MAX_TEXT_CHARS
+from ..utils.pdf_validation import validate_upload, apply_report, ensure_validated
+from ..utils import anchors
 import secrets
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/api/docs",
     tags=["documents"]
 )
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+def create_audit_log(db: Session, document_id: int, user_id: int, action: str, details: str = None, commit: bool = True):
+    append_audit_log(db, document_id, user_id, action, details)
+    # commit=False lets callers fold the audit write into their own transaction
+    if commit:
+        db.commit()
 
-def create_audit_log(db: Session, document_id: int, user_id: int, action: str, details: str = None):
-    log = models.AuditLog(
-        document_id=document_id,
-        user_id=user_id,
-        action=action,
-        details=details
-    )
-    db.add(log)
-    db.commit()
+def save_upload(file: UploadFile) -> str:
+    """Stream an uploaded PDF into storage and return its reference (blocking)."""
+    if file.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    
+    file_extension = os.path.splitext(file.filename)[1]
+    unique_filename = f"{uuid.uuid4()}{file_extension}"
+    return get_storage().put(unique_filename, file.file)
+
+def is_assigned_signer(db: Session, document_id: int, email: str) -> bool:
+    """Whether a field of the document is assigned to email (case-insensitive, as signing checks)."""
+    return db.query(exists().where(
+        models.SignatureField.document_id == document_id,
+        func.lower(models.SignatureField.signer_email) == email.lower()
+    )).scalar()
+
+def download_redirect(document: models.Document, signed: bool):
+    ref = document.signed_file_path if signed else document.file_path
+    if not ref:
+        raise HTTPException(status_code=404, detail="Signed PDF not available yet")
+    storage = storage_for(ref)
+    # Local files go to the /uploads mount; S3 files to a short-lived presigned URL
+    url = storage.url(ref)
+    if url is not None:
+        return RedirectResponse(url, status_code=307)
+    # Cold-tier originals are decompressed on the fly
+    return StreamingResponse(storage.open(ref), media_type="application/pdf")
+
+def upload_options(detect_fields: bool) -> dict:
+    """What the upload's sandboxed validation pass also extracts: search text, and anchors if asked."""
+    options = {"text": SEARCH_MAX_TEXT_CHARS}
+    if detect_fields:
+        options["anchors"] = anchors.scan_limit()
+    return options
+
+def upload_proposals(file_path: str, report: dict) -> list:
+    """Field proposals for a fresh upload; an unreadable PDF just gets none (blocking)."""
+    try:
+        return anchors.detect_fields(file_path, report)
+    except Exception as e:
+        logger.warning("Signature field detection failed for %s: %s", file_path, e)
+        return []
 
-@router.post("/upload", response_model=DocumentResponse)
-async def upload_document(
+@router.post("/upload", response_model=DocumentResponse, dependencies=[Depends(check_view)])
+def upload_document(
     title: str,
+    response: Response,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    detect_fields: bool = False,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
-    if file.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
-    
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_path = save_upload(file)
+    # Parsed once, in a sandboxed subprocess that also scans anchors and extracts the
+    # search text; a bad file is deleted and rejected with 422
+    report = validate_upload(file_path, **upload_options(detect_fields))
+    # Before the INSERT so no write transaction is held open meanwhile
+    proposals = upload_proposals(file_path, report) if detect_fields else []
         
     db_document = models.Document(
         title=title,
         file_path=file_path,
         user_id=current_user.id
     )
+    apply_report(db_document, report)
     db.add(db_document)
+    db.flush()
+    detected = anchors.new_fields(db_document.id, proposals)
+    db.add_all(detected)
     db.commit()
     db.refresh(db_document)
     
     # Audit Log
-    create_audit_log(db, db_document.id, current_user.id, "upload", f"Document '{title}' uploaded")
+    details = f"Document '{title}' uploaded"
+    if detected:
+        details += f" ({len(detected)} signature field(s) detected)"
+    create_audit_log(db, db_document.id, current_user.id, "upload", details)
+
+    # Indexing the extracted text runs after the response, on its own session
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    background_tasks.add_task(index_document_text, session_factory, db_document.id, report["text"])
     
-    return db_document
+    return with_etag(render_document(db_document, fields, include), response, db_document)
 
 @router.get("/", response_model=list[DocumentResponse])
 def get_documents(
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    documents = db.query(models.Document).filter(models.Document.user_id == current_user.id).all()
+    return render_documents(documents, fields, include)
+
+@router.get("/summary", response_model=DocumentSummary)
+def get_documents_summary(
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
-    return db.query(models.Document).filter(models.Document.user_id == current_user.id).all()
+    """Status counts plus signed/total progress for pending documents, via GROUP BY only."""
+    counts = {"total": 0}
+    rows = db.query(models.Document.status, func.count(models.Document.id)).filter(
+        models.Document.user_id == current_user.id
+    ).group_by(models.Document.status).all()
+    for doc_status, count in rows:
+        counts[doc_status.value] = count
+        counts["total"] += count
+
+    progress = db.query(
+        models.SignatureField.document_id,
+        func.sum(case((models.SignatureField.status == "signed", 1), else_=0)),
+        func.count(models.SignatureField.id)
+    ).join(models.Document, models.Document.id == models.SignatureField.document_id).filter(
+        models.Document.user_id == current_user.id,
+        models.Document.status == models.DocumentStatus.PENDING
+    ).group_by(models.SignatureField.document_id).all()
+
+    return {
+        "counts": counts,
+        "progress": [
+            {"document_id": document_id, "signed": signed, "total": total}
+            for document_id, signed, total in progress
+        ]
+    }
+
+@router.get("/search", response_model=DocumentSearchPage)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """The user's documents matching q in their title or text, best match first."""
+    return search_documents(db, current_user.id, q, limit, offset)
+
+@router.get("/audit/export")
+def export_audit_logs(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: str = "ndjson",
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """Stream every audit entry for the user's documents in [start, end) as NDJSON or CSV."""
+    if format not in AUDIT_EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(AUDIT_EXPORT_FORMATS)}")
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    # The stream reads through its own session; don't pin this one while it runs
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    db.close()
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_audit_export(session_factory, current_user.id, start, end, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="audit-log.{format}"'},
+    )
 
 @router.get("/{document_id}", response_model=DocumentResponse)
 def get_document(
     document_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    # Pollers whose copy is current get an empty 304 instead of the whole document
+    return not_modified(request, document) or with_etag(render_document(document, fields, include), response, document)
+
+@router.get("/{document_id}/download")
+def download_document(
+    document_id: int,
+    signed: bool = False,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
+    """Redirect to the original (or signed) PDF; bytes are served by the storage backend"""
     document = db.query(models.Document).filter(models.Document.id == document_id).first()
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
-    return document
+    # Signers open the document they're asked to sign on the signing page
+    if document.user_id != current_user.id and not is_assigned_signer(db, document_id, current_user.email):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return download_redirect(document, signed)
 
 @router.post("/{document_id}/fields", response_model=SignatureFieldResponse)
 def add_signature_field(
     document_id: int,
     field: SignatureFieldCreate,
+    request: Request,
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
@@ -101,25 +265,65 @@ def add_signature_field(
     if document.user_id != current_user.id:
         print(f"DEBUG: User {current_user.email} not authorized for document {document_id}")
         raise HTTPException(status_code=403, detail="Not authorized")
+    require_if_match(request, document)
         
     try:
         # Pydantic v2 uses model_dump(), v1 uses dict()
         field_data = field.model_dump() if hasattr(field, 'model_dump') else field.dict()
         db_field = models.SignatureField(**field_data, document_id=document_id)
         db.add(db_field)
+        bump_version(document)
         db.commit()
         db.refresh(db_field)
         print(f"DEBUG: Field created successfully with ID {db_field.id}")
-        return db_field
+        return with_etag(db_field, response, document)
+    except StaleDataError:
+        db.rollback()
+        raise
     except Exception as e:
         print(f"DEBUG: Error creating field: {str(e)}")
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/{document_id}/fields/detect", response_model=list[SignatureFieldResponse])
+def detect_signature_fields(
+    document_id: int,
+    request: Request,
+    response: Response,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """Add fields at signature anchors in the PDF that no existing field covers yet."""
+    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if document.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    require_if_match(request, document)
+
+    if not ensure_validated(db, document):
+        raise HTTPException(status_code=422, detail="Could not read the document's PDF")
+    try:
+        proposals = anchors.detect_fields(document.file_path)
+    except Exception as e:
+        logger.warning("Signature field detection failed for document %s: %s", document_id, e)
+        raise HTTPException(status_code=422, detail="Could not read the document's PDF")
+
+    detected = anchors.new_fields(document.id, proposals, document.signature_fields)
+    if detected:
+        db.add_all(detected)
+        bump_version(document)
+        db.commit()
+        for field in detected:
+            db.refresh(field)
+    return with_etag(detected, response, document)
+
 @router.delete("/{document_id}/fields/{field_id}", status_code=204)
 def delete_signature_field(
     document_id: int,
     field_id: int,
+    request: Request,
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
@@ -134,16 +338,20 @@ def delete_signature_field(
     
     if not field:
         raise HTTPException(status_code=404, detail="Field not found")
+    require_if_match(request, document)
         
     db.delete(field)
+    bump_version(document)
     db.commit()
-    return None
+    return with_etag(None, response, document)
 
 @router.patch("/{document_id}/fields/{field_id}", response_model=SignatureFieldResponse)
 def update_signature_field(
     document_id: int,
     field_id: int,
     update_data: SignatureFieldUpdate,
+    request: Request,
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
@@ -158,17 +366,23 @@ def update_signature_field(
     
     if not field:
         raise HTTPException(status_code=404, detail="Field not found")
+    require_if_match(request, document)
         
     if update_data.signer_email is not None:
         field.signer_email = update_data.signer_email
+        bump_version(document)
         
     db.commit()
     db.refresh(field)
-    return field
+    return with_etag(field, response, document)
 
-@router.put("/{document_id}/send", response_model=DocumentResponse)
+@router.put("/{document_id}/send", response_model=DocumentResponse, dependencies=[Depends(check_view)])
 def send_document(
     document_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
@@ -181,8 +395,10 @@ def send_document(
         
     if not document.signature_fields:
         raise HTTPException(status_code=400, detail="Document has no signature fields")
+    require_if_match(request, document)
 
     document.status = models.DocumentStatus.PENDING
+    bump_version(document)
     
     # Generate signing token if not exists
     if not document.signing_token:
@@ -193,10 +409,10 @@ def send_document(
     
     # Audit Log for sending
     create_audit_log(db, document_id, current_user.id, "send", "Document sent for signing")
+    publish_document_event(document, "status")
     
     # Send email notifications to signers
     try:
-        from ..utils.email_service import send_signing_request
         unique_signers = set(f.signer_email for f in document.signature_fields if f.signer_email)
         for signer_email in unique_signers:
             send_signing_request(
@@ -209,20 +425,36 @@ def send_document(
         print(f"Email notification failed: {e}")
         # Don't fail the request if email fails
     
-    return document
+    return with_etag(render_document(document, fields, include), response, document)
 
 @router.get("/public/{token}", response_model=DocumentResponse)
-def get_public_document(token: str, db: Session = Depends(database.get_db)):
+def get_public_document(
+    token: str,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: Session = Depends(database.get_db)
+):
     document = db.query(models.Document).filter(models.Document.signing_token == token).first()
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
-    return document
+    return not_modified(request, document) or with_etag(render_document(document, fields, include), response, document)
+
+@router.get("/public/{token}/download")
+def download_public_document(token: str, signed: bool = False, db: Session = Depends(database.get_db)):
+    document = db.query(models.Document).filter(models.Document.signing_token == token).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return download_redirect(document, signed)
 
 @router.post("/public/{token}/fields/{field_id}/sign", response_model=SignatureFieldResponse)
 def sign_public_signature_field(
     token: str,
     field_id: int,
     data: SignatureUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(database.get_db)
 ):
     document = db.query(models.Document).filter(models.Document.signing_token == token).first()
@@ -244,49 +476,64 @@ def sign_public_signature_field(
     # but we can add a check if needed. For now, we allow signing if you have the token.
     # We should ideally ask for their name/email to log it.
     
+    require_if_match(request, document)
+    field.signature_data = normalize_signature(data, field)
     field.status = "signed"
-    field.signature_data = data.signature_data
+    bump_version(document)
+    # Signature, audit entry and (on the last field) completion commit together
+    create_audit_log(db, document.id, None, "sign", f"Signature applied via public link (Field {field_id})", commit=False)
+    completed = complete_if_signed(db, document.id)
     db.commit()
     db.refresh(field)
     
-    # Audit Log for guest signing
-    create_audit_log(db, document.id, None, "sign", f"Signature applied via public link (Field {field_id})")
+    publish_document_event(document, "field_signed", field_id=field.id)
     
     # Trigger PDF merging if all fields are signed
-    all_signed = all(f.status == "signed" for f in document.signature_fields)
-    if all_signed:
+    if completed:
+        publish_document_event(document, "status")
         try:
             merge_signatures(document.id, db)
             db.refresh(document)
             create_audit_log(db, document.id, None, "complete", "Document fully signed and flattened")
+            publish_document_event(document, "flatten_complete", signed_file_path=document.signed_file_path)
         except Exception as e:
             print(f"Error merging signatures: {e}")
             
-    return field
+    return with_etag(field, response, document)
 
-@router.post("/public/{token}/decline", response_model=DocumentResponse)
+@router.post("/public/{token}/decline", response_model=DocumentResponse, dependencies=[Depends(check_view)])
 def decline_public_document(
     token: str,
+    request: Request,
+    response: Response,
     reason: str = "No reason provided",
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
     db: Session = Depends(database.get_db)
 ):
     document = db.query(models.Document).filter(models.Document.signing_token == token).first()
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
+    require_if_match(request, document)
         
     document.status = models.DocumentStatus.DECLINED
+    bump_version(document)
+    # Audit Log for guest declination, in the same transaction as the status change
+    create_audit_log(db, document.id, None, "decline", f"Document declined via public link. Reason: {reason}", commit=False)
     db.commit()
     db.refresh(document)
+    publish_document_event(document, "status")
     
-    # Audit Log for guest declination
-    create_audit_log(db, document.id, None, "decline", f"Document declined via public link. Reason: {reason}")
-    
-    return document
+    return with_etag(render_document(document, fields, include), response, document)
 
-@router.post("/{document_id}/decline", response_model=DocumentResponse)
+@router.post("/{document_id}/decline", response_model=DocumentResponse, dependencies=[Depends(check_view)])
 def decline_document(
     document_id: int,
+    request: Request,
+    response: Response,
     reason: str = "No reason provided",
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
@@ -295,25 +542,32 @@ def decline_document(
          raise HTTPException(status_code=404, detail="Document not found")
          
     # Only if the user is a signer for this document
-    is_signer = any(f.signer_email == current_user.email for f in document.signature_fields)
+    is_signer = db.query(exists().where(
+        models.SignatureField.document_id == document_id,
+        models.SignatureField.signer_email == current_user.email
+    )).scalar()
     
     if not is_signer and document.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to decline this document")
+    require_if_match(request, document)
 
     document.status = models.DocumentStatus.DECLINED
+    bump_version(document)
+    # Audit Log, in the same transaction as the status change
+    create_audit_log(db, document_id, current_user.id, "decline", f"Document declined. Reason: {reason}", commit=False)
     db.commit()
     db.refresh(document)
+    publish_document_event(document, "status")
     
-    # Audit Log
-    create_audit_log(db, document_id, current_user.id, "decline", f"Document declined. Reason: {reason}")
-    
-    return document
+    return with_etag(render_document(document, fields, include), response, document)
 
 @router.post("/{document_id}/fields/{field_id}/sign", response_model=SignatureFieldResponse)
 def sign_signature_field(
     document_id: int,
     field_id: int,
     data: SignatureUpdate,
+    request: Request,
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
@@ -338,41 +592,51 @@ def sign_signature_field(
                     status_code=403, 
                     detail=f"Access denied. This field is assigned to {field.signer_email}"
                 )
+        require_if_match(request, field.document)
         
+        # Sized to the field, so needs the field first
+        signature_data = normalize_signature(data, field)
+
         # Update field
-        print(f"DEBUG: Updating field status to signed and saving signature data (len: {len(data.signature_data)})")
+        print(f"DEBUG: Updating field status to signed and saving signature data (len: {len(signature_data)})")
         field.status = "signed"
-        field.signature_data = data.signature_data
+        field.signature_data = signature_data
+        document = field.document
+        bump_version(document)
+        # Audit Log for signing; the signature, its audit entry and (on the last field)
+        # completion commit together
+        create_audit_log(db, document_id, current_user.id, "sign", f"Signature applied to field {field_id}", commit=False)
+        completed = complete_if_signed(db, document_id)
         db.commit()
         db.refresh(field)
         print(f"DEBUG: Field {field_id} updated successfully")
-
-        # Audit Log for signing
-        create_audit_log(db, document_id, current_user.id, "sign", f"Signature applied to field {field_id}")
+        publish_document_event(document, "field_signed", field_id=field.id)
         
-        # Check if all fields in the document are signed
-        all_fields = db.query(models.SignatureField).filter(models.SignatureField.document_id == document_id).all()
-        if all(f.status == "signed" for f in all_fields):
-            print(f"DEBUG: All fields signed for document {document_id}, marking as completed")
-            document = db.query(models.Document).filter(models.Document.id == document_id).first()
-            if document:
-                document.status = models.DocumentStatus.COMPLETED
-                db.commit()
-                print(f"DEBUG: Document {document_id} marked as completed")
-                # Trigger PDF merge
-                merge_signatures(document_id, db)
-                print(f"DEBUG: PDF merge triggered for document {document_id}")
-                # Audit Log for completion
-                create_audit_log(db, document_id, current_user.id, "complete", "All fields signed. Document flattened.")
+        if completed:
+            print(f"DEBUG: Document {document_id} marked as completed")
+            publish_document_event(document, "status")
+            # Trigger PDF merge
+            merge_signatures(document_id, db)
+            print(f"DEBUG: PDF merge triggered for document {document_id}")
+            # Audit Log for completion
+            create_audit_log(db, document_id, current_user.id, "complete", "All fields signed. Document flattened.")
+            publish_document_event(document, "flatten_complete", signed_file_path=document.signed_file_path)
                 
-        return field
+        return with_etag(field, response, document)
+    except (HTTPException, StaleDataError):
+        db.rollback()
+        raise
     except Exception as e:
         print(f"DEBUG: Error signing field: {str(e)}")
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Internal server error during signing: {str(e)}")
-@router.post("/{document_id}/recall", response_model=DocumentResponse)
+@router.post("/{document_id}/recall", response_model=DocumentResponse, dependencies=[Depends(check_view)])
 def recall_document(
     document_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
@@ -382,32 +646,35 @@ def recall_document(
     
     if document.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
+    require_if_match(request, document)
         
     # Revert status
     document.status = models.DocumentStatus.DRAFT
+    bump_version(document)
     document.signed_file_path = None
+    document.completed_at = None
+    # The original is served straight from /uploads again while it's being edited
+    thaw(document.file_path)
     
-    # Reset all fields
-    for field in document.signature_fields:
-        field.status = "pending"
-        field.signature_data = None
-        
+    # Reset all fields (one UPDATE) and log it in the same transaction
+    cleared = reset_signatures(db, document_id)
+    create_audit_log(db, document_id, current_user.id, "recall", "Document recalled to draft mode. Signatures cleared.", commit=False)
     db.commit()
     db.refresh(document)
-    print(f"DEBUG: Document {document_id} recalled and reset to draft")
-    
-    # Audit Log for recall
-    create_audit_log(db, document_id, current_user.id, "recall", "Document recalled to draft mode. Signatures cleared.")
+    logger.info("Document %s recalled and reset to draft (%s signature(s) cleared)", document_id, cleared)
+    publish_document_event(document, "status")
     
-    return document
+    return with_etag(render_document(document, fields, include), response, document)
 
-@router.get("/{document_id}/audit", response_model=list)
+@router.get("/{document_id}/audit", response_model=AuditLogPage)
 def get_document_audit_logs(
     document_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
-    """Get audit logs for a specific document"""
+    """Get audit logs for a specific document, newest first, one page at a time"""
     document = db.query(models.Document).filter(models.Document.id == document_id).first()
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -415,5 +682,44 @@ def get_document_audit_logs(
     if document.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    logs = db.query(models.AuditLog).filter(models.AuditLog.document_id == document_id).order_by(models.AuditLog.created_at.desc()).all()
-    return logs
+    return audit_page(db, document_id, cursor, limit)
+
+@router.get("/{document_id}/audit/verify")
+def verify_document_audit_trail(
+    document_id: int,
+    from_seq: Optional[int] = Query(None, ge=1),
+    to_seq: Optional[int] = Query(None, ge=1),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """Check the hash chain and Merkle checkpoints of a document's audit trail (or a seq range of it)"""
+    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    if document.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    return verify_trail(db, document_id, from_seq, to_seq)
+
+@router.get("/{document_id}/audit/{log_id}/proof")
+def get_audit_entry_proof(
+    document_id: int,
+    log_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """Merkle inclusion proof for one audit entry against its checkpoint"""
+    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    if document.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    entry = db.query(models.AuditLog).filter(
+        models.AuditLog.id == log_id, models.AuditLog.document_id == document_id
+    ).first()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Audit entry not found")
+    return prove_entry(db, entry)
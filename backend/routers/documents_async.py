@@ -0,0 +1,118 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional
+from .. import models
+from ..database import get_async_db, SessionLocal
+from ..schemas.document import DocumentResponse
+from .auth_async import get_current_user
+from .documents import save_upload, upload_options, upload_proposals
+from ..utils.audit_chain import append_audit_log
+from ..utils.etag import not_modified, with_etag
+from ..utils.search import index_document_text
+from ..utils.anchors import new_fields
+from ..utils.pdf_validation import validate_upload, apply_report
+from ..utils.serialization import render_document, render_documents, parse_csv_param, check_view, DOCUMENT_RELATIONSHIPS
+
+# Async twins of the hot read/upload paths in routers/documents.py, mounted ahead of
+# them when DB_MODE=async. Routes not defined here fall through to the sync router.
+router = APIRouter(
+    prefix="/api/docs",
+    tags=["documents"]
+)
+
+def document_query(fields: Optional[str] = None, include: Optional[str] = None):
+    # Async sessions cannot lazy-load, so pull the rendered relationships up front
+    if fields is None and include is None:
+        relationships = DOCUMENT_RELATIONSHIPS
+    else:
+        relationships = [r for r in parse_csv_param(include) or [] if r in DOCUMENT_RELATIONSHIPS]
+    return select(models.Document).options(
+        *(selectinload(getattr(models.Document, name)) for name in relationships)
+    )
+
+async def create_audit_log(db: AsyncSession, document_id: int, user_id: int, action: str, details: str = None):
+    await db.run_sync(append_audit_log, document_id, user_id, action, details)
+    await db.commit()
+
+@router.post("/upload", response_model=DocumentResponse, dependencies=[Depends(check_view)])
+async def upload_document(
+    title: str,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    detect_fields: bool = False,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    file_path = await run_in_threadpool(save_upload, file)
+    report = await run_in_threadpool(validate_upload, file_path, **upload_options(detect_fields))
+    proposals = await run_in_threadpool(upload_proposals, file_path, report) if detect_fields else []
+
+    db_document = models.Document(
+        title=title,
+        file_path=file_path,
+        user_id=current_user.id
+    )
+    apply_report(db_document, report)
+    db.add(db_document)
+    await db.flush()
+    detected = new_fields(db_document.id, proposals)
+    db.add_all(detected)
+    await db.commit()
+
+    details = f"Document '{title}' uploaded"
+    if detected:
+        details += f" ({len(detected)} signature field(s) detected)"
+    await create_audit_log(db, db_document.id, current_user.id, "upload", details)
+    # Sync function, so Starlette runs it in the threadpool after the response
+    background_tasks.add_task(index_document_text, SessionLocal, db_document.id, report["text"])
+
+    result = await db.execute(document_query(fields, include).where(models.Document.id == db_document.id))
+    document = result.scalars().first()
+    return with_etag(render_document(document, fields, include), response, document)
+
+@router.get("/", response_model=list[DocumentResponse])
+async def get_documents(
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(document_query(fields, include).where(models.Document.user_id == current_user.id))
+    return render_documents(result.scalars().all(), fields, include)
+
+@router.get("/{document_id:int}", response_model=DocumentResponse)
+async def get_document(
+    document_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(document_query(fields, include).where(models.Document.id == document_id))
+    document = result.scalars().first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return not_modified(request, document) or with_etag(render_document(document, fields, include), response, document)
+
+@router.get("/public/{token}", response_model=DocumentResponse)
+async def get_public_document(
+    token: str,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(document_query(fields, include).where(models.Document.signing_token == token))
+    document = result.scalars().first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return not_modified(request, document) or with_etag(render_document(document, fields, include), response, document)
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+import json
+import os
+from .. import models, database
+from .auth import get_current_user
+from ..utils.events import get_broker
+
+# Registered ahead of the documents router so /api/docs/events isn't taken for a document id
+router = APIRouter(
+    prefix="/api/docs",
+    tags=["events"]
+)
+
+# Comment frame sent while idle so proxies don't drop the connection
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+def sse_frame(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+def event_stream(channel: str, snapshot: dict = None) -> StreamingResponse:
+    async def stream():
+        # Subscribe before sending the snapshot so nothing published in between is lost
+        subscription = await get_broker().subscribe(channel)
+        try:
+            if snapshot is not None:
+                yield sse_frame(snapshot)
+            while True:
+                event = await subscription.get(SSE_HEARTBEAT_SECONDS)
+                yield sse_frame(event) if event is not None else ": ping\n\n"
+        finally:
+            await subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def document_snapshot(document: models.Document) -> dict:
+    return {
+        "type": "status",
+        "document_id": document.id,
+        "status": document.status.value if document.status else None,
+        "signed_file_path": document.signed_file_path,
+    }
+
+@router.get("/events")
+def stream_user_events(current_user: models.User = Depends(get_current_user)):
+    """Events for every document the current user owns."""
+    return event_stream(f"user:{current_user.id}")
+
+@router.get("/{document_id}/events")
+def stream_document_events(
+    document_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if document.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    snapshot = document_snapshot(document)
+    # Don't pin a pooled connection for the lifetime of the stream
+    db.close()
+    return event_stream(f"document:{document_id}", snapshot)
+
+@router.get("/public/{token}/events")
+def stream_public_document_events(token: str, db: Session = Depends(database.get_db)):
+    document = db.query(models.Document).filter(models.Document.signing_token == token).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    snapshot = document_snapshot(document)
+    db.close()
+    return event_stream(f"document:{document.id}", snapshot)
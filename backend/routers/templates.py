@@ -0,0 +1,123 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy import insert, select, literal
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Optional
+from .. import models, database
+from ..schemas.document import DocumentResponse
+from ..schemas.template import TemplateResponse
+from .auth import get_current_user
+from .documents import create_audit_log
+from ..utils.serialization import render_document, check_view
+from ..utils.cold_tier import thaw
+from ..utils.search import index_document_text
+
+router = APIRouter(
+    prefix="/api/templates",
+    tags=["templates"]
+)
+
+FIELD_LAYOUT_COLUMNS = ["page_number", "x_position", "y_position", "width", "height", "signer_email"]
+
+def get_owned_template(db: Session, template_id: int, user: models.User) -> models.Template:
+    template = db.query(models.Template).filter(models.Template.id == template_id).first()
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    if template.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return template
+
+def copy_template_fields(db: Session, template_id: int, document_id: int) -> int:
+    """INSERT ... SELECT the template's field layout onto a document. Returns rows copied."""
+    layout = select(
+        literal(document_id),
+        *(getattr(models.TemplateField, c) for c in FIELD_LAYOUT_COLUMNS)
+    ).where(models.TemplateField.template_id == template_id)
+    result = db.execute(
+        insert(models.SignatureField).from_select(["document_id"] + FIELD_LAYOUT_COLUMNS, layout)
+    )
+    return result.rowcount
+
+@router.post("/from-document/{document_id}", response_model=TemplateResponse)
+def create_template_from_document(
+    document_id: int,
+    title: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """Capture a document's original PDF and field layout as a reusable template."""
+    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if document.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    # Documents made from the template need the original served as-is again
+    thaw(document.file_path)
+    template = models.Template(
+        title=title or document.title,
+        file_path=document.file_path,
+        user_id=current_user.id
+    )
+    db.add(template)
+    db.flush()
+
+    layout = select(
+        literal(template.id),
+        *(getattr(models.SignatureField, c) for c in FIELD_LAYOUT_COLUMNS)
+    ).where(models.SignatureField.document_id == document_id)
+    db.execute(insert(models.TemplateField).from_select(["template_id"] + FIELD_LAYOUT_COLUMNS, layout))
+    db.commit()
+    db.refresh(template)
+    return template
+
+@router.get("/", response_model=list[TemplateResponse])
+def get_templates(
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    return db.query(models.Template).filter(models.Template.user_id == current_user.id).all()
+
+@router.get("/{template_id}", response_model=TemplateResponse)
+def get_template(
+    template_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    return get_owned_template(db, template_id, current_user)
+
+@router.post("/{template_id}/instantiate", response_model=DocumentResponse, dependencies=[Depends(check_view)])
+def instantiate_template(
+    template_id: int,
+    background_tasks: BackgroundTasks,
+    title: Optional[str] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Create a draft document from a template in one transaction: the stored original is
+    reused as-is and every field row is copied server-side with a single INSERT ... SELECT.
+    """
+    template = get_owned_template(db, template_id, current_user)
+
+    document = models.Document(
+        title=title or template.title,
+        file_path=template.file_path,
+        user_id=current_user.id
+    )
+    db.add(document)
+    db.flush()
+
+    copied = copy_template_fields(db, template.id, document.id)
+    create_audit_log(
+        db, document.id, current_user.id, "upload",
+        f"Document '{document.title}' created from template {template.id} ({copied} fields)",
+        commit=False
+    )
+    db.commit()
+    db.refresh(document)
+    background_tasks.add_task(
+        index_document_text, sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind()), document.id
+    )
+    return render_document(document, fields, include)
@@ -6,5 +6,13 @@ from .document import (
     SignatureFieldUpdate, 
     SignatureFieldResponse, 
     DocumentStatus, 
-    SignatureUpdate
+    SignatureUpdate,
+    SignatureStrokes,
+    DocumentSummary,
+    AuditLogResponse,
+    AuditLogPage,
+    DocumentSearchHit,
+    DocumentSearchPage
 )
+from .template import TemplateResponse, TemplateFieldResponse
+from .bulk_send import BulkRecipient, BulkSendCreate, BulkSendJobResponse
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, EmailStr
+from datetime import datetime
+from typing import List, Optional
+
+class BulkRecipient(BaseModel):
+    email: EmailStr
+    name: Optional[str] = None
+
+class BulkSendCreate(BaseModel):
+    template_id: Optional[int] = None
+    document_id: Optional[int] = None
+    title: Optional[str] = None
+    recipients: List[BulkRecipient]
+
+class BulkSendEmailCounts(BaseModel):
+    pending: int = 0
+    sent: int = 0
+    failed: int = 0
+
+class BulkSendJobResponse(BaseModel):
+    id: int
+    status: str
+    title: str
+    template_id: Optional[int] = None
+    source_document_id: Optional[int] = None
+    total: int
+    created_count: int
+    emails: BulkSendEmailCounts = BulkSendEmailCounts()
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from enum import Enum
 
 class DocumentStatus(str, Enum):
@@ -23,8 +23,24 @@ class SignatureFieldCreate(SignatureFieldBase):
 class SignatureFieldUpdate(BaseModel):
     signer_email: Optional[str] = None
 
+class SignatureStrokes(BaseModel):
+    """Pen strokes from the signature pad, in canvas pixels."""
+    width: float = Field(gt=0)
+    height: float = Field(gt=0)
+    strokes: List[List[Tuple[float, float]]]
+    stroke_width: float = Field(2.5, gt=0, le=50)
+    color: str = Field("#000000", pattern=r"^#[0-9a-fA-F]{6}$")
+
 class SignatureUpdate(BaseModel):
-    signature_data: str
+    # A PNG or SVG data URL, or raw strokes (stored as SVG)
+    signature_data: Optional[str] = None
+    signature_strokes: Optional[SignatureStrokes] = None
+
+    @model_validator(mode="after")
+    def one_format(self):
+        if (self.signature_data is None) == (self.signature_strokes is None):
+            raise ValueError("Provide exactly one of signature_data or signature_strokes")
+        return self
 
 class SignatureFieldResponse(SignatureFieldBase):
     id: int
@@ -40,11 +56,49 @@ class AuditLogResponse(BaseModel):
     action: str
     details: Optional[str] = None
     created_at: datetime
-    user_id: int
+    user_id: Optional[int] = None  # None for guest actions via public links
+    seq: Optional[int] = None
+    entry_hash: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class AuditLogPage(BaseModel):
+    items: List[AuditLogResponse]
+    # Pass back as ?cursor= for the next (older) page; None on the last page
+    next_cursor: Optional[int] = None
+
+class DocumentStatusCounts(BaseModel):
+    draft: int = 0
+    pending: int = 0
+    completed: int = 0
+    declined: int = 0
+    total: int = 0
+
+class DocumentProgress(BaseModel):
+    document_id: int
+    signed: int
+    total: int
+
+class DocumentSummary(BaseModel):
+    counts: DocumentStatusCounts
+    progress: List[DocumentProgress] = []
+
+class DocumentSearchHit(BaseModel):
+    id: int
+    title: str
+    status: DocumentStatus
+    created_at: datetime
+    # HTML-escaped, with matched terms wrapped in <mark></mark>
+    title_highlight: str
+    snippet: str
+    rank: float
+
+class DocumentSearchPage(BaseModel):
+    items: List[DocumentSearchHit]
+    # Pass back as ?offset= for the next page; None on the last page
+    next_offset: Optional[int] = None
+
 class DocumentBase(BaseModel):
     title: str
 
@@ -59,6 +113,8 @@ class DocumentResponse(DocumentBase):
     status: DocumentStatus
     signed_file_path: Optional[str] = None
     signing_token: Optional[str] = None
+    version: int = 1
+    page_count: Optional[int] = None
     signature_fields: List[SignatureFieldResponse] = []
     audit_logs: List[AuditLogResponse] = []
 
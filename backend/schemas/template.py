@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class TemplateFieldResponse(BaseModel):
+    id: int
+    page_number: int
+    x_position: float
+    y_position: float
+    width: float
+    height: float
+    signer_email: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class TemplateResponse(BaseModel):
+    id: int
+    title: str
+    user_id: int
+    created_at: datetime
+    fields: List[TemplateFieldResponse] = []
+
+    class Config:
+        from_attributes = True
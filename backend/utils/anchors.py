@@ -0,0 +1,86 @@
+"""
+Signature field detection for uploaded PDFs.
+
+Pages are scanned for AcroForm signature widgets, `{{sig}}` tags and label phrases
+(ANCHOR_PHRASES) by the sandboxed worker in pdf_inspect.py, under the same CPU and
+memory limits as upload validation; the API process never parses the file itself.
+Proposals come back in the frontend's coordinate space, the one merge_signatures reads.
+
+Documents of ANCHOR_PARALLEL_PAGES pages or more are scanned in page ranges by up to
+ANCHOR_WORKERS sandbox processes at once. Those only live for the scan, and the
+default splits the host's cores between the web workers (WEB_CONCURRENCY, one per
+core by default, leaves one each), so busy workers don't multiply the process count.
+"""
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from .. import models
+from .storage import storage_for
+from .pdf_inspect import overlaps
+from .pdf_validation import inspect_pdf, ERROR_MESSAGES
+
+_CPUS = os.cpu_count() or 1
+# Same default as gunicorn.conf.py: one web worker per core
+_WEB_WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", str(_CPUS))))
+ANCHOR_PARALLEL_PAGES = int(os.getenv("ANCHOR_PARALLEL_PAGES", "50"))
+ANCHOR_WORKERS = int(os.getenv("ANCHOR_WORKERS", str(max(1, _CPUS // _WEB_WORKERS))))
+
+def _proposals(report: dict) -> list:
+    if not report["ok"]:
+        raise ValueError(ERROR_MESSAGES.get(report["error"], ERROR_MESSAGES["malformed"]))
+    return report["proposals"]
+
+def scan_ranges(path: str, page_count: int) -> list:
+    """Proposals from page ranges scanned on parallel sandbox workers, in page order."""
+    # A few ranges per worker so one dense stretch of pages doesn't hold up the rest
+    chunk = max(4, math.ceil(page_count / (ANCHOR_WORKERS * 4)))
+    starts = range(0, page_count, chunk)
+    # Threads only wait on the worker processes
+    with ThreadPoolExecutor(max_workers=ANCHOR_WORKERS) as pool:
+        reports = pool.map(lambda start: inspect_pdf(path, anchors=0, pages=(start, start + chunk)), starts)
+        return [proposal for report in reports for proposal in _proposals(report)]
+
+def scan_limit() -> int:
+    """The --anchors page limit for a single pass; larger documents go to scan_ranges."""
+    return ANCHOR_PARALLEL_PAGES if ANCHOR_WORKERS > 1 else 0
+
+def detect_in_file(path: str, report: dict = None) -> list:
+    """
+    Signature field proposals for a local PDF, in page order; ValueError if it can't
+    be read. report is a sandbox report that already scanned (upload validation).
+    """
+    report = report or inspect_pdf(path, anchors=scan_limit())
+    proposals = _proposals(report)
+    if proposals is None:
+        return scan_ranges(path, report["pages"])
+    return proposals
+
+def detect_fields(ref: str, report: dict = None) -> list:
+    """Signature field proposals for a stored PDF, in page order (blocking)."""
+    if report is not None and report.get("proposals") is not None:
+        return report["proposals"]
+    with storage_for(ref).local_path(ref) as path:
+        return detect_in_file(path, report)
+
+def new_fields(document_id: int, proposals: list, existing: list = ()) -> list:
+    """Unsaved SignatureField rows for proposals that don't overlap existing fields."""
+    taken = [
+        {"page_number": f.page_number, "x_position": f.x_position, "y_position": f.y_position,
+         "width": f.width, "height": f.height}
+        for f in existing
+    ]
+    fields = []
+    for proposal in proposals:
+        if any(other["page_number"] == proposal["page_number"] and overlaps(proposal, other) for other in taken):
+            continue
+        taken.append(proposal)
+        fields.append(models.SignatureField(
+            document_id=document_id,
+            page_number=proposal["page_number"],
+            x_position=proposal["x_position"],
+            y_position=proposal["y_position"],
+            width=proposal["width"],
+            height=proposal["height"],
+            signer_email=proposal["signer_email"],
+        ))
+    return fields
@@ -0,0 +1,346 @@
+"""
+Tamper-evident audit trails.
+
+Every audit entry of a document carries a per-document sequence number, the hash of
+the previous entry and its own hash:
+
+    entry_hash = sha256(prev_hash + "\\n" + canonical(document_id, seq, user_id, action, details, created_at))
+
+Editing, deleting or reordering any entry breaks the chain from that point on. Every
+AUDIT_CHECKPOINT_INTERVAL entries a checkpoint stores the Merkle root over that block
+of entry hashes, itself chained to the previous checkpoint's root. A single entry is
+proven against its checkpoint with a log2(interval) Merkle path, and a range is
+verified by rehashing only that range plus the checkpoints around it, so the cost of
+verification does not grow with the length of the trail.
+
+Verify from the project root:
+
+    python -m backend.utils.audit_chain 12 15     # specific documents
+    python -m backend.utils.audit_chain --all
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select, func, text
+from .. import models
+
+GENESIS_HASH = "0" * 64
+# Entries per Merkle checkpoint (at least 2, so a document's first entry never needs one)
+AUDIT_CHECKPOINT_INTERVAL = max(2, int(os.getenv("AUDIT_CHECKPOINT_INTERVAL", "64")))
+
+def _canonical_time(value) -> str:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+def compute_entry_hash(prev_hash: str, document_id: int, seq: int, user_id: Optional[int],
+                       action: str, details: Optional[str], created_at) -> str:
+    payload = json.dumps(
+        [document_id, seq, user_id, action, details, _canonical_time(created_at)],
+        separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(f"{prev_hash}\n{payload}".encode()).hexdigest()
+
+def sealed_entry(document_id: int, user_id: Optional[int], action: str, details: Optional[str] = None,
+                 seq: int = 1, prev_hash: str = GENESIS_HASH) -> dict:
+    """Column values for a new audit_logs row chained onto (seq - 1, prev_hash)."""
+    # Stamped here rather than by the database so the hash covers the stored time
+    created_at = datetime.now(timezone.utc)
+    return {
+        "document_id": document_id,
+        "user_id": user_id,
+        "action": action,
+        "details": details,
+        "created_at": created_at,
+        "seq": seq,
+        "prev_hash": prev_hash,
+        "entry_hash": compute_entry_hash(prev_hash, document_id, seq, user_id, action, details, created_at),
+    }
+
+def _entry_hash_of(entry) -> str:
+    return compute_entry_hash(
+        entry.prev_hash, entry.document_id, entry.seq, entry.user_id,
+        entry.action, entry.details, entry.created_at
+    )
+
+# --- Merkle trees over blocks of entry hashes ---
+
+def _leaf(entry_hash: str) -> bytes:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(entry_hash)).digest()
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+def merkle_root(entry_hashes: list) -> str:
+    level = [_leaf(h) for h in entry_hashes]
+    while len(level) > 1:
+        # An odd node out is carried up unchanged
+        level = [_node(level[i], level[i + 1]) if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+def merkle_proof(entry_hashes: list, index: int) -> list:
+    """Sibling path from leaf `index` to the root, as [("left"|"right", hex), ...]."""
+    level = [_leaf(h) for h in entry_hashes]
+    proof = []
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(("left" if sibling < index else "right", level[sibling].hex()))
+        level = [_node(level[i], level[i + 1]) if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)]
+        index //= 2
+    return proof
+
+def verify_merkle_proof(entry_hash: str, proof: list, root: str) -> bool:
+    node = _leaf(entry_hash)
+    for side, sibling in proof:
+        node = _node(bytes.fromhex(sibling), node) if side == "left" else _node(node, bytes.fromhex(sibling))
+    return node.hex() == root
+
+# --- Writing ---
+
+def _lock_document(db, document_id: int):
+    """Hold the document row (SQLite: the database) for writing until the transaction ends."""
+    if db.get_bind().dialect.name == "sqlite":
+        # No SELECT ... FOR UPDATE; a no-op write takes SQLite's write lock
+        db.execute(text("UPDATE documents SET id = id WHERE id = :id"), {"id": document_id})
+    else:
+        db.execute(select(models.Document.id).where(models.Document.id == document_id).with_for_update())
+
+def append_audit_log(db, document_id: int, user_id: Optional[int], action: str, details: Optional[str] = None):
+    """
+    Add a chained entry (and its checkpoint, when one is due) to the session without
+    committing. Appends to one document are serialized on its row, so concurrent
+    writers (two signers on different fields) queue instead of both taking the same
+    seq; the (document_id, seq) unique index remains the backstop against forks.
+    """
+    _lock_document(db, document_id)
+    head = db.execute(
+        select(models.AuditLog.seq, models.AuditLog.entry_hash)
+        .where(models.AuditLog.document_id == document_id, models.AuditLog.seq.isnot(None))
+        .order_by(models.AuditLog.seq.desc())
+        .limit(1)
+    ).first()
+    seq, prev_hash = (head.seq + 1, head.entry_hash) if head else (1, GENESIS_HASH)
+
+    log = models.AuditLog(**sealed_entry(document_id, user_id, action, details, seq, prev_hash))
+    db.add(log)
+    # Flush so a second append in the same transaction sees this one as the head
+    db.flush()
+    if seq % AUDIT_CHECKPOINT_INTERVAL == 0:
+        _add_checkpoint(db, document_id, seq - AUDIT_CHECKPOINT_INTERVAL + 1, seq)
+    return log
+
+def _block_hashes(db, document_id: int, seq_start: int, seq_end: int) -> list:
+    return list(db.execute(
+        select(models.AuditLog.entry_hash)
+        .where(models.AuditLog.document_id == document_id, models.AuditLog.seq.between(seq_start, seq_end))
+        .order_by(models.AuditLog.seq)
+    ).scalars())
+
+def _add_checkpoint(db, document_id: int, seq_start: int, seq_end: int):
+    hashes = _block_hashes(db, document_id, seq_start, seq_end)
+    previous = db.execute(
+        select(models.AuditCheckpoint.root_hash)
+        .where(models.AuditCheckpoint.document_id == document_id)
+        .order_by(models.AuditCheckpoint.seq_end.desc())
+        .limit(1)
+    ).scalar()
+    db.add(models.AuditCheckpoint(
+        document_id=document_id,
+        seq_start=seq_start,
+        seq_end=seq_end,
+        root_hash=merkle_root(hashes),
+        prev_root_hash=previous or GENESIS_HASH,
+    ))
+
+# --- Verification ---
+
+def _checkpoints_around(db, document_id: int, lo: int, hi: int) -> list:
+    """Checkpoints overlapping [lo, hi], plus the one before them to check the link."""
+    Checkpoint = models.AuditCheckpoint
+    overlapping = db.query(Checkpoint).filter(
+        Checkpoint.document_id == document_id,
+        Checkpoint.seq_end >= lo,
+        Checkpoint.seq_start <= hi
+    ).order_by(Checkpoint.seq_start).all()
+    first_start = overlapping[0].seq_start if overlapping else lo
+    before = db.query(Checkpoint).filter(
+        Checkpoint.document_id == document_id,
+        Checkpoint.seq_end < first_start
+    ).order_by(Checkpoint.seq_end.desc()).first()
+    return ([before] if before else []) + overlapping
+
+def verify_trail(db, document_id: int, from_seq: Optional[int] = None, to_seq: Optional[int] = None) -> dict:
+    """Verify entries from_seq..to_seq (default: the whole trail) and the checkpoints covering them."""
+    AuditLog = models.AuditLog
+    errors = []
+    last_seq = db.execute(
+        select(func.max(AuditLog.seq)).where(AuditLog.document_id == document_id)
+    ).scalar() or 0
+    lo = max(1, from_seq or 1)
+    hi = min(last_seq, to_seq or last_seq)
+
+    # Load one entry before the range so the first link can be checked too
+    entries = db.query(AuditLog).filter(
+        AuditLog.document_id == document_id,
+        AuditLog.seq.between(lo - 1, hi)
+    ).order_by(AuditLog.seq).all()
+
+    expected_prev = GENESIS_HASH if lo == 1 else None
+    expected_seq = lo if lo == 1 else lo - 1
+    for entry in entries:
+        if entry.seq != expected_seq:
+            errors.append(f"seq {expected_seq}: entry missing (found seq {entry.seq})")
+        if expected_prev is not None and entry.prev_hash != expected_prev:
+            errors.append(f"seq {entry.seq}: prev_hash does not match the preceding entry")
+        if _entry_hash_of(entry) != entry.entry_hash:
+            errors.append(f"seq {entry.seq}: contents do not match entry_hash")
+        expected_prev = entry.entry_hash
+        expected_seq = entry.seq + 1
+    if hi >= lo and expected_seq <= hi:
+        errors.append(f"seq {expected_seq}..{hi}: entries missing")
+
+    by_seq = {entry.seq: entry.entry_hash for entry in entries}
+    checkpoints = _checkpoints_around(db, document_id, lo - 1, hi) if hi >= lo else []
+    previous_root = None
+    for checkpoint in checkpoints:
+        span = range(checkpoint.seq_start, checkpoint.seq_end + 1)
+        if all(seq in by_seq for seq in span):
+            hashes = [by_seq[seq] for seq in span]
+        else:
+            hashes = _block_hashes(db, document_id, checkpoint.seq_start, checkpoint.seq_end)
+        if len(hashes) != len(span) or merkle_root(hashes) != checkpoint.root_hash:
+            errors.append(f"checkpoint {checkpoint.seq_start}-{checkpoint.seq_end}: Merkle root mismatch")
+        if checkpoint.seq_start == 1 and checkpoint.prev_root_hash != GENESIS_HASH:
+            errors.append(f"checkpoint {checkpoint.seq_start}-{checkpoint.seq_end}: broken checkpoint chain")
+        if previous_root is not None and checkpoint.prev_root_hash != previous_root:
+            errors.append(f"checkpoint {checkpoint.seq_start}-{checkpoint.seq_end}: broken checkpoint chain")
+        previous_root = checkpoint.root_hash
+
+    # Rows written around the chain (e.g. raw SQL) are never legitimate
+    unchained = db.execute(
+        select(func.count(AuditLog.id)).where(AuditLog.document_id == document_id, AuditLog.seq.is_(None))
+    ).scalar()
+    if unchained:
+        errors.append(f"{unchained} entr{'y is' if unchained == 1 else 'ies are'} not part of the chain")
+
+    return {
+        "document_id": document_id,
+        "valid": not errors,
+        "from_seq": lo,
+        "to_seq": hi,
+        "entries_checked": len([e for e in entries if e.seq >= lo]),
+        "checkpoints_checked": len(checkpoints),
+        "errors": errors,
+    }
+
+def prove_entry(db, entry) -> dict:
+    """
+    Prove one entry: its own hash, then either a Merkle path to its checkpoint or, for
+    entries after the last checkpoint, the short chain back to that checkpoint.
+    """
+    Checkpoint = models.AuditCheckpoint
+    result = {"entry_id": entry.id, "seq": entry.seq, "entry_hash": entry.entry_hash, "checkpoint": None, "proof": []}
+    if entry.seq is None:
+        return {**result, "valid": False, "errors": ["entry is not part of the chain"]}
+    errors = [] if _entry_hash_of(entry) == entry.entry_hash else ["contents do not match entry_hash"]
+
+    checkpoint = db.query(Checkpoint).filter(
+        Checkpoint.document_id == entry.document_id,
+        Checkpoint.seq_start <= entry.seq,
+        Checkpoint.seq_end >= entry.seq
+    ).first()
+    if checkpoint:
+        hashes = _block_hashes(db, entry.document_id, checkpoint.seq_start, checkpoint.seq_end)
+        proof = merkle_proof(hashes, entry.seq - checkpoint.seq_start)
+        if not verify_merkle_proof(entry.entry_hash, proof, checkpoint.root_hash):
+            errors.append("Merkle proof does not reach the checkpoint root")
+        result["checkpoint"] = {"seq_start": checkpoint.seq_start, "seq_end": checkpoint.seq_end, "root_hash": checkpoint.root_hash}
+        result["proof"] = [{"side": side, "hash": h} for side, h in proof]
+    else:
+        tail_start = (entry.seq - 1) // AUDIT_CHECKPOINT_INTERVAL * AUDIT_CHECKPOINT_INTERVAL + 1
+        errors.extend(verify_trail(db, entry.document_id, tail_start, entry.seq)["errors"])
+    return {**result, "valid": not errors, "errors": errors}
+
+def seal_existing(conn, document_ids=None):
+    """
+    Chain entries that predate hashing (migration 007), oldest first per document.
+    Works on a Connection so it can run inside a migration transaction.
+    """
+    logs = models.AuditLog.__table__
+    checkpoints = models.AuditCheckpoint.__table__
+    query = select(logs).where(logs.c.seq.is_(None)).order_by(logs.c.document_id, logs.c.created_at, logs.c.id)
+    if document_ids is not None:
+        query = query.where(logs.c.document_id.in_(document_ids))
+
+    state = {}
+    for row in conn.execute(query).all():
+        if row.document_id not in state:
+            head = conn.execute(
+                select(logs.c.seq, logs.c.entry_hash)
+                .where(logs.c.document_id == row.document_id, logs.c.seq.isnot(None))
+                .order_by(logs.c.seq.desc()).limit(1)
+            ).first()
+            state[row.document_id] = {"seq": head.seq if head else 0, "hash": head.entry_hash if head else GENESIS_HASH, "block": []}
+        chain = state[row.document_id]
+        seq = chain["seq"] + 1
+        # Server-side defaults never filled created_at on some legacy rows
+        created_at = row.created_at or datetime(1970, 1, 1)
+        entry_hash = compute_entry_hash(chain["hash"], row.document_id, seq, row.user_id, row.action, row.details, created_at)
+        conn.execute(
+            logs.update().where(logs.c.id == row.id)
+            .values(seq=seq, prev_hash=chain["hash"], entry_hash=entry_hash, created_at=created_at)
+        )
+        chain.update(seq=seq, hash=entry_hash)
+        if seq % AUDIT_CHECKPOINT_INTERVAL == 0:
+            seq_start = seq - AUDIT_CHECKPOINT_INTERVAL + 1
+            hashes = list(conn.execute(
+                select(logs.c.entry_hash)
+                .where(logs.c.document_id == row.document_id, logs.c.seq.between(seq_start, seq))
+                .order_by(logs.c.seq)
+            ).scalars())
+            previous = conn.execute(
+                select(checkpoints.c.root_hash)
+                .where(checkpoints.c.document_id == row.document_id)
+                .order_by(checkpoints.c.seq_end.desc()).limit(1)
+            ).scalar()
+            conn.execute(checkpoints.insert().values(
+                document_id=row.document_id, seq_start=seq_start, seq_end=seq,
+                root_hash=merkle_root(hashes), prev_root_hash=previous or GENESIS_HASH
+            ))
+
+def main():
+    from ..database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Verify document audit trails")
+    parser.add_argument("document_ids", nargs="*", type=int)
+    parser.add_argument("--all", action="store_true", help="verify every document")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        document_ids = args.document_ids
+        if args.all:
+            document_ids = list(db.execute(select(models.Document.id).order_by(models.Document.id)).scalars())
+        elif not document_ids:
+            parser.error("give document ids or --all")
+        failed = 0
+        for document_id in document_ids:
+            report = verify_trail(db, document_id)
+            print(f"document {document_id}: {'ok' if report['valid'] else 'TAMPERED'} "
+                  f"({report['entries_checked']} entries, {report['checkpoints_checked']} checkpoints)")
+            for error in report["errors"]:
+                print(f"  {error}")
+            failed += not report["valid"]
+    finally:
+        db.close()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
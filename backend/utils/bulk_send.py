@@ -0,0 +1,119 @@
+import logging
+import os
+import secrets
+from sqlalchemy import insert, func
+from .. import models
+from .audit_chain import sealed_entry
+from .outbox import enqueue_signing_requests, dispatch_outbox
+from .search import index_documents_text
+
+logger = logging.getLogger(__name__)
+
+# Recipients per transaction
+BULK_SEND_CHUNK_SIZE = int(os.getenv("BULK_SEND_CHUNK_SIZE", "100"))
+
+LAYOUT_COLUMNS = ["page_number", "x_position", "y_position", "width", "height", "signer_email"]
+
+def load_layout(db, job: models.BulkSendJob) -> tuple:
+    """Return (file_path, field layout rows) for the job's template or source document."""
+    if job.template_id is not None:
+        source = db.query(models.Template).filter(models.Template.id == job.template_id).first()
+        fields = source.fields
+    else:
+        source = db.query(models.Document).filter(models.Document.id == job.source_document_id).first()
+        fields = source.signature_fields
+    layout = [{c: getattr(f, c) for c in LAYOUT_COLUMNS} for f in fields]
+    return source.file_path, layout
+
+def create_chunk(db, job: models.BulkSendJob, file_path: str, layout: list, recipients: list, sender_name: str) -> list:
+    """
+    Create one pending document per recipient, sharing the stored original, with a
+    handful of executemany statements: documents, fields, audit logs and outbox rows.
+    Returns the new document ids.
+    """
+    documents = [
+        {
+            "title": f"{job.title} - {r['name'] or r['email']}",
+            "file_path": file_path,
+            "user_id": job.user_id,
+            "status": models.DocumentStatus.PENDING,
+            "signing_token": secrets.token_urlsafe(32),
+        }
+        for r in recipients
+    ]
+    created = db.execute(
+        insert(models.Document).returning(
+            models.Document.id, models.Document.title, models.Document.signing_token,
+            sort_by_parameter_order=True
+        ),
+        documents
+    ).all()
+
+    field_rows, audit_rows, outbox_rows = [], [], []
+    for (document_id, title, token), recipient in zip(created, recipients):
+        signers = set()
+        for field in layout:
+            # Unassigned fields go to the recipient; fixed signers (e.g. a countersigner) stay
+            signer = field["signer_email"] or recipient["email"]
+            signers.add(signer)
+            field_rows.append({**field, "signer_email": signer, "document_id": document_id, "status": "pending"})
+        # First entry of a brand-new document's chain
+        audit_rows.append(sealed_entry(document_id, job.user_id, "send", f"Document sent for signing (bulk send {job.id})"))
+        outbox_rows.extend(
+            {
+                "bulk_job_id": job.id,
+                "document_id": document_id,
+                "recipient": signer,
+                "document_title": title,
+                "signing_token": token,
+                "sender_name": sender_name,
+            }
+            for signer in sorted(signers)
+        )
+
+    if field_rows:
+        db.execute(insert(models.SignatureField), field_rows)
+    db.execute(insert(models.AuditLog), audit_rows)
+    enqueue_signing_requests(db, outbox_rows)
+    return [document_id for document_id, _, _ in created]
+
+def run_bulk_send(session_factory, job_id: int, recipients: list, sender_name: str):
+    """
+    Background entrypoint: create every document in chunked transactions, then send.
+    If a chunk fails, the chunks committed before it are still sent; emails that
+    can't be sent now stay pending for `python -m backend.utils.outbox`.
+    """
+    document_ids = []
+    db = session_factory()
+    try:
+        job = db.query(models.BulkSendJob).filter(models.BulkSendJob.id == job_id).first()
+        job.status = "running"
+        db.commit()
+
+        try:
+            file_path, layout = load_layout(db, job)
+            for start in range(0, len(recipients), BULK_SEND_CHUNK_SIZE):
+                chunk = recipients[start:start + BULK_SEND_CHUNK_SIZE]
+                created = create_chunk(db, job, file_path, layout, chunk, sender_name)
+                job.created_count = (job.created_count or 0) + len(created)
+                db.commit()
+                document_ids.extend(created)
+        except Exception as e:
+            db.rollback()
+            logger.exception("Bulk send %s failed", job_id)
+            job.status = "failed"
+            job.error = str(e)
+            job.completed_at = func.now()
+            db.commit()
+            return
+
+        job.status = "completed"
+        job.completed_at = func.now()
+        db.commit()
+    finally:
+        db.close()
+        # Outbox rows are committed with their chunk, so a failed job still has some
+        dispatch_outbox(session_factory, bulk_job_id=job_id)
+        # After the emails; every document shares one original, extracted once
+        if document_ids:
+            index_documents_text(session_factory, document_ids)
@@ -0,0 +1,170 @@
+"""
+Cold tier for originals of completed documents.
+
+Once every document sharing an original has been COMPLETED for COLD_TIER_AGE_DAYS
+(and no template still points at it), the original is only read again for audits or
+a recall. The tiering job moves such files into a content-addressed store under
+UPLOAD_DIR/cold/, compressing each distinct file once (zstd when `zstandard` is
+installed, gzip otherwise), and leaves a small `<file>.cold` pointer in place of the
+original. Identical originals uploaded separately end up sharing one blob.
+
+LocalStorage reads through the pointer transparently with a streaming decompressor,
+so nothing that goes through utils/storage.py notices the difference. Run it from
+cron:
+
+    python -m backend.utils.cold_tier --older-than-days 30 [--dry-run]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO
+from sqlalchemy import select, func, case
+from .. import models
+from ..database import UPLOAD_DIR
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip when zstandard isn't installed
+    zstandard = None
+
+COLD_DIR = os.path.join(UPLOAD_DIR, "cold")
+POINTER_SUFFIX = ".cold"
+COLD_TIER_AGE_DAYS = int(os.getenv("COLD_TIER_AGE_DAYS", "30"))
+COLD_TIER_ZSTD_LEVEL = int(os.getenv("COLD_TIER_ZSTD_LEVEL", "10"))
+COPY_BUFFER_SIZE = 1024 * 1024
+
+CODEC_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+def pointer_path(ref: str) -> str:
+    return ref + POINTER_SUFFIX
+
+def read_pointer(ref: str) -> dict:
+    with open(pointer_path(ref)) as f:
+        return json.load(f)
+
+def is_cold(ref: str) -> bool:
+    return not os.path.exists(ref) and os.path.exists(pointer_path(ref))
+
+def open_cold(ref: str) -> BinaryIO:
+    """Streaming, decompressing reader over a tiered file."""
+    pointer = read_pointer(ref)
+    blob = os.path.join(UPLOAD_DIR, pointer["blob"])
+    if pointer["codec"] == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"{ref} is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().stream_reader(open(blob, "rb"), closefd=True)
+    return gzip.open(blob, "rb")
+
+def _compress(src: BinaryIO, dst: BinaryIO, codec: str):
+    if codec == "zstd":
+        zstandard.ZstdCompressor(level=COLD_TIER_ZSTD_LEVEL).copy_stream(src, dst)
+    else:
+        with gzip.GzipFile(fileobj=dst, mode="wb", mtime=0) as out:
+            shutil.copyfileobj(src, out, COPY_BUFFER_SIZE)
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_BUFFER_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def freeze(ref: str, codec: str = None) -> dict:
+    """
+    Move one local file into the cold store. Returns the bytes it occupied and the
+    bytes newly written (0 when an identical blob already existed).
+    """
+    codec = codec or default_codec()
+    size = os.path.getsize(ref)
+    sha = _sha256(ref)
+    blob_name = f"cold/{sha}{CODEC_EXTENSIONS[codec]}"
+    blob = os.path.join(UPLOAD_DIR, blob_name)
+
+    written = 0
+    if not os.path.exists(blob):
+        os.makedirs(COLD_DIR, exist_ok=True)
+        # Compress beside the target and rename, so a crash never leaves a torn blob
+        fd, tmp = tempfile.mkstemp(dir=COLD_DIR, suffix=".tmp")
+        try:
+            with open(ref, "rb") as src, os.fdopen(fd, "wb") as dst:
+                _compress(src, dst, codec)
+            os.replace(tmp, blob)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        written = os.path.getsize(blob)
+
+    with open(pointer_path(ref), "w") as f:
+        json.dump({"blob": blob_name, "codec": codec, "size": size, "sha256": sha}, f)
+    os.remove(ref)
+    return {"bytes_before": size, "bytes_written": written, "deduplicated": written == 0}
+
+def thaw(ref: str):
+    """Restore a tiered file in place (e.g. when its document goes back to draft)."""
+    if not is_cold(ref):
+        return
+    tmp = ref + ".tmp"
+    with open_cold(ref) as src, open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+    os.replace(tmp, ref)
+    os.remove(pointer_path(ref))
+
+def cold_candidates(db, older_than: datetime) -> list:
+    """Originals whose every document was completed before `older_than`."""
+    Document = models.Document
+    not_completed = func.sum(case((Document.status != models.DocumentStatus.COMPLETED, 1), else_=0))
+    # Completed before completion times were recorded and with no audit entry to
+    # backfill from: creation is the best bound left
+    completed_at = func.coalesce(Document.completed_at, Document.created_at)
+    query = (
+        select(Document.file_path)
+        .where(Document.file_path.notin_(select(models.Template.file_path)))
+        .group_by(Document.file_path)
+        .having(not_completed == 0, func.max(completed_at) < older_than)
+    )
+    return list(db.execute(query).scalars())
+
+def tier_cold_originals(db, older_than_days: int = COLD_TIER_AGE_DAYS, dry_run: bool = False) -> dict:
+    older_than = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    report = {"files": 0, "deduplicated": 0, "bytes_before": 0, "bytes_after": 0, "dry_run": dry_run}
+    for ref in cold_candidates(db, older_than):
+        # Only local files (not S3 refs) that haven't been tiered already
+        if ref.startswith("s3://") or not os.path.exists(ref):
+            continue
+        report["files"] += 1
+        if dry_run:
+            report["bytes_before"] += os.path.getsize(ref)
+            continue
+        result = freeze(ref)
+        report["deduplicated"] += result["deduplicated"]
+        report["bytes_before"] += result["bytes_before"]
+        report["bytes_after"] += result["bytes_written"]
+    # A dry run can't know how well files would compress
+    report["bytes_reclaimed"] = None if dry_run else report["bytes_before"] - report["bytes_after"]
+    return report
+
+def main():
+    from ..database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Compress originals of completed documents into the cold tier")
+    parser.add_argument("--older-than-days", type=int, default=COLD_TIER_AGE_DAYS)
+    parser.add_argument("--dry-run", action="store_true", help="report candidates without moving anything")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = tier_cold_originals(db, args.older_than_days, args.dry_run)
+    finally:
+        db.close()
+    print(json.dumps(report))
+
+if __name__ == "__main__":
+    main()
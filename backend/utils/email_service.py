@@ -2,7 +2,7 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
-from typing import List
+from typing import List, Optional
 
 # Email configuration (use environment variables in production)
 SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
@@ -12,11 +12,25 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 FROM_EMAIL = os.getenv("FROM_EMAIL", SMTP_USER)
 APP_URL = os.getenv("APP_URL", "http://localhost:5173")
 
+def smtp_configured() -> bool:
+    return bool(SMTP_USER and SMTP_PASSWORD)
+
+def open_smtp_connection() -> smtplib.SMTP:
+    """
+    Open an authenticated SMTP connection. Callers sending many messages should
+    open one and pass it to send_signing_request instead of reconnecting per email.
+    """
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    server.starttls()
+    server.login(SMTP_USER, SMTP_PASSWORD)
+    return server
+
 def send_signing_request(
     signer_email: str,
     document_title: str,
     signing_token: str,
-    sender_name: str = "DocSign App"
+    sender_name: str = "DocSign App",
+    server: Optional[smtplib.SMTP] = None
 ) -> bool:
     """
     Send an email to a signer with a link to sign the document.
@@ -26,13 +40,14 @@ def send_signing_request(
         document_title: Title of the document to be signed
         signing_token: Unique token for the signing link
         sender_name: Name of the person/app sending the request
+        server: Open connection from open_smtp_connection() to reuse (optional)
     
     Returns:
         bool: True if email sent successfully, False otherwise
     """
     
     # Skip if SMTP not configured
-    if not SMTP_USER or not SMTP_PASSWORD:
+    if not smtp_configured():
         print(f"⚠️  SMTP not configured. Signing link: {APP_URL}/sign/{signing_token}")
         return False
     
@@ -103,10 +118,11 @@ def send_signing_request(
         msg.attach(part2)
         
         # Send email
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
+        if server is not None:
             server.sendmail(FROM_EMAIL, signer_email, msg.as_string())
+        else:
+            with open_smtp_connection() as server:
+                server.sendmail(FROM_EMAIL, signer_email, msg.as_string())
         
         print(f"✅ Email sent to {signer_email}")
         return True
@@ -0,0 +1,52 @@
+"""
+Document versions as HTTP validators.
+
+Document.version goes up on every change to a document or its fields (see
+bump_version) and is exposed as the ETag `"<id>-<version>"`:
+
+- GET with If-None-Match: 304 without a body when the client's copy is current
+- mutations with If-Match: 412 when the document changed since the client read it
+
+Writers that both pass the If-Match check are still caught: version is the mapper's
+version_id_col, so the losing UPDATE matches no row and SQLAlchemy raises
+StaleDataError, which main.py answers with a 412 as well.
+"""
+from typing import Optional
+from fastapi import HTTPException, Request, Response
+
+def document_etag(document) -> str:
+    return f'"{document.id}-{document.version}"'
+
+def _matches(header: str, etag: str) -> bool:
+    # Weak comparison: a W/ prefix (e.g. added by a compressing proxy) doesn't matter
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+def not_modified(request: Request, document) -> Optional[Response]:
+    """A 304 response if If-None-Match names the current version, else None."""
+    header = request.headers.get("if-none-match")
+    etag = document_etag(document)
+    if header is not None and _matches(header, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+def require_if_match(request: Request, document):
+    """412 unless If-Match (when sent) names the current version."""
+    header = request.headers.get("if-match")
+    etag = document_etag(document)
+    if header is not None and not _matches(header, etag):
+        raise HTTPException(
+            status_code=412,
+            detail="Document has changed; fetch it again and retry",
+            headers={"ETag": etag}
+        )
+
+def bump_version(document):
+    """Mark a change to the document or one of its fields; flushed with the next commit."""
+    document.version = (document.version or 0) + 1
+
+def with_etag(result, response: Response, document):
+    """Attach the document's ETag to a handler's result (an ORM object or a prebuilt Response)."""
+    target = result if isinstance(result, Response) else response
+    target.headers["ETag"] = document_etag(document)
+    return result
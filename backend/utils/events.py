@@ -0,0 +1,151 @@
+"""
+Document event pub/sub feeding the Server-Sent Events endpoints.
+
+Handlers publish after they commit (from the threadpool or the event loop); SSE
+connections subscribe to a channel per document (`document:<id>`) or per owner
+(`user:<id>`). The in-process backend only reaches viewers connected to the same
+worker; set EVENTS_BACKEND=redis (with REDIS_URL) to fan out across workers.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Per-subscriber buffer; a viewer that falls this far behind starts losing events
+SUBSCRIBER_QUEUE_SIZE = 100
+
+class Subscription:
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Next event, or None if nothing arrived within timeout seconds."""
+        raise NotImplementedError
+
+    async def close(self):
+        raise NotImplementedError
+
+class EventBackend:
+    def publish(self, channel: str, event: dict):
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str) -> Subscription:
+        raise NotImplementedError
+
+class _MemorySubscription(Subscription):
+    def __init__(self, backend, channel: str):
+        self.backend = backend
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event: dict):
+        # Runs on the subscriber's loop
+        if not self.queue.full():
+            self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.backend._remove(self)
+
+class InMemoryBackend(EventBackend):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, channel: str, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, event)
+            except RuntimeError:  # subscriber's loop already closed
+                self._remove(sub)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        sub = _MemorySubscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(sub)
+        return sub
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    def _remove(self, sub: _MemorySubscription):
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+class _RedisSubscription(Subscription):
+    def __init__(self, client, pubsub):
+        self.client = client
+        self.pubsub = pubsub
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message["data"])
+
+    async def close(self):
+        await self.pubsub.close()
+        await self.client.close()
+
+class RedisBackend(EventBackend):
+    """Cross-worker backend on Redis pub/sub (requires the `redis` package)."""
+    PREFIX = "docsign:"
+
+    def __init__(self, url: str):
+        import redis
+
+        self.url = url
+        self._publisher = redis.Redis.from_url(url)
+
+    def publish(self, channel: str, event: dict):
+        self._publisher.publish(self.PREFIX + channel, json.dumps(event, default=str))
+
+    async def subscribe(self, channel: str) -> Subscription:
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.PREFIX + channel)
+        return _RedisSubscription(client, pubsub)
+
+_broker = None
+
+def get_broker() -> EventBackend:
+    global _broker
+    if _broker is None:
+        _broker = RedisBackend(REDIS_URL) if EVENTS_BACKEND == "redis" else InMemoryBackend()
+    return _broker
+
+def publish_document_event(document, event_type: str, **data):
+    """
+    Publish an event about a document to its own channel and its owner's channel.
+    Never raises: a broken broker must not fail the request that triggered it.
+    """
+    event = {
+        "type": event_type,
+        "document_id": document.id,
+        "status": document.status.value if document.status else None,
+        **data,
+    }
+    try:
+        broker = get_broker()
+        broker.publish(f"document:{document.id}", event)
+        broker.publish(f"user:{document.user_id}", event)
+    except Exception:
+        logger.exception("Event publish failed for document %s", document.id)
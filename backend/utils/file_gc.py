@@ -0,0 +1,186 @@
+"""
+Mark-and-sweep garbage collection for UPLOAD_DIR.
+
+Nothing deletes stored files when they stop being referenced: a recall drops
+signed_file_path but leaves the signed PDF behind, a failed request can leave an
+upload that never got its Document row, and cold-tier blobs outlive the pointers
+that shared them. This job walks the upload directory in sorted order, asks the
+database in batches which of those paths are still referenced (Document.file_path,
+Document.signed_file_path, Template.file_path), and sweeps the rest:
+
+- files and `.cold` pointers nobody references, once older than the grace period
+  (so an upload whose row isn't committed yet is never touched). Age is the later of
+  mtime and ctime: a hard link made by shard_uploads.py keeps the file's old mtime
+  but updates its ctime
+- cold blobs no surviving pointer names
+
+Without an action the job only reports what it would sweep. Swept files are deleted
+with --delete, or moved under GC_QUARANTINE_DIR with --quarantine so a mistake can
+be undone. Only local storage is collected; use a bucket lifecycle rule for S3. Run
+it from cron once the dry run's list looks right:
+
+    python -m backend.utils.file_gc --list
+    python -m backend.utils.file_gc --grace-hours 24 --delete|--quarantine
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from sqlalchemy import select, union
+from .. import models
+from ..database import UPLOAD_DIR, DATA_DIR
+from .cold_tier import POINTER_SUFFIX
+
+GC_GRACE_HOURS = float(os.getenv("GC_GRACE_HOURS", "24"))
+GC_QUARANTINE_DIR = os.getenv("GC_QUARANTINE_DIR", os.path.join(DATA_DIR, "quarantine"))
+# Paths looked up per query; three IN lists of this size stay under SQLite's 999 variables
+GC_BATCH_SIZE = 300
+COLD_SUBDIR = "cold"
+
+def iter_stored_files(root: str = UPLOAD_DIR):
+    """
+    (relative path, DirEntry) for every file under root except the cold store, in
+    lexicographic path order. Only one directory listing is held at a time.
+    """
+    def walk(directory: str, prefix: str):
+        with os.scandir(directory) as entries:
+            # A trailing "/" on directories keeps the walk in full-path order
+            entries = sorted(entries, key=lambda e: e.name + ("/" if e.is_dir(follow_symlinks=False) else ""))
+        for entry in entries:
+            rel = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if rel != COLD_SUBDIR:
+                    yield from walk(entry.path, rel + "/")
+            elif entry.is_file(follow_symlinks=False):
+                yield rel, entry
+
+    if os.path.isdir(root):
+        yield from walk(root, "")
+
+def _batches(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def referenced_refs(db, refs: list) -> set:
+    """The subset of refs some document or template still points at."""
+    Document, Template = models.Document, models.Template
+    query = union(
+        select(Document.file_path).where(Document.file_path.in_(refs)),
+        select(Document.signed_file_path).where(Document.signed_file_path.in_(refs)),
+        select(Template.file_path).where(Template.file_path.in_(refs)),
+    )
+    return set(db.execute(query).scalars())
+
+def _changed_at(entry) -> float:
+    stat = entry.stat(follow_symlinks=False)
+    return max(stat.st_mtime, stat.st_ctime)
+
+def _pointer_blob(path: str):
+    try:
+        with open(path) as f:
+            return json.load(f)["blob"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+class _Sweeper:
+    def __init__(self, root: str, mode: str, quarantine_dir: str, list_paths: bool):
+        self.root = root
+        self.mode = mode
+        self.quarantine_dir = quarantine_dir
+        self.list_paths = list_paths
+        self.report = {
+            "mode": mode, "scanned": 0, "referenced": 0, "recent": 0,
+            "orphan_files": 0, "orphan_blobs": 0, "bytes": 0,
+        }
+        if list_paths:
+            self.report["paths"] = []
+
+    def sweep(self, rel: str, entry, kind: str):
+        self.report[kind] += 1
+        self.report["bytes"] += entry.stat(follow_symlinks=False).st_size
+        if self.list_paths:
+            self.report["paths"].append(rel)
+        if self.mode == "delete":
+            os.remove(entry.path)
+        elif self.mode == "quarantine":
+            target = os.path.join(self.quarantine_dir, rel)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(entry.path, target)
+
+def collect_garbage(db, root: str = UPLOAD_DIR, grace_hours: float = GC_GRACE_HOURS, mode: str = "dry-run",
+                    quarantine_dir: str = None, list_paths: bool = False, now: float = None) -> dict:
+    """
+    Sweep unreferenced files under root. mode is "dry-run" (report only), "delete" or
+    "quarantine" (move under quarantine_dir, one subdirectory per run). now (a Unix
+    time) defaults to the current time.
+    """
+    if mode not in ("dry-run", "delete", "quarantine"):
+        raise ValueError(f"Unknown GC mode {mode!r}")
+    cutoff = (time.time() if now is None else now) - grace_hours * 3600
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    sweeper = _Sweeper(root, mode, os.path.join(quarantine_dir or GC_QUARANTINE_DIR, run), list_paths)
+    report = sweeper.report
+    live_blobs = set()
+
+    # Mark and sweep stored files, one sorted batch of paths per query
+    for batch in _batches(iter_stored_files(root), GC_BATCH_SIZE):
+        # A cold pointer stands in for the ref it was frozen from
+        refs = {
+            rel: os.path.join(root, rel[:-len(POINTER_SUFFIX)] if rel.endswith(POINTER_SUFFIX) else rel)
+            for rel, _ in batch
+        }
+        live = referenced_refs(db, list(set(refs.values())))
+        for rel, entry in batch:
+            report["scanned"] += 1
+            is_pointer = rel.endswith(POINTER_SUFFIX)
+            if refs[rel] in live:
+                report["referenced"] += 1
+            elif _changed_at(entry) > cutoff:
+                report["recent"] += 1
+            else:
+                sweeper.sweep(rel, entry, "orphan_files")
+                continue
+            if is_pointer:
+                live_blobs.add(_pointer_blob(entry.path))
+
+    # Then cold blobs (and torn .tmp compressions) no surviving pointer names
+    cold_dir = os.path.join(root, COLD_SUBDIR)
+    if os.path.isdir(cold_dir):
+        with os.scandir(cold_dir) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                rel = f"{COLD_SUBDIR}/{entry.name}"
+                if not entry.is_file(follow_symlinks=False) or rel in live_blobs:
+                    continue
+                if _changed_at(entry) > cutoff:
+                    report["recent"] += 1
+                    continue
+                sweeper.sweep(rel, entry, "orphan_blobs")
+    return report
+
+def main():
+    from ..database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Delete or quarantine stored files nothing references")
+    parser.add_argument("--grace-hours", type=float, default=GC_GRACE_HOURS,
+                        help="leave files younger than this alone")
+    # Reporting only unless an action is asked for
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--delete", action="store_true", help="delete swept files")
+    action.add_argument("--quarantine", action="store_true", help=f"move swept files under {GC_QUARANTINE_DIR}")
+    parser.add_argument("--list", action="store_true", help="include every swept path in the report")
+    args = parser.parse_args()
+
+    mode = "delete" if args.delete else "quarantine" if args.quarantine else "dry-run"
+    db = SessionLocal()
+    try:
+        report = collect_garbage(db, grace_hours=args.grace_hours, mode=mode, list_paths=args.list)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2 if args.list else None))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Idempotency-Key support for the endpoints clients retry.
+
+A signer on a flaky mobile connection often never sees the response to a sign or
+upload and sends it again. When such a request carries an `Idempotency-Key` header,
+the first one runs and its response (status, body, ETag) is kept, zlib-compressed,
+in idempotency_keys for IDEMPOTENCY_TTL seconds. Retries with the same key get the
+stored response back, marked `Idempotent-Replayed: true`, without reaching the
+handler: no second upload, audit entry, PDF merge or signing email.
+
+Keys are scoped to method, path and caller (the Authorization header, or the signing
+token in public paths), so one caller's key never replays another's response.
+Reusing a key for a different request body is a 422. A retry that arrives while the
+first attempt is still running gets a 409. 5xx responses aren't kept, so the client
+can retry those for real.
+
+An in-progress claim is a lease of IDEMPOTENCY_LEASE seconds. If the worker running
+the first attempt dies (OOM kill, SIGKILL) the claim is never completed or released;
+once the lease has run out the next retry takes the key over and runs the request,
+instead of getting 409s until the key expires. The lease must outlast the slowest
+legitimate request (a sign that completes and flattens a large document).
+"""
+import hashlib
+import json
+import os
+import re
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from .. import models
+from ..database import get_db
+
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", str(24 * 3600)))
+IDEMPOTENCY_LEASE = int(os.getenv("IDEMPOTENCY_LEASE", "600"))
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENT_ROUTES = [
+    ("POST", re.compile(r"^/api/docs/upload/?$")),
+    ("PUT", re.compile(r"^/api/docs/\d+/send$")),
+    ("POST", re.compile(r"^/api/docs/\d+/fields/\d+/sign$")),
+    ("POST", re.compile(r"^/api/docs/public/[^/]+/fields/\d+/sign$")),
+]
+
+def is_idempotent_route(method: str, path: str) -> bool:
+    return any(method == m and pattern.match(path) for m, pattern in IDEMPOTENT_ROUTES)
+
+def request_scope(method: str, path: str, authorization: bytes) -> str:
+    digest = hashlib.sha256(f"{method} {path}".encode())
+    digest.update(b"\0" + authorization)
+    return digest.hexdigest()
+
+class RequestHasher:
+    """
+    sha256 of query string + body, fed as the body streams past. Multipart bodies are
+    hashed without their boundary, which clients pick at random for every attempt.
+    """
+    def __init__(self, query_string: bytes, content_type: bytes):
+        self.digest = hashlib.sha256(query_string + b"\0")
+        match = re.search(rb"boundary=\"?([^\";]+)", content_type)
+        self.boundary = match.group(1) if match else None
+        self.tail = b""
+
+    def update(self, chunk: bytes):
+        if self.boundary is None:
+            self.digest.update(chunk)
+            return
+        buffer = (self.tail + chunk).replace(self.boundary, b"")
+        # Keep enough back that a boundary split across chunks is still caught
+        keep = len(self.boundary) - 1
+        self.digest.update(buffer[:-keep] if keep else buffer)
+        self.tail = buffer[-keep:] if keep else b""
+
+    def hexdigest(self) -> str:
+        self.digest.update(self.tail)
+        self.tail = b""
+        return self.digest.hexdigest()
+
+@contextmanager
+def _session(app):
+    # Same session source as the routes, so dependency overrides (tests) apply here too
+    provider = app.dependency_overrides.get(get_db, get_db)
+    sessions = provider()
+    try:
+        yield next(sessions)
+    finally:
+        sessions.close()
+
+def _record_dict(record) -> dict:
+    return {
+        "request_hash": record.request_hash,
+        "status_code": record.status_code,
+        "content_type": record.content_type,
+        "etag": record.etag,
+        "body": zlib.decompress(record.body) if record.body is not None else b"",
+    }
+
+def claim(app, scope: str, key: str):
+    """
+    Reserve the key for this request. Returns None if it was free, otherwise what is
+    stored for it (status_code None while the first request is still running).
+    """
+    now = datetime.now(timezone.utc)
+    Key = models.IdempotencyKey
+    with _session(app) as db:
+        db.query(Key).filter(Key.expires_at < now).delete(synchronize_session=False)
+        db.commit()
+        existing = db.query(Key).filter(Key.scope == scope, Key.key == key).first()
+        lease = now + timedelta(seconds=IDEMPOTENCY_LEASE)
+        if existing is not None:
+            if existing.status_code is None:
+                # Take over a claim whose worker died; the conditional UPDATE lets only one retry win
+                stale = db.query(Key).filter(
+                    Key.id == existing.id, Key.status_code.is_(None),
+                    (Key.locked_until.is_(None)) | (Key.locked_until < now),
+                ).update({"locked_until": lease, "created_at": now}, synchronize_session=False)
+                db.commit()
+                if stale:
+                    return None
+                db.expire_all()
+                existing = db.query(Key).filter(Key.scope == scope, Key.key == key).one()
+            return _record_dict(existing)
+        db.add(Key(scope=scope, key=key, created_at=now, locked_until=lease,
+                   expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL)))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            # A concurrent retry claimed it first
+            db.rollback()
+            return _record_dict(db.query(Key).filter(Key.scope == scope, Key.key == key).one())
+
+def complete(app, scope: str, key: str, request_hash: str, status_code: int, headers: dict, body: bytes):
+    Key = models.IdempotencyKey
+    with _session(app) as db:
+        db.query(Key).filter(Key.scope == scope, Key.key == key).update({
+            "request_hash": request_hash,
+            "status_code": status_code,
+            "content_type": headers.get(b"content-type", b"").decode("latin-1") or None,
+            "etag": headers.get(b"etag", b"").decode("latin-1") or None,
+            "body": zlib.compress(body),
+        }, synchronize_session=False)
+        db.commit()
+
+def release(app, scope: str, key: str):
+    """Forget a key whose request failed, so a retry runs it again."""
+    Key = models.IdempotencyKey
+    with _session(app) as db:
+        db.query(Key).filter(Key.scope == scope, Key.key == key).delete(synchronize_session=False)
+        db.commit()
+
+async def _send_json(send, status: int, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class IdempotencyMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not is_idempotent_route(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        raw_key = headers.get(b"idempotency-key")
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        key = raw_key.decode("latin-1").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        app = scope["app"]
+        key_scope = request_scope(scope["method"], scope["path"], headers.get(b"authorization", b""))
+        hasher = RequestHasher(scope.get("query_string", b""), headers.get(b"content-type", b""))
+        body_done = False
+
+        async def hashing_receive():
+            nonlocal body_done
+            message = await receive()
+            if message["type"] == "http.request":
+                hasher.update(message.get("body", b""))
+                body_done = not message.get("more_body", False)
+            elif message["type"] == "http.disconnect":
+                body_done = True
+            return message
+
+        async def drain():
+            while not body_done:
+                await hashing_receive()
+            return hasher.hexdigest()
+
+        stored = await run_in_threadpool(claim, app, key_scope, key)
+        if stored is not None:
+            request_hash = await drain()
+            if stored["status_code"] is None:
+                await _send_json(send, 409, "A request with this Idempotency-Key is still in progress")
+            elif stored["request_hash"] != request_hash:
+                await _send_json(send, 422, "Idempotency-Key was already used for a different request")
+            else:
+                await self._replay(send, stored)
+            return
+
+        response = {"status": 500, "headers": {}, "body": []}
+
+        async def capturing_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = {name.lower(): value for name, value in message.get("headers", [])}
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, hashing_receive, capturing_send)
+            # Handlers that fail early may not read the whole body; a retry hashes all of it
+            request_hash = await drain()
+        except BaseException:
+            await run_in_threadpool(release, app, key_scope, key)
+            raise
+        if response["status"] >= 500:
+            await run_in_threadpool(release, app, key_scope, key)
+        else:
+            await run_in_threadpool(
+                complete, app, key_scope, key, request_hash,
+                response["status"], response["headers"], b"".join(response["body"])
+            )
+
+    async def _replay(self, send, stored: dict):
+        headers = [(b"content-length", str(len(stored["body"])).encode()), (b"idempotent-replayed", b"true")]
+        if stored["content_type"]:
+            headers.append((b"content-type", stored["content_type"].encode("latin-1")))
+        if stored["etag"]:
+            headers.append((b"etag", stored["etag"].encode("latin-1")))
+        await send({"type": "http.response.start", "status": stored["status_code"], "headers": headers})
+        await send({"type": "http.response.body", "body": stored["body"]})
@@ -0,0 +1,84 @@
+"""
+Per-process memory budget for heavy PDF work, plus RSS readings to check it against.
+
+MemoryBudget is a weighted semaphore: each job reserves its estimated peak bytes and
+waits until they fit under the budget. Waiters are served in arrival order, so a big
+job isn't starved by a stream of small ones; a job estimated above the whole budget
+runs alone.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+class MemoryBudget:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self._cond = threading.Condition()
+        self._queue = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def acquire(self, cost: int, timeout: float = None) -> int:
+        """Reserve cost bytes (capped at capacity) and return what was reserved."""
+        cost = min(max(cost, 0), self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+        with self._cond:
+            self._queue.append(ticket)
+            try:
+                while self._queue[0] is not ticket or self.in_use + cost > self.capacity:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No room for {cost // MB}MB in a {self.capacity // MB}MB budget")
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+                raise
+            self._queue.popleft()
+            self.in_use += cost
+            # The next in line may fit as well
+            self._cond.notify_all()
+        return cost
+
+    def release(self, cost: int):
+        with self._cond:
+            self.in_use -= cost
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, cost: int, timeout: float = None):
+        granted = self.acquire(cost, timeout)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (0 where it can't be read)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+def peak_rss() -> int:
+    """Highest RSS this process has reached, in bytes."""
+    if resource is None:
+        return current_rss()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes; getrusage and /proc round differently
+    return max(peak if sys.platform == "darwin" else peak * 1024, current_rss())
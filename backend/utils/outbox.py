@@ -0,0 +1,110 @@
+"""
+Transactional outbox for signing-request emails.
+
+Rows are inserted in the same transaction as the documents they announce and sent
+afterwards by dispatch_outbox. Rows left pending (SMTP down, a worker that died
+before dispatching) are retried by running the dispatcher from cron:
+
+    python -m backend.utils.outbox [--bulk-job ID]
+"""
+import argparse
+import json
+import logging
+import os
+from sqlalchemy import insert, func
+from sqlalchemy.orm import Session
+from .. import models
+from .email_service import send_signing_request, open_smtp_connection, smtp_configured
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched and sent per SMTP connection
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "3"))
+
+def enqueue_signing_requests(db: Session, rows: list) -> int:
+    """
+    Queue signing-request emails with a single executemany INSERT. Each row is a dict
+    of EmailOutbox columns (recipient, document_id, document_title, signing_token, ...).
+    Does not commit: the rows land in the caller's transaction with the documents.
+    """
+    if rows:
+        db.execute(insert(models.EmailOutbox), rows)
+    return len(rows)
+
+def outbox_counts(db: Session, bulk_job_id: int) -> dict:
+    rows = db.query(models.EmailOutbox.status, func.count(models.EmailOutbox.id)).filter(
+        models.EmailOutbox.bulk_job_id == bulk_job_id
+    ).group_by(models.EmailOutbox.status).all()
+    counts = {"pending": 0, "sent": 0, "failed": 0}
+    counts.update({status: count for status, count in rows})
+    return counts
+
+def dispatch_outbox(session_factory, bulk_job_id: int = None) -> dict:
+    """
+    Send pending outbox emails in id order, one SMTP connection per batch. Each row is
+    attempted at most once per call; rows that fail stay pending until they run out
+    of attempts, then are marked failed.
+    """
+    results = {"sent": 0, "failed": 0}
+    last_id = 0
+    while True:
+        db = session_factory()
+        try:
+            query = db.query(models.EmailOutbox).filter(
+                models.EmailOutbox.status == "pending",
+                models.EmailOutbox.id > last_id
+            )
+            if bulk_job_id is not None:
+                query = query.filter(models.EmailOutbox.bulk_job_id == bulk_job_id)
+            batch = query.order_by(models.EmailOutbox.id).limit(OUTBOX_BATCH_SIZE).all()
+            if not batch:
+                return results
+
+            server = None
+            if smtp_configured():
+                try:
+                    server = open_smtp_connection()
+                except Exception:
+                    logger.exception("Outbox: SMTP connection failed, sending one by one")
+
+            try:
+                for row in batch:
+                    sent = send_signing_request(
+                        signer_email=row.recipient,
+                        document_title=row.document_title,
+                        signing_token=row.signing_token,
+                        sender_name=row.sender_name or "DocSign App",
+                        server=server
+                    )
+                    row.attempts = (row.attempts or 0) + 1
+                    if sent:
+                        row.status = "sent"
+                        row.sent_at = func.now()
+                        results["sent"] += 1
+                    elif row.attempts >= OUTBOX_MAX_ATTEMPTS:
+                        row.status = "failed"
+                        results["failed"] += 1
+            finally:
+                if server is not None:
+                    try:
+                        server.quit()
+                    except Exception:
+                        # The batch was sent; only the goodbye failed
+                        logger.exception("Outbox: closing the SMTP connection failed")
+
+            last_id = batch[-1].id
+            db.commit()
+        finally:
+            db.close()
+
+def main():
+    from ..database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Send pending signing-request emails")
+    parser.add_argument("--bulk-job", type=int, default=None, help="only this bulk send's emails")
+    args = parser.parse_args()
+    print(json.dumps(dispatch_outbox(SessionLocal, bulk_job_id=args.bulk_job)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Sandboxed PDF inspection worker, run as a script by pdf_validation.py:
+
+    python -I pdf_inspect.py <path> <cpu seconds> <memory MB> [--anchors MAX_PAGES] [--pages START:STOP] [--text CHARS]
+
+Imports PyMuPDF, then caps its own CPU time, address space growth, file writes and
+core dumps before touching the file, opens and walks every page, and prints one
+JSON line: {"ok": true, "pages": ..., "encrypted": ..., "repaired": ...} or
+{"ok": false, "error": ..., "detail": ...}. Exceeding the CPU limit kills the
+process; the parent reports that as a timeout. Only the standard library and
+PyMuPDF are imported here so the worker starts quickly, and this is the only code
+that reads an untrusted PDF's content.
+
+With --anchors the same walk also proposes signature fields ("proposals"), strongest
+anchor first:
+
+- AcroForm signature widgets: the field goes exactly over the widget
+- tags like `{{sig}}` or `{{sig:client@example.com}}`: the field is centred on the
+  tag; a signer that looks like an email becomes the field's signer_email
+- label phrases (ANCHOR_PHRASES, "Signature:" and "Sign here" by default): the field
+  goes right of the label on the same line, or above it when the line is full
+
+Proposals use the frontend's coordinate space, the one merge_signatures reads: the
+page scaled to 800px wide, x/y at the field's centre. Weaker anchors overlapping a
+stronger one (a "Signature:" label next to a tag) are dropped. Documents of
+MAX_PAGES pages or more get "proposals": null instead, for the caller to scan in
+page ranges (--pages) on several workers; 0 means no limit.
+
+With --text the walk also returns the plain text of the pages ("text"), up to CHARS
+characters, for the search index. Anchors and text are read from one text page per
+page, so an upload is parsed once for all three.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the parent's wall-clock timeout still applies
+    resource = None
+
+ANCHOR_PHRASES = [p.strip() for p in os.getenv("ANCHOR_PHRASES", "Signature:|Sign here").split("|") if p.strip()]
+ANCHOR_TAG = re.compile(r"\{\{sig(?::(?P<signer>[^{}\s]+))?\}\}", re.IGNORECASE)
+
+# Frontend page width and the size of a field dropped in the editor
+FIELD_SPACE_WIDTH = 800
+DEFAULT_FIELD_WIDTH = 150
+DEFAULT_FIELD_HEIGHT = 60
+# Gap between a label and the field placed after it
+LABEL_GAP = 8
+# Fields overlapping by more than this share of the smaller one are the same field
+OVERLAP_RATIO = 0.3
+SOURCE_PRIORITY = {"widget": 0, "tag": 1, "label": 2}
+
+def _vm_size() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+def _limit(cpu_seconds: int, memory_mb: int):
+    if resource is None:
+        return
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    vm_size = _vm_size()
+    if vm_size:
+        # On top of what the interpreter and MuPDF already map
+        limit = vm_size + memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _box(field: dict) -> tuple:
+    half_w, half_h = field["width"] / 2, field["height"] / 2
+    return (field["x_position"] - half_w, field["y_position"] - half_h,
+            field["x_position"] + half_w, field["y_position"] + half_h)
+
+def overlaps(a: dict, b: dict) -> bool:
+    ax0, ay0, ax1, ay1 = _box(a)
+    bx0, by0, bx1, by1 = _box(b)
+    width, height = min(ax1, bx1) - max(ax0, bx0), min(ay1, by1) - max(ay0, by0)
+    if width <= 0 or height <= 0:
+        return False
+    smaller = min(a["width"] * a["height"], b["width"] * b["height"])
+    return width * height > OVERLAP_RATIO * smaller
+
+def _field(page_number: int, page_height: float, x0: float, y0: float, x1: float, y1: float,
+           source: str, signer: str = None, label: str = None) -> dict:
+    """A proposal from a box in field space, kept inside the page."""
+    width, height = x1 - x0, y1 - y0
+    center_x = min(max((x0 + x1) / 2, width / 2), FIELD_SPACE_WIDTH - width / 2)
+    center_y = min(max((y0 + y1) / 2, height / 2), max(page_height - height / 2, height / 2))
+    return {
+        "page_number": page_number,
+        "x_position": round(center_x, 1),
+        "y_position": round(center_y, 1),
+        "width": round(width, 1),
+        "height": round(height, 1),
+        "signer_email": signer if signer and "@" in signer else None,
+        "source": source,
+        "label": label,
+    }
+
+def scan_page(page, textpage=None) -> list:
+    """Signature field proposals for one PyMuPDF page, strongest anchor first."""
+    import fitz
+
+    scale = FIELD_SPACE_WIDTH / page.rect.width
+    page_number = page.number + 1
+    page_height = page.rect.height * scale
+    # Extract once; tag and phrase lookups both read it
+    textpage = textpage or page.get_textpage()
+    found = []
+
+    for widget in page.widgets() or []:
+        if widget.field_type == fitz.PDF_WIDGET_TYPE_SIGNATURE:
+            r = widget.rect * scale
+            found.append(_field(page_number, page_height, r.x0, r.y0, r.x1, r.y1, "widget", label=widget.field_name))
+
+    for x0, y0, x1, y1, word, *_ in page.get_text("words", textpage=textpage):
+        match = ANCHOR_TAG.search(word)
+        if not match:
+            continue
+        center_x, center_y = (x0 + x1) / 2 * scale, (y0 + y1) / 2 * scale
+        width = max((x1 - x0) * scale, DEFAULT_FIELD_WIDTH)
+        signer = match.group("signer")
+        found.append(_field(
+            page_number, page_height,
+            center_x - width / 2, center_y - DEFAULT_FIELD_HEIGHT / 2,
+            center_x + width / 2, center_y + DEFAULT_FIELD_HEIGHT / 2,
+            "tag", signer=signer, label=signer,
+        ))
+
+    for phrase in ANCHOR_PHRASES:
+        for r in page.search_for(phrase, textpage=textpage):
+            r = r * scale
+            if r.x1 + LABEL_GAP + DEFAULT_FIELD_WIDTH <= FIELD_SPACE_WIDTH:
+                x0 = r.x1 + LABEL_GAP
+                y0 = (r.y0 + r.y1) / 2 - DEFAULT_FIELD_HEIGHT / 2
+            else:
+                # No room on the line: sign above the label
+                x0 = r.x0
+                y0 = r.y0 - LABEL_GAP - DEFAULT_FIELD_HEIGHT
+            found.append(_field(
+                page_number, page_height, x0, y0, x0 + DEFAULT_FIELD_WIDTH, y0 + DEFAULT_FIELD_HEIGHT,
+                "label", label=phrase,
+            ))
+
+    kept = []
+    for proposal in sorted(found, key=lambda f: SOURCE_PRIORITY[f["source"]]):
+        if not any(overlaps(proposal, other) for other in kept):
+            kept.append(proposal)
+    return sorted(kept, key=lambda f: (f["y_position"], f["x_position"]))
+
+def inspect(path: str, anchors: int = None, pages: tuple = None, text: int = None) -> dict:
+    import fitz
+
+    try:
+        doc = fitz.open(path, filetype="pdf")
+    except Exception as e:
+        return {"ok": False, "error": "malformed", "detail": str(e)[:200]}
+    try:
+        if not doc.is_pdf:
+            return {"ok": False, "error": "malformed", "detail": "Not a PDF"}
+        if doc.needs_pass:
+            return {"ok": False, "error": "password", "detail": "The PDF is password-protected"}
+        if doc.page_count == 0:
+            return {"ok": False, "error": "no_pages", "detail": "The PDF has no pages"}
+        start, stop = pages or (0, doc.page_count)
+        scan = anchors is not None and (not anchors or doc.page_count < anchors or pages is not None)
+        proposals, parts, size = [], [], 0
+        for index in range(start, min(stop, doc.page_count)):
+            page = doc[index]
+            # Page tree, resources and content streams all have to parse
+            page.bound()
+            page.read_contents()
+            wants_text = text is not None and size < text
+            textpage = page.get_textpage() if scan or wants_text else None
+            if scan:
+                proposals.extend(scan_page(page, textpage))
+            if wants_text:
+                chunk = page.get_text("text", textpage=textpage)
+                parts.append(chunk)
+                size += len(chunk)
+        report = {
+            "ok": True,
+            "pages": doc.page_count,
+            "encrypted": bool(doc.metadata.get("encryption")),
+            "repaired": bool(doc.is_repaired),
+            "version": doc.metadata.get("format") or None,
+        }
+        if anchors is not None:
+            report["proposals"] = proposals if scan else None
+        if text is not None:
+            report["text"] = "".join(parts)[:text]
+        return report
+    finally:
+        doc.close()
+
+def _page_range(value: str) -> tuple:
+    start, stop = value.split(":")
+    return int(start), int(stop)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("cpu_seconds", type=int)
+    parser.add_argument("memory_mb", type=int)
+    parser.add_argument("--anchors", type=int, default=None)
+    parser.add_argument("--pages", type=_page_range, default=None)
+    parser.add_argument("--text", type=int, default=None)
+    args = parser.parse_args()
+    import fitz  # noqa: F401  (loaded before the limits so they only cover the file's parsing)
+
+    _limit(args.cpu_seconds, args.memory_mb)
+    try:
+        result = inspect(args.path, anchors=args.anchors, pages=args.pages, text=args.text)
+    except MemoryError:
+        result = {"ok": False, "error": "memory", "detail": "Memory limit exceeded"}
+    except Exception as e:
+        message = str(e)
+        error = "memory" if "malloc" in message.lower() or "memory" in message.lower() else "malformed"
+        result = {"ok": False, "error": error, "detail": message[:200]}
+    sys.stdout.write(json.dumps(result) + "\n")
+    sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,268 @@
-import fitz
 import base64
+import inspect
+import logging
 import os
+import shutil
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
 from sqlalchemy.orm import Session
 from .. import models
+from .storage import get_storage, storage_for
+from .signatures import is_vector_signature, draw_vector_signature
+from .etag import bump_version
+from .memory_budget import MemoryBudget, current_rss, peak_rss, MB
+from .pdf_validation import ensure_validated
+
+logger = logging.getLogger(__name__)
+
+# Output profiles for signed PDFs (PyMuPDF Document.save options). Signed copies are
+# downloaded and emailed far more often than they are written, so the default spends
+# a little save time on a smaller file. See benchmarks/bench_pdf_save.py.
+PDF_SAVE_PROFILES = {
+    # Library defaults: quickest save, largest file
+    "fast": {},
+    # Drop unused/duplicate objects and deflate everything compressible
+    "balanced": {"garbage": 3, "deflate": True, "deflate_images": True, "deflate_fonts": True},
+    # Also pack objects into object streams and sanitize content streams
+    "compact": {
+        "garbage": 4, "clean": True, "deflate": True, "deflate_images": True,
+        "deflate_fonts": True, "use_objstms": 1,
+    },
+    # Linearized for progressive rendering in browsers (MuPDF < 1.24 only)
+    "web": {"garbage": 3, "deflate": True, "deflate_images": True, "deflate_fonts": True, "linear": True},
+}
+PDF_SAVE_PROFILE = os.getenv("PDF_SAVE_PROFILE", "balanced")
+
+# Memory-bounded flattening. A full save holds the file's largest stream in memory
+# (a 144MB scanned page: +140MB RSS) and rewrites every object, so originals of
+# FLATTEN_INCREMENTAL_MB or more are copied, stamped in place and saved
+# incrementally instead: only the stamped pages and new objects are written (+5MB
+# RSS on the same file). Either way the estimated peak is reserved from this
+# process's FLATTEN_MEMORY_BUDGET_MB before the PDF is opened.
+FLATTEN_MEMORY_BUDGET_MB = int(os.getenv("FLATTEN_MEMORY_BUDGET_MB", "512"))
+FLATTEN_INCREMENTAL_MB = int(os.getenv("FLATTEN_INCREMENTAL_MB", "32"))
+# Working set per page loaded, and a floor per flatten
+FLATTEN_PAGE_COST_MB = float(os.getenv("FLATTEN_PAGE_COST_MB", "2"))
+FLATTEN_BASE_COST_MB = float(os.getenv("FLATTEN_BASE_COST_MB", "8"))
+# How long a flatten waits for budget before giving up (seconds)
+FLATTEN_BUDGET_TIMEOUT = float(os.getenv("FLATTEN_BUDGET_TIMEOUT", "300"))
+
+flatten_budget = MemoryBudget(FLATTEN_MEMORY_BUDGET_MB * MB)
+_flatten_stats = {"count": 0, "incremental": 0, "timeouts": 0, "last": None}
+
+@lru_cache(maxsize=None)
+def check_save_profile(profile: str = None) -> str:
+    """The profile name, or ValueError if it isn't one of PDF_SAVE_PROFILES."""
+    profile = profile or PDF_SAVE_PROFILE
+    if profile not in PDF_SAVE_PROFILES:
+        raise ValueError(f"Unknown PDF save profile {profile!r}; choose from {', '.join(PDF_SAVE_PROFILES)}")
+    return profile
+
+def save_options(profile: str = None) -> dict:
+    """Document.save kwargs for a profile, minus options this PyMuPDF build can't honour."""
+    import fitz
+
+    profile = check_save_profile(profile)
+    options = dict(PDF_SAVE_PROFILES[profile])
+    supported = inspect.signature(fitz.Document.save).parameters
+    options = {name: value for name, value in options.items() if name in supported}
+    # MuPDF 1.24 dropped linearization and raises if asked for it
+    mupdf_version = tuple(int(part) for part in fitz.VersionBind.split(".")[:2])
+    if options.get("linear") and mupdf_version >= (1, 24):
+        logger.warning("MuPDF %s cannot linearize; saving profile %r without it", fitz.VersionBind, profile)
+        del options["linear"]
+    return options
+
+# In-flight flatten tracking so shutdown can drain them before the worker exits
+_flatten_cond = threading.Condition()
+_active_flattens = 0
+
+def active_flattens() -> int:
+    return _active_flattens
+
+def wait_for_flattens(timeout: float) -> bool:
+    """Block until no flatten is running or timeout expires. Returns True if drained."""
+    deadline = time.monotonic() + timeout
+    with _flatten_cond:
+        while _active_flattens:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _flatten_cond.wait(remaining)
+    return True
+
+def flatten_stats() -> dict:
+    """Budget use and the last flatten's memory readings (this worker only)."""
+    return {
+        **_flatten_stats,
+        "budget_mb": flatten_budget.capacity // MB,
+        "reserved_mb": round(flatten_budget.in_use / MB, 1),
+        "waiting": flatten_budget.waiting,
+        "active": _active_flattens,
+        "rss_mb": round(current_rss() / MB, 1),
+        "peak_rss_mb": round(peak_rss() / MB, 1),
+    }
+
+def flatten_cost(size: int, pages_touched: int, incremental: bool) -> int:
+    """Estimated peak bytes of one flatten."""
+    cost = (FLATTEN_BASE_COST_MB + pages_touched * FLATTEN_PAGE_COST_MB) * MB
+    if not incremental:
+        # A full rewrite streams every object; the largest is bounded by the file
+        cost += size
+    return int(cost)
 
 def merge_signatures(document_id: int, db: Session):
-    print(f"DEBUG: Processing PDF merge for document {document_id}")
+    global _active_flattens
+    with _flatten_cond:
+        _active_flattens += 1
+    try:
+        return _merge_signatures(document_id, db)
+    finally:
+        with _flatten_cond:
+            _active_flattens -= 1
+            _flatten_cond.notify_all()
+
+def _merge_signatures(document_id: int, db: Session):
+    logger.debug("Processing PDF merge for document %s", document_id)
     document = db.query(models.Document).filter(models.Document.id == document_id).first()
     if not document:
-        print(f"DEBUG: Document {document_id} not found for merging")
+        logger.warning("Document %s not found for merging", document_id)
         return None
 
     # Load original PDF
     pdf_path = document.file_path
-    if not os.path.exists(pdf_path):
-        print(f"DEBUG: Original PDF not found at {pdf_path}")
+    source = storage_for(pdf_path)
+    if not source.exists(pdf_path):
+        logger.error("Original PDF not found at %s", pdf_path)
+        return None
+    # Checked once at upload; only documents that predate validation are checked here
+    if not ensure_validated(db, document):
+        logger.warning("Not flattening document %s: PDF failed validation (%s)", document_id, document.pdf_error)
         return None
 
     try:
-        doc = fitz.open(pdf_path)
-        
-        # Process each signature field
-        for field in document.signature_fields:
-            if field.status != "signed" or not field.signature_data:
-                continue
-                
-            # Standardized coordinate scaling (matching 800px width from frontend)
-            # fitz page coordinates are in points (1 point = 1/72 inch)
-            page = doc[field.page_number - 1]
-            page_rect = page.rect
-            scale_factor = page_rect.width / 800
-            
-            # Convert base64 to image
-            try:
-                # Handle data:image/png;base64,... format
-                header, encoded = field.signature_data.split(",", 1)
-                img_bytes = base64.b64decode(encoded)
-                
-                # Signature boxes are centered in frontend: translate(-50%, -50%)
-                center_x = field.x_position * scale_factor
-                center_y = field.y_position * scale_factor
-                width = field.width * scale_factor
-                height = field.height * scale_factor
-                
-                # Rect for fitz: [x0, y0, x1, y1]
-                x0 = center_x - (width / 2)
-                y0 = center_y - (height / 2)
-                x1 = center_x + (width / 2)
-                y1 = center_y + (height / 2)
-                
-                rect = fitz.Rect(x0, y0, x1, y1)
-                page.insert_image(rect, stream=img_bytes)
-                print(f"DEBUG: Inserted signature into field {field.id}")
-            except Exception as e:
-                print(f"DEBUG: Error merging field {field.id}: {str(e)}")
-
-        # Save signed document
-        signed_filename = f"signed_{os.path.basename(pdf_path)}"
-        signed_path = os.path.join("uploads", signed_filename)
-        doc.save(signed_path)
-        doc.close()
+        with source.local_path(pdf_path) as local_pdf:
+            signed_path = _flatten(document, local_pdf, os.path.basename(pdf_path))
         
         document.signed_file_path = signed_path
+        bump_version(document)
         db.commit()
-        print(f"DEBUG: Signed PDF saved to {signed_path}")
+        logger.info("Signed PDF saved to %s", signed_path)
         return signed_path
-    except Exception as e:
-        print(f"DEBUG: CRITICAL error during PDF processing: {str(e)}")
+    except TimeoutError as e:
+        _flatten_stats["timeouts"] += 1
+        logger.warning("Flatten of document %s gave up waiting for memory: %s", document_id, e)
+        db.rollback()
+        return None
+    except Exception:
+        logger.exception("Flattening document %s failed", document_id)
+        db.rollback()
         return None
+
+def _flatten(document, pdf_path: str, basename: str) -> str:
+    """Stamp signed fields onto the PDF at pdf_path and store the result; returns its reference."""
+    by_page = defaultdict(list)
+    for field in document.signature_fields:
+        if field.status == "signed" and field.signature_data:
+            if document.page_count and not 1 <= field.page_number <= document.page_count:
+                logger.warning("Skipping field %s: page %s of %s", field.id, field.page_number, document.page_count)
+                continue
+            by_page[field.page_number].append(field)
+    size = os.path.getsize(pdf_path)
+    incremental = size >= FLATTEN_INCREMENTAL_MB * MB
+    cost = flatten_cost(size, len(by_page), incremental)
+
+    queued = time.monotonic()
+    with flatten_budget.reserve(cost, FLATTEN_BUDGET_TIMEOUT) as reserved:
+        started, rss_before = time.monotonic(), current_rss()
+        # Originals can be shared by several documents (templates), so key on the document
+        signed_filename = f"signed_{document.id}_{basename}"
+        with get_storage().writable_path(signed_filename) as out:
+            if incremental:
+                shutil.copyfile(pdf_path, out.path)
+                incremental = _stamp_and_save(out.path, by_page, out.path, incremental=True)
+            else:
+                _stamp_and_save(pdf_path, by_page, out.path, incremental=False)
+
+    _flatten_stats["count"] += 1
+    _flatten_stats["incremental"] += int(incremental)
+    _flatten_stats["last"] = report = {
+        "document_id": document.id,
+        "mode": "incremental" if incremental else "full",
+        "size_mb": round(size / MB, 1),
+        "pages_stamped": len(by_page),
+        "reserved_mb": round(reserved / MB, 1),
+        "waited_s": round(started - queued, 3),
+        "took_s": round(time.monotonic() - started, 3),
+        "rss_before_mb": round(rss_before / MB, 1),
+        "rss_after_mb": round(current_rss() / MB, 1),
+        "peak_rss_mb": round(peak_rss() / MB, 1),
+    }
+    logger.info("Flatten stats: %s", report)
+    return out.ref
+
+def _stamp_and_save(pdf_path: str, by_page: dict, out_path: str, incremental: bool) -> bool:
+    """
+    Stamp fields page by page and save to out_path, in place when incremental (then
+    out_path is pdf_path). Returns whether the save really was incremental.
+    """
+    # PyMuPDF is heavy to import; only pay for it once a document is actually flattened
+    import fitz
+
+    doc = fitz.open(pdf_path)
+    try:
+        # Only pages carrying fields are loaded, one at a time
+        for page_number in sorted(by_page):
+            page = doc[page_number - 1]
+            _stamp_page(page, by_page[page_number])
+            del page
+
+        if incremental and doc.can_save_incrementally():
+            doc.saveIncr()
+            return True
+        if incremental:
+            # Damaged or repaired files can't be appended to; rewrite them without extras
+            full_path = out_path + ".full"
+            doc.save(full_path, **save_options("fast"))
+            doc.close()
+            os.replace(full_path, out_path)
+            return False
+        doc.save(out_path, **save_options())
+        return False
+    finally:
+        if not doc.is_closed:
+            doc.close()
+
+def _stamp_page(page, fields: list):
+    import fitz
+
+    # Standardized coordinate scaling (matching 800px width from frontend)
+    # fitz page coordinates are in points (1 point = 1/72 inch)
+    page_rect = page.rect
+    scale_factor = page_rect.width / 800
+    for field in fields:
+        try:
+            # Signature boxes are centered in frontend: translate(-50%, -50%)
+            center_x = field.x_position * scale_factor
+            center_y = field.y_position * scale_factor
+            width = field.width * scale_factor
+            height = field.height * scale_factor
+            
+            # Rect for fitz: [x0, y0, x1, y1]
+            x0 = center_x - (width / 2)
+            y0 = center_y - (height / 2)
+            x1 = center_x + (width / 2)
+            y1 = center_y + (height / 2)
+            
+            rect = fitz.Rect(x0, y0, x1, y1)
+            if is_vector_signature(field.signature_data):
+                draw_vector_signature(page, rect, field.signature_data)
+            else:
+                # Handle data:image/png;base64,... format
+                header, encoded = field.signature_data.split(",", 1)
+                page.insert_image(rect, stream=base64.b64decode(encoded))
+            logger.debug("Inserted signature into field %s", field.id)
+        except Exception:
+            logger.exception("Error merging field %s", field.id)
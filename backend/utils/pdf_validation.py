@@ -0,0 +1,105 @@
+"""
+Bounded-time PDF validation.
+
+Uploaded PDFs are parsed once, before anything else touches them, by pdf_inspect.py
+in a separate Python process with CPU-time, memory and file-write rlimits and a
+wall-clock timeout. The same pass proposes signature fields and extracts the text
+for search, so the API process never opens an untrusted file with PyMuPDF. A PDF
+that makes MuPDF spin or balloon kills that process, not the API worker. The
+outcome (page count, encryption, or the error) is cached on the document, so the
+flattener checks `validated_at` instead of parsing untrusted input again; documents
+that predate validation are checked the first time one of them needs the file
+(ensure_validated).
+"""
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from .storage import storage_for
+from .etag import bump_version
+
+logger = logging.getLogger(__name__)
+
+PDF_VALIDATION_CPU_SECONDS = int(os.getenv("PDF_VALIDATION_CPU_SECONDS", "10"))
+PDF_VALIDATION_MEMORY_MB = int(os.getenv("PDF_VALIDATION_MEMORY_MB", "512"))
+# Wall-clock cap, for files that block without burning CPU
+PDF_VALIDATION_TIMEOUT = float(os.getenv("PDF_VALIDATION_TIMEOUT", str(PDF_VALIDATION_CPU_SECONDS * 2 + 5)))
+WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdf_inspect.py")
+
+ERROR_MESSAGES = {
+    "malformed": "The file is not a valid PDF",
+    "password": "Password-protected PDFs are not supported",
+    "no_pages": "The PDF has no pages",
+    "timeout": "The PDF took too long to process",
+    "memory": "The PDF needs too much memory to process",
+}
+
+def inspect_pdf(path: str, anchors: int = None, pages: tuple = None, text: int = None) -> dict:
+    """
+    Run the sandboxed worker on a local file; always returns its report, never raises.
+    anchors/pages also scan for signature fields and text extracts up to that many
+    characters, in the same pass (see pdf_inspect).
+    """
+    # -I: ignore PYTHON* variables and the user site; nothing but the worker runs
+    command = [sys.executable, "-I", WORKER, path, str(PDF_VALIDATION_CPU_SECONDS), str(PDF_VALIDATION_MEMORY_MB)]
+    if anchors is not None:
+        command += ["--anchors", str(anchors)]
+    if pages is not None:
+        command += ["--pages", f"{pages[0]}:{pages[1]}"]
+    if text is not None:
+        command += ["--text", str(text)]
+    try:
+        proc = subprocess.run(
+            command, stdin=subprocess.DEVNULL, capture_output=True, timeout=PDF_VALIDATION_TIMEOUT,
+        )
+    except subprocess.TimeoutExpired:
+        return {"ok": False, "error": "timeout", "detail": f"No result after {PDF_VALIDATION_TIMEOUT:g}s"}
+
+    lines = proc.stdout.decode(errors="replace").strip().splitlines()
+    if proc.returncode == 0 and lines:
+        try:
+            return json.loads(lines[-1])
+        except ValueError:
+            pass
+    if proc.returncode in (-signal.SIGXCPU, -signal.SIGKILL):
+        return {"ok": False, "error": "timeout", "detail": f"CPU limit of {PDF_VALIDATION_CPU_SECONDS}s exceeded"}
+    stderr = proc.stderr.decode(errors="replace").strip().splitlines()
+    detail = stderr[-1][:200] if stderr else f"Validator exited with {proc.returncode}"
+    error = "memory" if "MemoryError" in detail or "memory" in detail.lower() else "malformed"
+    return {"ok": False, "error": error, "detail": detail}
+
+def validate_pdf(ref: str, **options) -> dict:
+    """Inspect a stored PDF in the sandbox (blocking); options as for inspect_pdf."""
+    with storage_for(ref).local_path(ref) as path:
+        return inspect_pdf(path, **options)
+
+def validate_upload(ref: str, **options) -> dict:
+    """Validate a freshly stored upload; a bad file is deleted and rejected with 422."""
+    report = validate_pdf(ref, **options)
+    if not report["ok"]:
+        logger.info("Rejected upload %s: %s (%s)", ref, report["error"], report.get("detail"))
+        storage_for(ref).delete(ref)
+        raise HTTPException(status_code=422, detail=ERROR_MESSAGES.get(report["error"], ERROR_MESSAGES["malformed"]))
+    return report
+
+def apply_report(document, report: dict):
+    """Cache a validation report on a document."""
+    document.validated_at = datetime.now(timezone.utc)
+    document.page_count = report.get("pages")
+    document.pdf_encrypted = report.get("encrypted")
+    document.pdf_error = None if report["ok"] else report["error"]
+
+def ensure_validated(db, document) -> bool:
+    """
+    Whether the document's original is safe to open in-process, validating (and
+    caching the result) if it never was. Commits when it validates.
+    """
+    if document.validated_at is None:
+        apply_report(document, validate_pdf(document.file_path))
+        bump_version(document)
+        db.commit()
+    return document.pdf_error is None
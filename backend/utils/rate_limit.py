@@ -0,0 +1,275 @@
+"""
+Token-bucket rate limiting for the unauthenticated endpoints.
+
+RateLimitMiddleware runs before routing, so a rejected request costs one dict lookup:
+no DB session, no token lookup, no bcrypt. Each policy matches a method + path regex
+and keys its buckets by client IP, optionally combined with the signing token from
+the path, or by the account (the login form's username) so one address can't be
+guessed at from many IPs. Buckets live in-process by default; RATE_LIMIT_BACKEND=redis
+shares them across workers and hosts, timed by the Redis server's clock.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qs
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() not in ("0", "false", "no")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Honour X-Forwarded-For only behind a proxy that sets it
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() in ("1", "true", "yes")
+# Login forms are a few hundred bytes; larger bodies aren't read for the account key
+ACCOUNT_BODY_LIMIT = 4096
+
+@dataclass
+class RateLimitPolicy:
+    name: str
+    method: str
+    path: str        # regex; a `token` group adds the signing token to the key
+    rate: float      # tokens refilled per second
+    burst: int       # bucket capacity
+    per_token: bool = False
+    per_account: bool = False  # keyed by the submitted username instead of the IP
+
+    def __post_init__(self):
+        self.pattern = re.compile(self.path)
+
+DEFAULT_POLICIES = [
+    # Credential stuffing: every attempt costs a bcrypt verify
+    RateLimitPolicy("login", "POST", r"^/api/auth/login$", rate=30 / 60, burst=30),
+    # Password guessing against one account, spread over many IPs
+    RateLimitPolicy("login_account", "POST", r"^/api/auth/login$", rate=10 / 900, burst=10, per_account=True),
+    RateLimitPolicy("register", "POST", r"^/api/auth/register$", rate=20 / 60, burst=20),
+    # Token scraping: one IP walking many tokens
+    RateLimitPolicy("public_ip", "*", r"^/api/docs/public/(?P<token>[^/]+)", rate=2, burst=120),
+    # One viewer hammering a single document
+    RateLimitPolicy("public_token", "*", r"^/api/docs/public/(?P<token>[^/]+)", rate=1, burst=30, per_token=True),
+]
+
+class InMemoryBucketStore:
+    # How often buckets that have refilled (and so equal a fresh one) are dropped
+    PRUNE_INTERVAL = 60.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (tokens, last update, time the bucket is full again)
+        self._buckets = {}
+        self._next_prune = None
+
+    def take(self, key: str, rate: float, burst: int, now: float = None) -> float:
+        """Consume one token. Returns 0 if allowed, else seconds until one is available."""
+        return self.take_all([(key, rate, burst)], now)[1]
+
+    def take_all(self, buckets: list, now: float = None) -> tuple:
+        """
+        Consume one token from each (key, rate, burst) bucket, or from none of them.
+        Returns (None, 0) if allowed, else (index of the first empty bucket, seconds
+        until it has a token). now defaults to the monotonic clock.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            levels = []
+            for index, (key, rate, burst) in enumerate(buckets):
+                tokens, last, _ = self._buckets.get(key, (burst, now, now))
+                tokens = min(burst, tokens + (now - last) * rate)
+                if tokens < 1:
+                    return index, (1 - tokens) / rate
+                levels.append(tokens)
+            for (key, rate, burst), tokens in zip(buckets, levels):
+                tokens -= 1
+                self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            self._maybe_prune(now)
+            return None, 0.0
+
+    def _maybe_prune(self, now: float):
+        if self._next_prune is None:
+            self._next_prune = now + self.PRUNE_INTERVAL
+        elif now >= self._next_prune:
+            # Each bucket carries its own refill time, so other policies' buckets that
+            # are still partly drained are kept
+            self._buckets = {k: v for k, v in self._buckets.items() if v[2] > now}
+            self._next_prune = now + self.PRUNE_INTERVAL
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+class RedisBucketStore:
+    """
+    Shared buckets for multi-worker deployments (requires the `redis` package). The
+    script reads the time from the Redis server, so hosts with different (or
+    monotonic, per-boot) clocks agree on how far a bucket has refilled.
+    """
+    SCRIPT = """
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local levels = {}
+    for i, key in ipairs(KEYS) do
+        local rate, burst = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+        local tokens = tonumber(redis.call('HGET', key, 't') or burst)
+        local last = tonumber(redis.call('HGET', key, 'l') or now)
+        tokens = math.min(burst, tokens + (now - last) * rate)
+        if tokens < 1 then return {i, tostring((1 - tokens) / rate)} end
+        levels[i] = tokens
+    end
+    for i, key in ipairs(KEYS) do
+        local rate, burst = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+        redis.call('HSET', key, 't', levels[i] - 1, 'l', now)
+        redis.call('EXPIRE', key, math.ceil(burst / rate) + 1)
+    end
+    return {0, '0'}
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(self.SCRIPT)
+
+    def take(self, key: str, rate: float, burst: int, now: float = None) -> float:
+        return self.take_all([(key, rate, burst)], now)[1]
+
+    def take_all(self, buckets: list, now: float = None) -> tuple:
+        # now is ignored: the script uses the server's clock
+        args = []
+        for _, rate, burst in buckets:
+            args += [rate, burst]
+        index, retry_after = self._take(keys=[f"docsign:rl:{key}" for key, _, _ in buckets], args=args)
+        # Lua arrays are 1-based; 0 means every bucket had a token
+        return (int(index) - 1 if int(index) else None), float(retry_after)
+
+    def reset(self):
+        for key in self._client.scan_iter("docsign:rl:*"):
+            self._client.delete(key)
+
+class RateLimiter:
+    def __init__(self, policies: list, store=None):
+        self.policies = policies
+        self.store = store or InMemoryBucketStore()
+        self.allowed = Counter()
+        self.rejected = Counter()
+
+    def _matching(self, method: str, path: str):
+        for policy in self.policies:
+            if policy.method != "*" and policy.method != method:
+                continue
+            match = policy.pattern.match(path)
+            if match:
+                yield policy, match
+
+    def wants_account(self, method: str, path: str) -> bool:
+        """Whether a per-account policy matches, so the middleware should read the account."""
+        return any(policy.per_account for policy, _ in self._matching(method, path))
+
+    def check(self, method: str, path: str, client_ip: str, account: str = None) -> Optional[tuple]:
+        """Return (policy, retry_after) for the first policy that rejects, else None."""
+        matched, buckets = [], []
+        for policy, match in self._matching(method, path):
+            key = f"{policy.name}:{client_ip}"
+            if policy.per_account:
+                # Without a username the request fails validation; the IP policy still counts it
+                if not account:
+                    continue
+                key = f"{policy.name}:{account}"
+            elif policy.per_token:
+                key = f"{policy.name}:{match.group('token')}:{client_ip}"
+            matched.append(policy)
+            buckets.append((key, policy.rate, policy.burst))
+        if not matched:
+            return None
+        # All or nothing: a request one policy rejects doesn't use up another's budget
+        index, retry_after = self.store.take_all(buckets)
+        if index is not None:
+            self.rejected[matched[index].name] += 1
+            return matched[index], retry_after
+        for policy in matched:
+            self.allowed[policy.name] += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            policy.name: {"allowed": self.allowed[policy.name], "rejected": self.rejected[policy.name]}
+            for policy in self.policies
+        }
+
+def client_ip(scope) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+def login_account(body: bytes, content_type: str) -> Optional[str]:
+    """The username of a form-encoded login body, normalised; None if there isn't one."""
+    if not content_type.startswith("application/x-www-form-urlencoded"):
+        return None
+    usernames = parse_qs(body.decode("latin-1")).get("username")
+    if not usernames or not usernames[0].strip():
+        return None
+    return usernames[0].strip().lower()[:254]
+
+async def _read_body(receive) -> tuple:
+    """Read up to ACCOUNT_BODY_LIMIT bytes of the body; returns (body, messages read)."""
+    body, messages = b"", []
+    while len(body) <= ACCOUNT_BODY_LIMIT:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    return body, messages
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        account = None
+        if self.limiter.wants_account(scope["method"], scope["path"]):
+            body, messages = await _read_body(receive)
+            if len(body) <= ACCOUNT_BODY_LIMIT:
+                content_type = dict(scope.get("headers", [])).get(b"content-type", b"").decode("latin-1")
+                account = login_account(body, content_type)
+            # Hand the messages already read to the app before the rest of the body
+            downstream = receive
+
+            async def receive():
+                return messages.pop(0) if messages else await downstream()
+
+        rejection = self.limiter.check(scope["method"], scope["path"], client_ip(scope), account)
+        if rejection is None:
+            await self.app(scope, receive, send)
+            return
+
+        policy, retry_after = rejection
+        body = json.dumps({"detail": "Too many requests", "policy": policy.name}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, round(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+def build_limiter() -> RateLimiter:
+    store = RedisBucketStore(REDIS_URL) if RATE_LIMIT_BACKEND == "redis" else InMemoryBucketStore()
+    return RateLimiter(DEFAULT_POLICIES, store)
+
+limiter = build_limiter()
@@ -0,0 +1,253 @@
+"""
+Full-text search over document titles and their PDF text.
+
+Text is pulled out of each PDF by the sandboxed worker that validates uploads (in
+the same pass, for a fresh upload) and stored by a background task
+(index_document_text) in a `document_search` index next to the title:
+
+- SQLite: an FTS5 virtual table keyed by rowid = documents.id, with the owner as an
+  indexed token, ranked with bm25 (title matches weigh more) and snippets from
+  FTS5's snippet()
+- PostgreSQL: a table with a generated, weighted tsvector column and a GIN index,
+  ranked with ts_rank_cd and snippets from ts_headline
+
+Either way a query is an index lookup, not a scan of the documents table, and only
+the page being returned is highlighted. Uploads, template instances and bulk sends
+queue indexing as they create documents. The index is created by migration 10;
+documents created before it are indexed with:
+
+    python -m backend.utils.search --reindex
+"""
+import argparse
+import html
+import logging
+import os
+import re
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from .. import models
+from .pdf_validation import ensure_validated, validate_pdf
+
+logger = logging.getLogger(__name__)
+
+# Text kept per document; enough for any contract, bounded for scanned junk
+SEARCH_MAX_TEXT_CHARS = int(os.getenv("SEARCH_MAX_TEXT_CHARS", str(1024 * 1024)))
+SNIPPET_TOKENS = 16
+# Shorter trailing words are matched whole; a one-letter prefix expands to most of the vocabulary
+MIN_PREFIX_CHARS = 2
+# Highlight markers that can't occur in extracted text; swapped for <mark> after escaping
+_OPEN, _CLOSE = "\x02", "\x03"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def _dialect(bind) -> str:
+    return bind.dialect.name
+
+def ensure_search_index(conn):
+    if _dialect(conn) == "postgresql":
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS document_search ("
+            " document_id INTEGER PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,"
+            " user_id INTEGER, title TEXT NOT NULL DEFAULT '', body TEXT NOT NULL DEFAULT '',"
+            " tsv tsvector GENERATED ALWAYS AS ("
+            "  setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')"
+            " ) STORED)"
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_document_search_tsv ON document_search USING GIN (tsv)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_document_search_user_id ON document_search (user_id)"))
+    else:
+        # owner holds a single "u<user id>" token so searches can be scoped inside the index
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS document_search USING fts5("
+            "title, body, owner, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        ))
+
+def extract_text(ref: str) -> str:
+    """Plain text of a stored PDF, capped at SEARCH_MAX_TEXT_CHARS, read in the sandbox (blocking)."""
+    report = validate_pdf(ref, text=SEARCH_MAX_TEXT_CHARS)
+    if not report["ok"]:
+        raise ValueError(report["error"])
+    return report["text"]
+
+def upsert_search_entry(db, document, body: str):
+    params = {"id": document.id, "user_id": document.user_id, "owner": _owner_token(document.user_id),
+              "title": document.title or "", "body": body}
+    if _dialect(db.get_bind()) == "postgresql":
+        db.execute(text(
+            "INSERT INTO document_search (document_id, user_id, title, body) VALUES (:id, :user_id, :title, :body)"
+            " ON CONFLICT (document_id) DO UPDATE"
+            " SET user_id = EXCLUDED.user_id, title = EXCLUDED.title, body = EXCLUDED.body"
+        ), params)
+    else:
+        db.execute(text("DELETE FROM document_search WHERE rowid = :id"), params)
+        db.execute(text(
+            "INSERT INTO document_search (rowid, title, body, owner) VALUES (:id, :title, :body, :owner)"
+        ), params)
+
+def index_document_text(session_factory, document_id: int, body: str = None):
+    """
+    Background task: (re)index a document's text with its title. body is the text
+    upload validation already extracted; otherwise it's extracted here.
+    """
+    db = session_factory()
+    try:
+        document = db.query(models.Document).filter(models.Document.id == document_id).first()
+        if not document:
+            return
+        try:
+            if body is None:
+                body = extract_text(document.file_path) if ensure_validated(db, document) else ""
+        except Exception:
+            # Unreadable PDFs are still findable by title
+            logger.exception("Text extraction failed for document %s", document_id)
+            body = ""
+        upsert_search_entry(db, document, body)
+        db.commit()
+    except Exception:
+        logger.exception("Search indexing failed for document %s", document_id)
+        db.rollback()
+    finally:
+        db.close()
+
+def index_documents_text(session_factory, document_ids: list):
+    """
+    Background task for documents created in batches over shared originals (template
+    instances, bulk send): each stored file's text is extracted once and indexed
+    under every document using it.
+    """
+    db = session_factory()
+    try:
+        documents = db.query(models.Document).filter(models.Document.id.in_(document_ids)).all()
+        bodies = {}
+        for document in documents:
+            if document.file_path not in bodies:
+                try:
+                    bodies[document.file_path] = extract_text(document.file_path) if ensure_validated(db, document) else ""
+                except Exception:
+                    logger.exception("Text extraction failed for %s", document.file_path)
+                    bodies[document.file_path] = ""
+            upsert_search_entry(db, document, bodies[document.file_path])
+        db.commit()
+    except Exception:
+        logger.exception("Search indexing failed for documents %s...", document_ids[:5])
+        db.rollback()
+    finally:
+        db.close()
+
+def fts_query(query: str) -> str:
+    """Free text to an FTS5 query: every word must match, the last one as a prefix."""
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return ""
+    quoted = [f'"{token}"' for token in tokens]
+    if len(tokens[-1]) >= MIN_PREFIX_CHARS:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+def _highlighted(fragment: str) -> str:
+    return html.escape(fragment or "").replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+def _owner_token(user_id) -> str:
+    return f"u{user_id}"
+
+def _sqlite_hits(db, user_id: int, query: str, limit: int, offset: int) -> list:
+    match = fts_query(query)
+    if not match:
+        return []
+    # The owner token narrows the match inside the index, so ranking only ever sees
+    # this user's documents; the user's words are confined to title and body
+    params = {"q": f'owner : "{_owner_token(user_id)}" AND {{title body}} : ({match})',
+              "limit": limit, "offset": offset}
+    # bm25 is lower-is-better; title hits count 10x body hits
+    ranked = db.execute(text(
+        "SELECT rowid AS id, bm25(document_search, 10.0, 1.0, 0.0) AS rank FROM document_search"
+        " WHERE document_search MATCH :q ORDER BY rank, rowid DESC LIMIT :limit OFFSET :offset"
+    ), params).all()
+    if not ranked:
+        return []
+    # Highlighting is costly, so only the page being returned gets it
+    ids = ", ".join(str(int(row.id)) for row in ranked)
+    fragments = {
+        row.id: row for row in db.execute(text(
+            "SELECT rowid AS id, highlight(document_search, 0, :open, :close) AS title,"
+            " snippet(document_search, 1, :open, :close, '…', :tokens) AS snippet"
+            f" FROM document_search WHERE document_search MATCH :q AND rowid IN ({ids})"
+        ), {**params, "open": _OPEN, "close": _CLOSE, "tokens": SNIPPET_TOKENS})
+    }
+    return [(row.id, row.rank, fragments[row.id].title, fragments[row.id].snippet) for row in ranked]
+
+def _postgres_hits(db, user_id: int, query: str, limit: int, offset: int) -> list:
+    params = {"q": query, "user_id": user_id, "limit": limit, "offset": offset, "open": _OPEN, "close": _CLOSE}
+    rows = db.execute(text(
+        "WITH ranked AS ("
+        " SELECT s.document_id AS id, s.title, s.body, ts_rank_cd(s.tsv, q) AS rank, q"
+        " FROM document_search s, websearch_to_tsquery('simple', :q) q"
+        " WHERE s.tsv @@ q AND s.user_id = :user_id"
+        " ORDER BY rank DESC, s.document_id DESC LIMIT :limit OFFSET :offset)"
+        " SELECT id, rank,"
+        " ts_headline('simple', title, q, 'StartSel=' || :open || ', StopSel=' || :close || ', HighlightAll=true') AS title,"
+        " ts_headline('simple', body, q, 'StartSel=' || :open || ', StopSel=' || :close || ', MaxWords=24, MinWords=8') AS snippet"
+        " FROM ranked ORDER BY rank DESC, id DESC"
+    ), params).all()
+    return [(row.id, row.rank, row.title, row.snippet) for row in rows]
+
+def search_documents(db, user_id: int, query: str, limit: int, offset: int) -> dict:
+    """One page of the user's documents matching query, best match first."""
+    hits = _postgres_hits if _dialect(db.get_bind()) == "postgresql" else _sqlite_hits
+    # One extra row tells us whether there's a next page
+    rows = hits(db, user_id, query, limit + 1, offset)
+    page = rows[:limit]
+    documents = {}
+    if page:
+        documents = {
+            d.id: d for d in db.query(models.Document).filter(
+                models.Document.id.in_([row[0] for row in page]),
+                models.Document.user_id == user_id,
+            )
+        }
+    items = [
+        {
+            "id": document_id,
+            "title": documents[document_id].title,
+            "status": documents[document_id].status,
+            "created_at": documents[document_id].created_at,
+            "title_highlight": _highlighted(title),
+            "snippet": _highlighted(snippet),
+            "rank": float(rank),
+        }
+        for document_id, rank, title, snippet in page if document_id in documents
+    ]
+    return {"items": items, "next_offset": offset + limit if len(rows) > limit else None}
+
+def reindex(db, all_documents: bool = False) -> int:
+    """Index documents missing from the search index (or every document). Returns the count."""
+    query = db.query(models.Document.id)
+    if not all_documents:
+        column = "document_id" if _dialect(db.get_bind()) == "postgresql" else "rowid"
+        indexed = {row[0] for row in db.execute(text(f"SELECT {column} FROM document_search"))}
+        ids = [document_id for (document_id,) in query if document_id not in indexed]
+    else:
+        ids = [document_id for (document_id,) in query]
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    for document_id in ids:
+        index_document_text(factory, document_id)
+    return len(ids)
+
+def main():
+    from ..database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Build the document full-text search index")
+    parser.add_argument("--reindex", action="store_true", help="index documents missing from the index")
+    parser.add_argument("--all", action="store_true", help="re-extract and reindex every document")
+    args = parser.parse_args()
+    if not (args.reindex or args.all):
+        parser.error("pass --reindex or --all")
+
+    db = SessionLocal()
+    try:
+        count = reindex(db, all_documents=args.all)
+    finally:
+        db.close()
+    print(f"Indexed {count} document(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from typing import Iterable, Optional
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from ..schemas.document import DocumentResponse, SignatureFieldResponse, AuditLogResponse
+
+# Relationships a client can opt into with ?include=
+DOCUMENT_RELATIONSHIPS = {
+    "signature_fields": SignatureFieldResponse,
+    "audit_logs": AuditLogResponse,
+}
+DOCUMENT_SCALARS = [name for name in DocumentResponse.model_fields if name not in DOCUMENT_RELATIONSHIPS]
+
+def parse_csv_param(value: Optional[str]) -> Optional[list]:
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+def _document_dict(document, scalars: list, relationships: list) -> dict:
+    data = {name: getattr(document, name) for name in scalars}
+    for name in relationships:
+        schema = DOCUMENT_RELATIONSHIPS[name]
+        data[name] = [schema.model_validate(item).model_dump() for item in getattr(document, name)]
+    return data
+
+def _resolve(fields: Optional[str], include: Optional[str]):
+    scalars = parse_csv_param(fields)
+    relationships = parse_csv_param(include)
+
+    unknown = set(scalars or []) - set(DOCUMENT_SCALARS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    unknown = set(relationships or []) - set(DOCUMENT_RELATIONSHIPS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+
+    if scalars is None:
+        scalars = DOCUMENT_SCALARS
+    elif "id" not in scalars:
+        scalars = ["id"] + scalars
+    return scalars, relationships or []
+
+def check_view(fields: Optional[str] = None, include: Optional[str] = None):
+    """
+    Route dependency rejecting unknown `fields`/`include` up front. Mutating routes
+    use it so a typo is a 400 before anything is written or sent, not after.
+    """
+    _resolve(fields, include)
+
+def render_document(document, fields: Optional[str] = None, include: Optional[str] = None):
+    """
+    Shape a Document for the response.
+
+    With neither `fields` nor `include` the ORM object is returned untouched and
+    the route's DocumentResponse model renders it in full. Otherwise only the
+    requested scalar fields (plus `id`) and included relationships are loaded
+    and rendered, so a status check never drags signature images along.
+    """
+    if fields is None and include is None:
+        return document
+    scalars, relationships = _resolve(fields, include)
+    return ORJSONResponse(_document_dict(document, scalars, relationships))
+
+def render_documents(documents: Iterable, fields: Optional[str] = None, include: Optional[str] = None):
+    """List variant of render_document."""
+    if fields is None and include is None:
+        return documents
+    scalars, relationships = _resolve(fields, include)
+    return ORJSONResponse([_document_dict(d, scalars, relationships) for d in documents])
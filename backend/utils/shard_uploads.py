@@ -0,0 +1,146 @@
+"""
+Move files stored flat in UPLOAD_DIR into the sharded layout (storage.shard_name).
+
+Runs against a live deployment. Each batch of distinct flat references (shared by
+any number of documents and templates) is handled in three steps:
+
+1. hard-link every file, plus its `.cold` pointer if it was tiered, to its sharded
+   path (a copy where hard links aren't possible)
+2. repoint file_path / signed_file_path / Template.file_path in one transaction,
+   bumping the version of each document touched
+3. remove the flat names, unless --keep-old
+
+Until step 2 commits every reader still uses the flat path, which still exists;
+afterwards the sharded one does. With --keep-old the flat names stay (touched, so
+they count as recent) until file_gc.py sweeps them after its grace period, which
+also covers clients holding /uploads URLs from before the move. Re-running is safe;
+only references still in the flat layout are picked up.
+
+    python -m backend.utils.shard_uploads [--batch-size 500] [--dry-run] [--keep-old]
+"""
+import argparse
+import json
+import os
+import shutil
+from sqlalchemy import select, union, update
+from .. import models
+from ..database import UPLOAD_DIR
+from .cold_tier import pointer_path
+from .storage import shard_name
+
+SHARD_BATCH_SIZE = 500
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def flat_refs(db, after: str, limit: int, root: str = UPLOAD_DIR) -> list:
+    """Distinct references directly under root (not yet sharded), in order, after `after`."""
+    prefix = _like_escape(os.path.join(root, ""))
+    Document, Template = models.Document, models.Template
+    refs = union(
+        select(Document.file_path.label("ref")),
+        select(Document.signed_file_path.label("ref")),
+        select(Template.file_path.label("ref")),
+    ).subquery()
+    query = (
+        select(refs.c.ref)
+        .where(
+            refs.c.ref.like(prefix + "%", escape="\\"),
+            refs.c.ref.notlike(prefix + "%/%", escape="\\"),
+            refs.c.ref > after,
+        )
+        .order_by(refs.c.ref)
+        .limit(limit)
+    )
+    return list(db.execute(query).scalars())
+
+def sharded_ref(ref: str, root: str = UPLOAD_DIR) -> str:
+    return os.path.join(root, *shard_name(os.path.basename(ref)).split("/"))
+
+def _link(src: str, dst: str):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.exists(dst):
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _placed_files(ref: str) -> list:
+    """The on-disk names that make up a reference: the file and/or its cold pointer."""
+    return [path for path in (ref, pointer_path(ref)) if os.path.exists(path)]
+
+def repoint(db, moves: dict):
+    """Point every row at the new references in one transaction."""
+    Document, Template = models.Document, models.Template
+    for old, new in moves.items():
+        db.execute(
+            update(Document).where(Document.file_path == old)
+            .values(file_path=new, version=Document.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(Document).where(Document.signed_file_path == old)
+            .values(signed_file_path=new, version=Document.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(Template).where(Template.file_path == old).values(file_path=new)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+def shard_existing(db, batch_size: int = SHARD_BATCH_SIZE, dry_run: bool = False, keep_old: bool = False,
+                   root: str = UPLOAD_DIR) -> dict:
+    report = {"refs": 0, "files": 0, "missing": 0, "batches": 0, "dry_run": dry_run}
+    after = ""
+    while True:
+        refs = flat_refs(db, after, batch_size, root)
+        if not refs:
+            break
+        after = refs[-1]
+        report["batches"] += 1
+        moves, placed = {}, []
+        for ref in refs:
+            files = _placed_files(ref)
+            if not files:
+                # Nothing on disk to move; leave the row alone
+                report["missing"] += 1
+                continue
+            new = sharded_ref(ref, root)
+            moves[ref] = new
+            report["refs"] += 1
+            report["files"] += len(files)
+            if dry_run:
+                continue
+            for path in files:
+                _link(path, new + path[len(ref):])
+                placed.append(path)
+        if dry_run or not moves:
+            continue
+        repoint(db, moves)
+        for path in placed:
+            if keep_old:
+                os.utime(path)
+            else:
+                os.remove(path)
+    return report
+
+def main():
+    from ..database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Move flat uploads into the sharded directory layout")
+    parser.add_argument("--batch-size", type=int, default=SHARD_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="count what would move")
+    parser.add_argument("--keep-old", action="store_true", help="leave flat names for file_gc to sweep later")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = shard_existing(db, args.batch_size, args.dry_run, args.keep_old)
+    finally:
+        db.close()
+    print(json.dumps(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Signature payloads accepted by the sign endpoints.
+
+Two formats are stored in SignatureField.signature_data, both as data URLs the
+frontend can drop straight into an <img>:
+
+- raster: "data:image/png;base64,..." from the signature pad canvas
+- vector: "data:image/svg+xml,..." holding a single stroked path made of absolute
+  moves and relative line segments (M x y l dx dy ...)
+
+Vector signatures arrive either as `signature_strokes` (point lists in canvas pixels)
+or as an SVG in that same restricted form. Either way the SVG is rebuilt from the
+parsed points, so nothing but path data reaches storage, and the flattener draws the
+strokes as PDF vector paths instead of embedding an image.
+
+Raster signatures (PNG or JPEG) are decoded, cropped to the ink, downscaled to
+SIGNATURE_DPI at the field's printed size and re-encoded as a small palette PNG
+(ink colour at SIGNATURE_PNG_BITS levels of opacity), so what is stored and later
+stamped is bounded by the field, not by the client's canvas.
+"""
+import base64
+import os
+import re
+import struct
+import zlib
+from urllib.parse import quote, unquote
+from fastapi import HTTPException
+
+SVG_DATA_PREFIX = "data:image/svg+xml,"
+# Bounds for one signature; a real one is a few hundred points
+MAX_STROKES = 200
+MAX_STROKE_POINTS = 10000
+
+# Raster payload limits (decoded bytes / pixels) before anything is processed
+SIGNATURE_MAX_BYTES = int(os.getenv("SIGNATURE_MAX_BYTES", str(5 * 1024 * 1024)))
+SIGNATURE_MAX_PIXELS = int(os.getenv("SIGNATURE_MAX_PIXELS", str(25_000_000)))
+SIGNATURE_DPI = int(os.getenv("SIGNATURE_DPI", "200"))
+# Opacity levels of the stored PNG: 1 bit is pure ink/no ink, 2-4 keep antialiasing
+SIGNATURE_PNG_BITS = int(os.getenv("SIGNATURE_PNG_BITS", "2"))
+RASTER_PREFIXES = ("data:image/png;base64,", "data:image/jpeg;base64,")
+# Field coordinates live in the frontend's 800px-wide page; assume a Letter/A4-width page
+PAGE_POINTS_PER_FIELD_PX = 612 / 800
+# Coverage below this counts as background when finding the ink's bounding box
+INK_THRESHOLD = 24
+
+_SVG_PATTERN = re.compile(
+    r'^<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 (?P<width>[\d.]+) (?P<height>[\d.]+)">'
+    r'<path d="(?P<d>[^"]*)" fill="none" stroke="(?P<color>#[0-9a-fA-F]{6})" stroke-width="(?P<stroke_width>[\d.]+)"'
+    r' stroke-linecap="round" stroke-linejoin="round"/></svg>$'
+)
+# Path data: M and l commands, plain decimals (no exponents, no leading "."), spaces or commas
+_PATH_TOKEN = re.compile(r"(?P<command>[Ml])|(?P<number>-?\d+(?:\.\d+)?)|[\s,]+")
+
+def _num(value: float) -> str:
+    return f"{round(value, 1):g}"
+
+def _path_tokens(d: str):
+    """Commands and numbers of a path, in order; ValueError on anything else in it."""
+    end = 0
+    for match in _PATH_TOKEN.finditer(d):
+        if match.start() != end:
+            break
+        end = match.end()
+        if match["command"]:
+            yield match["command"]
+        elif match["number"]:
+            yield float(match["number"])
+    if end != len(d):
+        raise ValueError(f"unsupported path data at {d[end:end + 10]!r}")
+
+def is_vector_signature(signature_data: str) -> bool:
+    return signature_data.startswith("data:image/svg+xml")
+
+def strokes_to_svg(width: float, height: float, strokes: list, stroke_width: float = 2.5, color: str = "#000000") -> str:
+    if not strokes or not any(strokes):
+        raise HTTPException(status_code=400, detail="Signature has no strokes")
+    if len(strokes) > MAX_STROKES or sum(len(s) for s in strokes) > MAX_STROKE_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Signature too complex (max {MAX_STROKES} strokes, {MAX_STROKE_POINTS} points)"
+        )
+
+    parts = []
+    for stroke in strokes:
+        if not stroke:
+            continue
+        (x, y), rest = stroke[0], stroke[1:]
+        parts.append(f"M{_num(x)} {_num(y)}")
+        if rest:
+            deltas = []
+            # Deltas between rounded points, so rounding error doesn't accumulate
+            px, py = round(x, 1), round(y, 1)
+            for nx, ny in rest:
+                nx, ny = round(nx, 1), round(ny, 1)
+                deltas.append(f"{_num(nx - px)} {_num(ny - py)}")
+                px, py = nx, ny
+            parts.append("l" + " ".join(deltas))
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_num(width)} {_num(height)}">'
+        f'<path d="{"".join(parts)}" fill="none" stroke="{color}" stroke-width="{_num(stroke_width)}"'
+        f' stroke-linecap="round" stroke-linejoin="round"/></svg>'
+    )
+    return SVG_DATA_PREFIX + quote(svg, safe=' ="/:.-')
+
+def parse_svg_signature(signature_data: str) -> dict:
+    """Parse a vector signature back into its canvas size, style and point lists."""
+    if not signature_data.startswith(SVG_DATA_PREFIX):
+        raise ValueError("not an SVG data URL")
+    match = _SVG_PATTERN.match(unquote(signature_data[len(SVG_DATA_PREFIX):]))
+    if not match:
+        raise ValueError("only single-path stroke SVGs are supported")
+    width, height = float(match["width"]), float(match["height"])
+    if width <= 0 or height <= 0:
+        # Drawing scales by the viewBox; an empty one can't be placed in a field
+        raise ValueError("viewBox width and height must be positive")
+
+    strokes, stroke, command, pending = [], None, None, []
+    for token in _path_tokens(match["d"]):
+        if isinstance(token, str):
+            if pending:
+                raise ValueError("path has an unpaired coordinate")
+            command = token
+            continue
+        pending.append(token)
+        if len(pending) < 2:
+            continue
+        x, y = pending
+        pending = []
+        if command == "M":
+            stroke = [(x, y)]
+            strokes.append(stroke)
+        elif command == "l" and stroke:
+            px, py = stroke[-1]
+            stroke.append((px + x, py + y))
+        else:
+            raise ValueError("path must start with a move")
+    if pending:
+        raise ValueError("path has an unpaired coordinate")
+    return {
+        "width": width,
+        "height": height,
+        "stroke_width": float(match["stroke_width"]),
+        "color": match["color"],
+        "strokes": strokes,
+    }
+
+def _png_chunk(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload))
+
+def encode_palette_png(width: int, height: int, levels: bytes, ink: tuple, bits: int) -> bytes:
+    """
+    PNG of one ink colour at 2**bits opacity levels. `levels` holds one palette index
+    per pixel, row by row.
+    """
+    per_byte = 8 // bits
+    count = 1 << bits
+    rows = []
+    for y in range(height):
+        row = levels[y * width:(y + 1) * width]
+        row += bytes(-len(row) % per_byte)
+        packed = bytearray(len(row) // per_byte)
+        for k in range(per_byte):
+            shift = 8 - bits * (k + 1)
+            for i, value in enumerate(row[k::per_byte]):
+                packed[i] |= value << shift
+        rows.append(b"\x00" + bytes(packed))
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bits, 3, 0, 0, 0)),
+        _png_chunk(b"PLTE", bytes(ink) * count),
+        _png_chunk(b"tRNS", bytes(i * 255 // (count - 1) for i in range(count))),
+        _png_chunk(b"IDAT", zlib.compress(b"".join(rows), 9)),
+        _png_chunk(b"IEND", b""),
+    ])
+
+def _coverage(pix) -> bytes:
+    """Per-pixel ink coverage 0-255: alpha for transparent canvases, darkness otherwise."""
+    import fitz
+
+    if pix.alpha:
+        return pix.samples[3::4]
+    inverted = bytes(range(255, -1, -1))
+    return fitz.Pixmap(fitz.csGRAY, pix).samples.translate(inverted)
+
+def _ink_bbox(coverage: bytes, width: int, height: int):
+    mask = coverage.translate(bytes(0 if v < INK_THRESHOLD else 1 for v in range(256)))
+    x0, y0, x1, y1 = width, None, 0, None
+    for y in range(height):
+        row = mask[y * width:(y + 1) * width]
+        left = width - len(row.lstrip(b"\x00"))
+        if left == width:
+            continue
+        x0 = min(x0, left)
+        x1 = max(x1, len(row.rstrip(b"\x00")))
+        y0 = y if y0 is None else y0
+        y1 = y + 1
+    return None if y0 is None else (x0, y0, x1, y1)
+
+def _ink_color(pix, coverage: bytes) -> tuple:
+    """Average colour of solidly inked pixels (sampled), un-premultiplied."""
+    n = pix.n
+    samples = pix.samples
+    step = max(1, len(coverage) // 5000)
+    total, r, g, b = 0, 0, 0, 0
+    for i in range(0, len(coverage), step):
+        if coverage[i] < 192:
+            continue
+        pr, pg, pb = samples[i * n:i * n + 3]
+        if pix.alpha:
+            a = samples[i * n + 3]
+            pr, pg, pb = (min(255, c * 255 // a) for c in (pr, pg, pb))
+        r, g, b, total = r + pr, g + pg, b + pb, total + 1
+    return (r // total, g // total, b // total) if total else (0, 0, 0)
+
+# JPEG start-of-frame markers (baseline, progressive, lossless...; not DHT/JPG/DAC)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def image_size(data: bytes) -> tuple:
+    """
+    (width, height) declared in a PNG's IHDR or a JPEG's SOF header, read without
+    decoding, so a tiny file declaring a huge canvas is refused before any pixels
+    are allocated. ValueError if the header is missing or not PNG/JPEG.
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        if data[12:16] != b"IHDR" or len(data) < 24:
+            raise ValueError("PNG without IHDR")
+        return struct.unpack(">II", data[16:24])
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        while i + 4 <= len(data):
+            if data[i] != 0xFF:
+                raise ValueError("corrupt JPEG marker")
+            marker = data[i + 1]
+            if marker == 0xFF:  # fill byte
+                i += 1
+                continue
+            if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:  # no length field
+                i += 2
+                continue
+            if marker in (0xD9, 0xDA):  # image data before any frame header
+                break
+            length = struct.unpack(">H", data[i + 2:i + 4])[0]
+            if marker in _JPEG_SOF:
+                if i + 9 > len(data):
+                    break
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                return width, height
+            i += 2 + length
+        raise ValueError("JPEG without a frame header")
+    raise ValueError("not a PNG or JPEG")
+
+def normalize_raster_signature(signature_data: str, field_width: float, field_height: float) -> str:
+    import fitz
+
+    prefix = next((p for p in RASTER_PREFIXES if signature_data.startswith(p)), None)
+    if prefix is None:
+        raise HTTPException(status_code=400, detail="Signature must be a PNG or JPEG data URL, or vector strokes")
+    encoded = signature_data[len(prefix):]
+    if len(encoded) * 3 // 4 > SIGNATURE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Signature image exceeds {SIGNATURE_MAX_BYTES // 1024} KiB")
+    try:
+        raw = base64.b64decode(encoded, validate=True)
+        width, height = image_size(raw)
+    except ValueError:  # bad base64 (binascii.Error is a ValueError) or header
+        raise HTTPException(status_code=400, detail="Signature image could not be decoded")
+    # Checked on the header: decoding would allocate the declared size first
+    if width * height > SIGNATURE_MAX_PIXELS:
+        raise HTTPException(status_code=413, detail=f"Signature image exceeds {SIGNATURE_MAX_PIXELS} pixels")
+    try:
+        pix = fitz.Pixmap(raw)
+    except Exception:  # whatever MuPDF's decoders raise for this build
+        raise HTTPException(status_code=400, detail="Signature image could not be decoded")
+    if pix.colorspace is None or pix.colorspace.n != 3:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+
+    bbox = _ink_bbox(_coverage(pix), pix.width, pix.height)
+    if bbox is None:
+        raise HTTPException(status_code=400, detail="Signature is blank")
+    x0, y0, x1, y1 = bbox
+
+    # The field's printed size at SIGNATURE_DPI; never upscale
+    target_w = field_width * PAGE_POINTS_PER_FIELD_PX / 72 * SIGNATURE_DPI
+    target_h = field_height * PAGE_POINTS_PER_FIELD_PX / 72 * SIGNATURE_DPI
+    scale = min(1.0, target_w / (x1 - x0), target_h / (y1 - y0))
+    clip = fitz.IRect(int(x0 * scale), int(y0 * scale), max(int(x0 * scale) + 1, round(x1 * scale)),
+                      max(int(y0 * scale) + 1, round(y1 * scale)))
+    pix = fitz.Pixmap(pix, max(1, round(pix.width * scale)), max(1, round(pix.height * scale)), clip)
+
+    coverage = _coverage(pix)
+    bits = SIGNATURE_PNG_BITS
+    quantize = bytes(round(v * ((1 << bits) - 1) / 255) for v in range(256))
+    png = encode_palette_png(pix.width, pix.height, coverage.translate(quantize), _ink_color(pix, coverage), bits)
+    return "data:image/png;base64," + base64.b64encode(png).decode()
+
+def normalize_signature(data, field) -> str:
+    """The signature_data string to store for a SignatureUpdate payload on `field`."""
+    if data.signature_strokes is not None:
+        strokes = data.signature_strokes
+        return strokes_to_svg(strokes.width, strokes.height, strokes.strokes, strokes.stroke_width, strokes.color)
+    if is_vector_signature(data.signature_data):
+        try:
+            parsed = parse_svg_signature(data.signature_data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Unsupported SVG signature: {e}")
+        # Re-serialize so only parsed path data is ever stored
+        return strokes_to_svg(**parsed)
+    return normalize_raster_signature(data.signature_data, field.width, field.height)
+
+def draw_vector_signature(page, rect, signature_data: str):
+    """Draw a vector signature into rect (PDF points), scaled to fit and centered."""
+    import fitz
+
+    parsed = parse_svg_signature(signature_data)
+    scale = min(rect.width / parsed["width"], rect.height / parsed["height"])
+    offset_x = rect.x0 + (rect.width - parsed["width"] * scale) / 2
+    offset_y = rect.y0 + (rect.height - parsed["height"] * scale) / 2
+    color = tuple(int(parsed["color"][i:i + 2], 16) / 255 for i in (1, 3, 5))
+    line_width = parsed["stroke_width"] * scale
+
+    shape = page.new_shape()
+    for stroke in parsed["strokes"]:
+        points = [fitz.Point(offset_x + x * scale, offset_y + y * scale) for x, y in stroke]
+        if len(points) == 1:
+            # A dot (e.g. over an i)
+            shape.draw_circle(points[0], line_width / 2)
+            shape.finish(color=color, fill=color, width=0)
+        else:
+            shape.draw_polyline(points)
+            shape.finish(color=color, width=line_width, closePath=False, lineCap=1, lineJoin=1)
+    shape.commit()
@@ -0,0 +1,233 @@
+"""
+Where document PDFs live.
+
+Stored files are referenced by the string kept in Document.file_path /
+signed_file_path (and Template.file_path):
+
+- local:  a path under UPLOAD_DIR, e.g. "uploads/<uuid>.pdf", served by the /uploads mount
+- s3:     "s3://<bucket>/<key>" on any S3-compatible store (AWS, MinIO, R2, ...)
+
+STORAGE_BACKEND picks where new files are written; reads dispatch on the reference
+itself, so local files written before switching to S3 keep working. New files are
+fanned out under hash-prefix directories (`ab/cd/<name>`, see shard_name) so no
+single directory grows to millions of entries; shard_uploads.py moves older flat
+files into that layout. The S3 driver
+needs `boto3`; uploads stream through boto3's managed transfer, which switches to
+multipart above S3_MULTIPART_THRESHOLD, and downloads are handed out as presigned
+URLs so file bytes never pass through the API process.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Optional
+from ..database import UPLOAD_DIR
+from . import cold_tier
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+S3_BUCKET = os.getenv("S3_BUCKET", "docsign")
+S3_PREFIX = os.getenv("S3_PREFIX", "uploads/")
+# Point at MinIO or another S3-compatible endpoint; unset for AWS
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_MULTIPART_THRESHOLD = int(os.getenv("S3_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+S3_MULTIPART_CHUNKSIZE = int(os.getenv("S3_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+PRESIGNED_URL_TTL = int(os.getenv("PRESIGNED_URL_TTL", "300"))
+# Levels of two-hex-digit directories above each new file (0 = flat, 2 = 65,536 dirs)
+STORAGE_SHARD_DEPTH = int(os.getenv("STORAGE_SHARD_DEPTH", "2"))
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+def shard_name(name: str, depth: int = None) -> str:
+    """Where a new file called `name` goes, relative to the storage root: "ab/cd/<name>"."""
+    depth = STORAGE_SHARD_DEPTH if depth is None else depth
+    digest = hashlib.md5(name.encode()).hexdigest()
+    return "/".join([digest[2 * i:2 * i + 2] for i in range(depth)] + [name])
+
+class Storage:
+    def put(self, name: str, fileobj: BinaryIO, content_type: str = "application/pdf") -> str:
+        """Stream fileobj into storage under `name` and return its reference."""
+        raise NotImplementedError
+
+    def open(self, ref: str) -> BinaryIO:
+        """Readable binary stream of a stored file."""
+        raise NotImplementedError
+
+    def exists(self, ref: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, ref: str):
+        raise NotImplementedError
+
+    def url(self, ref: str, expires: int = PRESIGNED_URL_TTL) -> Optional[str]:
+        """URL the client can fetch the file from directly, or None if it must be streamed."""
+        raise NotImplementedError
+
+    @contextmanager
+    def local_path(self, ref: str):
+        """A filesystem path holding the file's bytes, for libraries that need one (PyMuPDF)."""
+        raise NotImplementedError
+
+    @contextmanager
+    def writable_path(self, name: str):
+        """
+        Yield a path to write a new file to; on exit it is stored under `name`. The
+        reference is available as the context value's `ref` after the block.
+        """
+        raise NotImplementedError
+
+class _Written:
+    def __init__(self, path: str):
+        self.path = path
+        self.ref = None
+
+class LocalStorage(Storage):
+    def __init__(self, root: str = UPLOAD_DIR):
+        self.root = root
+
+    def path_for(self, name: str) -> str:
+        """The (sharded) path a new file called `name` is written to; creates its directory."""
+        path = os.path.join(self.root, *shard_name(name).split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def put(self, name: str, fileobj: BinaryIO, content_type: str = "application/pdf") -> str:
+        path = self.path_for(name)
+        with open(path, "wb") as buffer:
+            shutil.copyfileobj(fileobj, buffer, COPY_BUFFER_SIZE)
+        return path
+
+    # Files moved to the cold tier (see cold_tier.py) are read through their pointer
+
+    def open(self, ref: str) -> BinaryIO:
+        if cold_tier.is_cold(ref):
+            return cold_tier.open_cold(ref)
+        return open(ref, "rb")
+
+    def exists(self, ref: str) -> bool:
+        return os.path.exists(ref) or os.path.exists(cold_tier.pointer_path(ref))
+
+    def delete(self, ref: str):
+        # Cold blobs may be shared; orphaned ones are swept by file_gc.py
+        for path in (ref, cold_tier.pointer_path(ref)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def url(self, ref: str, expires: int = PRESIGNED_URL_TTL) -> Optional[str]:
+        if cold_tier.is_cold(ref):
+            return None
+        # Served by the /uploads StaticFiles mount
+        return "/uploads/" + os.path.relpath(ref, self.root).replace(os.sep, "/")
+
+    @contextmanager
+    def local_path(self, ref: str):
+        if not cold_tier.is_cold(ref):
+            yield ref
+            return
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, os.path.basename(ref))
+            with self.open(ref) as src, open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+            yield path
+
+    @contextmanager
+    def writable_path(self, name: str):
+        written = _Written(self.path_for(name))
+        yield written
+        written.ref = written.path
+
+class S3Storage(Storage):
+    def __init__(self, bucket: str = S3_BUCKET, prefix: str = S3_PREFIX, client=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        # An injected client uses boto3's default transfer settings
+        self.transfer_config = None
+        if client is None:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+
+            client = boto3.client("s3", endpoint_url=S3_ENDPOINT_URL)
+            self.transfer_config = TransferConfig(
+                multipart_threshold=S3_MULTIPART_THRESHOLD, multipart_chunksize=S3_MULTIPART_CHUNKSIZE
+            )
+        self.client = client
+
+    def _split(self, ref: str) -> tuple:
+        bucket, _, key = ref[len("s3://"):].partition("/")
+        return bucket, key
+
+    def put(self, name: str, fileobj: BinaryIO, content_type: str = "application/pdf") -> str:
+        # Spread keys over prefixes too; S3 partitions request rate by prefix
+        key = self.prefix + shard_name(name)
+        self.client.upload_fileobj(
+            fileobj, self.bucket, key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self.transfer_config
+        )
+        return f"s3://{self.bucket}/{key}"
+
+    def open(self, ref: str) -> BinaryIO:
+        bucket, key = self._split(ref)
+        return self.client.get_object(Bucket=bucket, Key=key)["Body"]
+
+    def exists(self, ref: str) -> bool:
+        bucket, key = self._split(ref)
+        try:
+            self.client.head_object(Bucket=bucket, Key=key)
+            return True
+        except self.client.exceptions.ClientError:
+            return False
+
+    def delete(self, ref: str):
+        bucket, key = self._split(ref)
+        self.client.delete_object(Bucket=bucket, Key=key)
+
+    def url(self, ref: str, expires: int = PRESIGNED_URL_TTL) -> str:
+        bucket, key = self._split(ref)
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expires
+        )
+
+    @contextmanager
+    def local_path(self, ref: str):
+        bucket, key = self._split(ref)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, os.path.basename(key))
+            self.client.download_file(bucket, key, path, Config=self.transfer_config)
+            yield path
+
+    @contextmanager
+    def writable_path(self, name: str):
+        with tempfile.TemporaryDirectory() as tmp:
+            written = _Written(os.path.join(tmp, name))
+            yield written
+            with open(written.path, "rb") as f:
+                written.ref = self.put(name, f)
+
+_storage = None
+_local = None
+
+def get_storage() -> Storage:
+    """The backend new files are written to."""
+    global _storage
+    if _storage is None:
+        _storage = S3Storage() if STORAGE_BACKEND == "s3" else _local_storage()
+    return _storage
+
+def _local_storage() -> LocalStorage:
+    global _local
+    if _local is None:
+        _local = LocalStorage()
+    return _local
+
+def storage_for(ref: str) -> Storage:
+    """The backend holding an existing file, judged by its reference."""
+    if ref.startswith("s3://"):
+        storage = get_storage()
+        return storage if isinstance(storage, S3Storage) else S3Storage()
+    return _local_storage()
+
+def set_storage(storage: Optional[Storage]):
+    """Swap the write backend (tests, scripts)."""
+    global _storage
+    _storage = storage
@@ -0,0 +1,41 @@
+"""
+Whole-document state transitions as single set-based statements.
+
+Recall and completion used to walk every SignatureField through the ORM, one
+object (and on recall one UPDATE) per field. These run as one UPDATE each, however
+many fields a document has, and leave committing to the caller so the audit entry
+lands in the same transaction. ORM copies of the rows they touch are not refreshed
+until that commit expires them.
+"""
+from sqlalchemy import update, exists, or_, func
+from sqlalchemy.orm import Session
+from .. import models
+
+def reset_signatures(db: Session, document_id: int) -> int:
+    """Clear every signed field of a document back to pending. Returns how many changed."""
+    Field = models.SignatureField
+    db.flush()
+    result = db.execute(
+        update(Field)
+        .where(Field.document_id == document_id, or_(Field.status != "pending", Field.signature_data.isnot(None)))
+        .values(status="pending", signature_data=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def complete_if_signed(db: Session, document_id: int) -> bool:
+    """
+    Mark the document completed if no field is left unsigned. Returns True only for
+    the call that made the change, so concurrent final signatures complete it once.
+    """
+    Document, Field = models.Document, models.SignatureField
+    # The caller's pending field update must be visible to the NOT EXISTS below
+    db.flush()
+    unsigned = exists().where(Field.document_id == document_id, Field.status != "signed")
+    result = db.execute(
+        update(Document)
+        .where(Document.id == document_id, Document.status != models.DocumentStatus.COMPLETED, ~unsigned)
+        .values(status=models.DocumentStatus.COMPLETED, completed_at=func.now(), version=Document.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
@@ -0,0 +1,123 @@
+"""
+Compare concurrent request capacity of the sync (threadpool) and async DB modes.
+
+Starts one uvicorn worker per mode against a throwaway SQLite database, seeds a user
+and a few documents, then fires bursts of concurrent authenticated GETs at
+/api/docs/ and /api/docs/{id} and reports throughput and latency percentiles.
+
+Run from the project root:
+    python benchmarks/bench_concurrency.py --concurrency 10 50 200 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+DUMMY_PDF = b"%PDF-1.4 header dummy content"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(mode: str, db_path: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DB_MODE=mode, DATABASE_URL=f"sqlite:///{db_path}")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+def seed(base_url: str, documents: int) -> tuple:
+    email, password = "bench@example.com", "password123"
+    httpx.post(f"{base_url}/api/auth/register", json={"email": email, "password": password})
+    res = httpx.post(f"{base_url}/api/auth/login", data={"username": email, "password": password})
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+    ids = []
+    for i in range(documents):
+        res = httpx.post(
+            f"{base_url}/api/docs/upload",
+            params={"title": f"Bench {i}"},
+            files={"file": ("bench.pdf", DUMMY_PDF, "application/pdf")},
+            headers=headers,
+        )
+        ids.append(res.json()["id"])
+    return headers, ids
+
+async def run_load(base_url: str, headers: dict, ids: list, concurrency: int, total: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(f"/api/docs/{ids[i % len(ids)]}" if i % 2 else "/api/docs/")
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                path = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    res = await client.get(path)
+                    ok = res.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--documents", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode in ("sync", "async"):
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            proc = start_server(mode, os.path.join(tmp, "bench.db"), port)
+            base_url = f"http://127.0.0.1:{port}"
+            try:
+                headers, ids = seed(base_url, args.documents)
+                for concurrency in args.concurrency:
+                    r = asyncio.run(run_load(base_url, headers, ids, concurrency, args.requests))
+                    print(f"{mode:<6} {concurrency:>5} {r['rps']:>9.1f} {r['p50']:>8.1f} {r['p99']:>8.1f} {r['errors']:>7}")
+            finally:
+                proc.terminate()
+                proc.wait()
+
+if __name__ == "__main__":
+    main()
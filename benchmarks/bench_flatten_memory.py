@@ -0,0 +1,107 @@
+"""
+Peak memory of concurrent flattens: full rewrites vs the memory-bounded incremental
+mode in backend/utils/pdf_processor.py, with and without the flatten budget.
+
+Builds a scanned-style PDF whose first page holds one --mb MB uncompressed image
+(the shape that hurts: a full save holds the largest stream in memory), then in a
+fresh process per variant runs --concurrent flattens of it at once, each stamping
+a signature on two pages, and reports that process's peak RSS and wall time.
+
+Run from the project root:
+    python benchmarks/bench_flatten_memory.py --mb 150 --pages 50 --concurrent 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.getcwd())
+
+SIGNATURE = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+
+VARIANTS = {
+    # name: (FLATTEN_INCREMENTAL_MB, FLATTEN_MEMORY_BUDGET_MB)
+    "full, unbounded": (10 ** 6, 10 ** 6),
+    "full, budgeted": (10 ** 6, 256),
+    "incremental": (0, 256),
+}
+
+def build(path: str, mb: int, pages: int):
+    import fitz
+
+    pdf = fitz.open()
+    page = pdf.new_page()
+    side = int((mb * 1024 * 1024 / 3) ** 0.5)
+    xref = pdf.get_new_xref()
+    pdf.update_object(xref, f"<</Type/XObject/Subtype/Image/Width {side}/Height {side}"
+                            "/ColorSpace/DeviceRGB/BitsPerComponent 8>>")
+    pdf.update_stream(xref, os.urandom(4096) * (side * side * 3 // 4096 + 1), compress=False)
+    page.insert_image(page.rect, xref=xref)
+    for number in range(1, pages):
+        pdf.new_page().insert_text((72, 72), f"Page {number + 1}")
+    pdf.save(path)
+    pdf.close()
+
+def child(variant: str, path: str, concurrent: int):
+    incremental_mb, budget_mb = VARIANTS[variant]
+    os.environ["FLATTEN_INCREMENTAL_MB"] = str(incremental_mb)
+    os.environ["FLATTEN_MEMORY_BUDGET_MB"] = str(budget_mb)
+    from backend.utils import pdf_processor, storage
+    from backend.utils.memory_budget import peak_rss, MB
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        storage._storage = storage.LocalStorage(root=out_dir)
+        documents = [
+            SimpleNamespace(id=i, signature_fields=[
+                SimpleNamespace(id=p, page_number=p, x_position=400, y_position=500, width=200, height=80,
+                                status="signed", signature_data=SIGNATURE)
+                for p in (2, 3)
+            ])
+            for i in range(concurrent)
+        ]
+        start = time.perf_counter()
+        threads = [threading.Thread(target=pdf_processor._flatten, args=(d, path, "bench.pdf")) for d in documents]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(json.dumps({"peak_mb": peak_rss() / MB, "seconds": time.perf_counter() - start}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=150)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--concurrent", type=int, default=4)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--build", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.build:
+        build(args.path, args.mb, args.pages)
+        return
+    if args.child:
+        child(args.child, args.path, args.concurrent)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scanned.pdf")
+        # Built out of process: Linux children inherit the parent's peak RSS
+        subprocess.run([sys.executable, __file__, "--build", "--path", path, "--mb", str(args.mb),
+                        "--pages", str(args.pages)], check=True)
+        print(f"{os.path.getsize(path) / 1e6:.0f}MB PDF, {args.concurrent} concurrent flattens")
+        print(f"{'variant':<16} {'peak RSS MB':>11} {'seconds':>8}")
+        for variant in VARIANTS:
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", variant, "--path", path, "--concurrent", str(args.concurrent)],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(out)
+            print(f"{variant:<16} {result['peak_mb']:>11.0f} {result['seconds']:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measure cold-start cost of importing the app (`import backend.main`).
+
+Each sample is a fresh interpreter, so nothing is cached in sys.modules. Reports the
+median wall time of the import and, from `python -X importtime`, the heaviest
+top-level packages pulled in along the way.
+
+Run from the project root:
+    python benchmarks/bench_import.py --runs 10 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+TIMED_IMPORT = (
+    "import time; t = time.perf_counter(); import backend.main; "
+    "print(time.perf_counter() - t)"
+)
+
+def time_import(runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMED_IMPORT], capture_output=True, text=True, check=True, cwd=os.getcwd()
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+def heaviest_packages(top: int) -> list:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        capture_output=True, text=True, check=True, cwd=os.getcwd()
+    )
+    cumulative = {}
+    for line in out.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        root = name.strip().split(".")[0]
+        # Only count a package once, at its outermost (least indented) import
+        if name == name.lstrip() or root not in cumulative:
+            cumulative[root] = max(cumulative.get(root, 0), int(cum_us))
+    return sorted(cumulative.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    samples = time_import(args.runs)
+    print(f"import backend.main: median {statistics.median(samples) * 1000:.1f} ms, "
+          f"min {min(samples) * 1000:.1f} ms over {args.runs} runs")
+
+    print(f"\n{'package':<30} {'cumulative ms':>14}")
+    for name, cum_us in heaviest_packages(args.top):
+        print(f"{name:<30} {cum_us / 1000:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compare signed-PDF output profiles: file size vs save time.
+
+Builds a synthetic contract (text pages plus a scanned-looking image page), stamps
+PNG signatures onto it the way merge_signatures does, then saves the result with each
+profile in PDF_SAVE_PROFILES. Each run re-opens the source so every save does the
+same work.
+
+Run from the project root:
+    python benchmarks/bench_pdf_save.py --pages 20 --signatures 6 --runs 5
+    python benchmarks/bench_pdf_save.py --source path/to/real.pdf
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import fitz  # noqa: E402
+
+from backend.utils.pdf_processor import PDF_SAVE_PROFILES, save_options  # noqa: E402
+
+def build_source(path: str, pages: int):
+    doc = fitz.open()
+    paragraph = "The parties agree to the terms and conditions set out in this agreement. " * 6
+    for number in range(pages):
+        page = doc.new_page(width=612, height=792)
+        page.insert_textbox(fitz.Rect(54, 54, 558, 738), f"Section {number + 1}\n\n" + paragraph * 8, fontsize=10)
+    # A noisy RGB image, like a scanned exhibit
+    scan = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 600, 800), False)
+    scan.set_rect(scan.irect, (235, 235, 230))
+    for y in range(0, 800, 4):
+        scan.set_rect(fitz.IRect(40, y, 560, y + 1), (40 + y % 50, 40, 40))
+    doc.new_page(width=612, height=792).insert_image(fitz.Rect(0, 0, 612, 792), pixmap=scan)
+    # Uploaded PDFs usually arrive compressed already
+    doc.save(path, deflate=True, deflate_images=True)
+    doc.close()
+
+def signature_png() -> bytes:
+    # 600x200 canvas export, mostly transparent, like the signature pad produces
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 600, 200), True)
+    pixmap.clear_with()
+    for x in range(40, 560):
+        y = 100 + int(40 * ((x % 120) / 60 - 1))
+        pixmap.set_rect(fitz.IRect(x, y, x + 3, y + 3), (20, 20, 80, 255))
+    return pixmap.tobytes("png")
+
+def stamp(doc, signatures: int, png: bytes):
+    for i in range(signatures):
+        page = doc[i % doc.page_count]
+        page.insert_image(fitz.Rect(350, 600, 530, 660), stream=png)
+
+def bench(source: str, signatures: int, runs: int) -> list:
+    png = signature_png()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in PDF_SAVE_PROFILES:
+            options = save_options(profile)
+            out = os.path.join(tmp, f"{profile}.pdf")
+            samples = []
+            for _ in range(runs):
+                doc = fitz.open(source)
+                stamp(doc, signatures, png)
+                start = time.perf_counter()
+                doc.save(out, **options)
+                samples.append(time.perf_counter() - start)
+                doc.close()
+            results.append((profile, os.path.getsize(out), statistics.median(samples)))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", help="PDF to stamp (default: a generated contract)")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--signatures", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.source
+        if source is None:
+            source = os.path.join(tmp, "source.pdf")
+            build_source(source, args.pages)
+        print(f"source: {os.path.getsize(source) / 1024:.1f} KiB, {args.signatures} signatures, "
+              f"PyMuPDF {fitz.VersionBind}")
+
+        results = bench(source, args.signatures, args.runs)
+        baseline = results[0][1]
+        print(f"\n{'profile':<10} {'size KiB':>10} {'vs fast':>8} {'save ms':>9}")
+        for profile, size, seconds in results:
+            print(f"{profile:<10} {size / 1024:>10.1f} {size / baseline:>7.0%} {seconds * 1000:>9.1f}")
+
+if __name__ == "__main__":
+    main()
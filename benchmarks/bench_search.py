@@ -0,0 +1,109 @@
+"""
+Document search at scale: a LIKE scan over titles and text (what a naive search
+endpoint would do) vs the FTS5 index in backend/utils/search.py.
+
+Seeds a throwaway SQLite database with --documents documents spread over --users
+users, each with a few hundred words of synthetic text (a Zipf-ish vocabulary, so
+there are rare and very common terms), then times one user's first page of results
+for each query (median of --runs).
+
+Run from the project root:
+    python benchmarks/bench_search.py --documents 200000 --users 1000 --runs 5
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import Base  # noqa: E402
+from backend.utils.search import ensure_search_index, search_documents  # noqa: E402
+
+_rng = random.Random(7)
+VOCABULARY = sorted({"".join(_rng.choices(string.ascii_lowercase, k=_rng.randint(3, 10))) for _ in range(30000)})
+_rng.shuffle(VOCABULARY)
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+WORDS_PER_DOCUMENT = 300
+BATCH = 5000
+
+def seed(engine, documents: int, users: int):
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"id": i + 1, "email": f"user{i}@example.com", "hashed_password": "x"} for i in range(users)
+        ])
+        for start in range(0, documents, BATCH):
+            rows, entries = [], []
+            for document_id in range(start + 1, min(start + BATCH, documents) + 1):
+                title = " ".join(rng.choices(VOCABULARY[:2000], k=3))
+                body = " ".join(rng.choices(VOCABULARY, WEIGHTS, k=WORDS_PER_DOCUMENT))
+                rows.append({"id": document_id, "title": title, "file_path": f"uploads/{document_id}.pdf",
+                             "user_id": 1 + document_id % users, "text": body})
+                entries.append({"id": document_id, "title": title, "body": body, "owner": f"u{1 + document_id % users}"})
+            conn.execute(text(
+                "INSERT INTO documents (id, title, file_path, user_id, status, version)"
+                " VALUES (:id, :title, :file_path, :user_id, 'DRAFT', 1)"
+            ), rows)
+            conn.execute(text("INSERT INTO bench_text (document_id, body) VALUES (:id, :text)"), rows)
+            conn.execute(text("INSERT INTO document_search (rowid, title, body, owner) VALUES (:id, :title, :body, :owner)"), entries)
+
+def like_scan(db, user_id: int, query: str):
+    pattern = f"%{query}%"
+    return db.execute(text(
+        "SELECT d.id FROM documents d JOIN bench_text t ON t.document_id = d.id"
+        " WHERE d.user_id = :user_id AND (d.title LIKE :p OR t.body LIKE :p)"
+        " ORDER BY d.id DESC LIMIT 20"
+    ), {"user_id": user_id, "p": pattern}).all()
+
+def fts(db, user_id: int, query: str):
+    return search_documents(db, user_id, query, 20, 0)["items"]
+
+QUERIES = [
+    ("common", VOCABULARY[0]),
+    ("rare", VOCABULARY[-1]),
+    ("prefix", VOCABULARY[1][:3]),
+    ("two words", f"{VOCABULARY[5]} {VOCABULARY[300]}"),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            ensure_search_index(conn)
+            conn.execute(text("CREATE TABLE bench_text (document_id INTEGER PRIMARY KEY, body TEXT)"))
+        start = time.perf_counter()
+        seed(engine, args.documents, args.users)
+        print(f"seeded {args.documents} documents in {time.perf_counter() - start:.1f}s")
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        print(f"{'query':<10} {'variant':<6} {'hits':>5} {'ms':>9}")
+        for label, query in QUERIES:
+            for variant, fn in (("like", like_scan), ("fts5", fts)):
+                times = []
+                for _ in range(args.runs):
+                    db = Session()
+                    began = time.perf_counter()
+                    hits = fn(db, 1, query)
+                    times.append(time.perf_counter() - began)
+                    db.close()
+                print(f"{label:<10} {variant:<6} {len(hits):>5} {statistics.median(times) * 1000:>9.1f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
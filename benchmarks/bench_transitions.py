@@ -0,0 +1,124 @@
+"""
+Recall and completion on documents with many signature fields: the old per-field ORM
+loops vs the set-based statements in backend/utils/transitions.py.
+
+Seeds a throwaway SQLite database with one document per size, every field signed,
+then times each variant and counts the SQL statements it sends (median of --runs;
+the database is reset between runs).
+
+Run from the project root:
+    python benchmarks/bench_transitions.py --fields 1000 5000 --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+
+from sqlalchemy import create_engine, event, update  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import Base  # noqa: E402
+from backend.utils.transitions import reset_signatures, complete_if_signed  # noqa: E402
+
+SIGNATURE = "data:image/png;base64," + "A" * 2000
+
+def seed(Session, fields: int) -> int:
+    db = Session()
+    document = models.Document(title="bench", file_path="uploads/bench.pdf", status=models.DocumentStatus.PENDING)
+    db.add(document)
+    db.flush()
+    document_id = document.id
+    db.execute(models.SignatureField.__table__.insert(), [
+        {"document_id": document_id, "page_number": 1 + i // 20, "x_position": 100, "y_position": 30 * (i % 20),
+         "width": 100, "height": 40, "status": "signed", "signature_data": SIGNATURE}
+        for i in range(fields)
+    ])
+    db.commit()
+    db.close()
+    return document_id
+
+def restore(Session, document_id: int):
+    db = Session()
+    db.execute(update(models.SignatureField).where(models.SignatureField.document_id == document_id)
+               .values(status="signed", signature_data=SIGNATURE))
+    db.execute(update(models.Document).where(models.Document.id == document_id)
+               .values(status=models.DocumentStatus.PENDING))
+    db.commit()
+    db.close()
+
+# What recall_document / sign_signature_field did before
+
+def legacy_recall(db, document_id: int):
+    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    for field in document.signature_fields:
+        field.status = "pending"
+        field.signature_data = None
+    db.commit()
+
+def legacy_complete(db, document_id: int):
+    all_fields = db.query(models.SignatureField).filter(models.SignatureField.document_id == document_id).all()
+    if all(f.status == "signed" for f in all_fields):
+        document = db.query(models.Document).filter(models.Document.id == document_id).first()
+        document.status = models.DocumentStatus.COMPLETED
+        document.version += 1
+        db.commit()
+
+def set_based_recall(db, document_id: int):
+    reset_signatures(db, document_id)
+    db.commit()
+
+def set_based_complete(db, document_id: int):
+    complete_if_signed(db, document_id)
+    db.commit()
+
+VARIANTS = [
+    ("recall", "orm loop", legacy_recall),
+    ("recall", "set-based", set_based_recall),
+    ("complete", "orm loop", legacy_complete),
+    ("complete", "set-based", set_based_complete),
+]
+
+def bench(Session, document_id: int, runs: int, statements: list) -> list:
+    results = []
+    for operation, variant, fn in VARIANTS:
+        times, counts = [], []
+        for _ in range(runs):
+            restore(Session, document_id)
+            db = Session()
+            statements.clear()
+            start = time.perf_counter()
+            fn(db, document_id)
+            times.append(time.perf_counter() - start)
+            counts.append(len(statements))
+            db.close()
+        results.append((operation, variant, statistics.median(counts), statistics.median(times)))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        # One entry per cursor execute (an executemany counts once)
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        print(f"{'fields':>7} {'operation':<9} {'variant':<10} {'statements':>10} {'ms':>9}")
+        for fields in args.fields:
+            document_id = seed(Session, fields)
+            for operation, variant, count, seconds in bench(Session, document_id, args.runs, statements):
+                print(f"{fields:>7} {operation:<9} {variant:<10} {count:>10.0f} {seconds * 1000:>9.1f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
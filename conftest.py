@@ -0,0 +1,76 @@
+"""
+Fixtures shared by the test modules. pytest injects them by name; nothing here is
+imported by the tests.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.main import app
+from backend.database import Base, get_db
+
+@pytest.fixture(scope="session")
+def dummy_pdf() -> bytes:
+    """Smallest PDF the upload validator accepts: one blank page."""
+    return (
+        b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj 2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj"
+        b" 3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF"
+    )
+
+@pytest.fixture(scope="session", autouse=True)
+def upload_dir(tmp_path_factory) -> str:
+    """Stored files go to a temporary UPLOAD_DIR, never into the working tree."""
+    from backend import database
+    from backend.utils import cold_tier, storage
+
+    root = str(tmp_path_factory.mktemp("uploads"))
+    uploads = next(route for route in app.routes if getattr(route, "name", None) == "uploads")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(database, "UPLOAD_DIR", root)
+        mp.setattr(cold_tier, "UPLOAD_DIR", root)
+        mp.setattr(cold_tier, "COLD_DIR", os.path.join(root, "cold"))
+        mp.setattr(storage, "_local", storage.LocalStorage(root))
+        mp.setattr(storage, "_storage", None)
+        mp.setattr(uploads.app, "all_directories", [root])
+        yield root
+
+@pytest.fixture(scope="module")
+def database_url(request, tmp_path_factory) -> str:
+    """A SQLite database of the test module's own, in a temporary directory."""
+    name = request.module.__name__.rpartition(".")[2]
+    return f"sqlite:///{tmp_path_factory.mktemp(name) / 'test.db'}"
+
+@pytest.fixture(scope="module")
+def engine(database_url):
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="module")
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(scope="module")
+def test_db(engine):
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="module")
+def client(test_db, session_factory):
+    def override_get_db():
+        try:
+            db = session_factory()
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    del app.dependency_overrides[get_db]
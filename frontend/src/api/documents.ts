@@ -96,3 +96,33 @@ export const declinePublicDocument = async (token: string, reason: string): Prom
     });
     return response.data;
 };
+
+// PDFs are fetched through the download endpoints, which redirect to wherever the
+// storage backend serves them (local /uploads, presigned S3) or stream cold-tier
+// originals. The stored file_path is a storage reference, not a URL.
+export const getDocumentPdf = async (id: number, signed = false): Promise<Blob> => {
+    const response = await api.get<Blob>(`/api/docs/${id}/download`, {
+        params: { signed },
+        responseType: 'blob'
+    });
+    return response.data;
+};
+
+export const getPublicDocumentPdfUrl = (token: string, signed = false): string =>
+    `${api.defaults.baseURL}/api/docs/public/${token}/download${signed ? '?signed=true' : ''}`;
+
+export const openDocumentPdf = async (id: number, signed = false) => {
+    // Open the tab inside the click handler, before awaiting, so popup blockers allow it
+    const tab = window.open('', '_blank');
+    try {
+        const pdf = await getDocumentPdf(id, signed);
+        const url = URL.createObjectURL(new Blob([pdf], { type: 'application/pdf' }));
+        if (tab) {
+            tab.location.href = url;
+        }
+        setTimeout(() => URL.revokeObjectURL(url), 60_000);
+    } catch (error) {
+        tab?.close();
+        throw error;
+    }
+};
@@ -5,7 +5,7 @@ import { Button } from '../components/ui/Button';
 import { Input } from '../components/ui/Input';
 import { Plus, FileText, Clock, CheckCircle2, Download, Share2, X, Search } from 'lucide-react';
 import { UploadModal } from '../components/UploadModal';
-import { getDocuments, recallDocument } from '../api/documents';
+import { getDocuments, recallDocument, openDocumentPdf } from '../api/documents';
 import type { Document, DocumentStatus } from '../types';
 
 export const Dashboard = () => {
@@ -165,10 +165,7 @@ export const Dashboard = () => {
                                                         <Button
                                                             variant="secondary"
                                                             size="sm"
-                                                            onClick={() => {
-                                                                const url = `http://127.0.0.1:8000/${doc.signed_file_path!.replace(/\\/g, '/')}`;
-                                                                window.open(url, '_blank');
-                                                            }}
+                                                            onClick={() => openDocumentPdf(doc.id, true).catch(error => console.error("Download failed", error))}
                                                         >
                                                             <Download className="w-4 h-4 mr-2" />
                                                             Download
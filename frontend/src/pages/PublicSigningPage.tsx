@@ -3,7 +3,7 @@ import { useParams } from 'react-router-dom';
 import { Document as PDFDocument, Page, pdfjs } from 'react-pdf';
 import SignatureCanvas from 'react-signature-canvas';
 import { Button } from '../components/ui/Button';
-import { getPublicDocument, signPublicField, declinePublicDocument } from '../api/documents';
+import { getPublicDocument, signPublicField, declinePublicDocument, getPublicDocumentPdfUrl } from '../api/documents';
 import type { Document, SignatureField } from '../types';
 import { Loader2, Check, X, History } from 'lucide-react';
 import { HistorySidebar } from '../components/HistorySidebar';
@@ -177,7 +177,7 @@ export const PublicSigningPage = () => {
             <div className="flex-1 overflow-auto p-4 md:p-8 flex justify-center bg-gray-950">
                 <div className="relative shadow-[0_0_50px_rgba(0,0,0,0.5)]">
                     <PDFDocument
-                        file={`http://127.0.0.1:8000/${document.file_path.replace(/\\/g, '/')}`}
+                        file={getPublicDocumentPdfUrl(token!)}
                         onLoadSuccess={onDocumentLoadSuccess}
                         className="max-w-full"
                     >
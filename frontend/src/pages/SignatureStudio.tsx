@@ -3,7 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { Document as PDFDocument, Page, pdfjs } from 'react-pdf';
 import { useDrag, useDrop } from 'react-dnd';
 import { Button } from '../components/ui/Button';
-import { getDocument, addSignatureField, sendDocument, deleteSignatureField, updateSignatureField } from '../api/documents';
+import { getDocument, addSignatureField, sendDocument, deleteSignatureField, updateSignatureField, getDocumentPdf } from '../api/documents';
 import type { Document, SignatureField } from '../types';
 import { Loader2, Send, Type, X, History } from 'lucide-react';
 import { HistorySidebar } from '../components/HistorySidebar';
@@ -125,6 +125,7 @@ export const SignatureStudio = () => {
     const { id } = useParams<{ id: string }>();
     const navigate = useNavigate();
     const [document, setDocument] = useState<Document | null>(null);
+    const [pdf, setPdf] = useState<Blob | null>(null);
     const [numPages, setNumPages] = useState<number>(0);
     const [fields, setFields] = useState<SignatureField[]>([]);
     const [isLoading, setIsLoading] = useState(true);
@@ -142,6 +143,9 @@ export const SignatureStudio = () => {
                 })
                 .catch(err => console.error(err))
                 .finally(() => setIsLoading(false));
+            getDocumentPdf(Number(id))
+                .then(setPdf)
+                .catch(err => console.error("PDF download failed:", err));
         }
     }, [id]);
 
@@ -242,7 +246,7 @@ export const SignatureStudio = () => {
             <main className="flex-1 overflow-auto bg-gray-800/20 p-8 flex justify-center custom-scrollbar">
                 <div className="max-w-4xl w-full flex justify-center">
                     <PDFDocument
-                        file={`http://127.0.0.1:8000/${document.file_path.replace(/\\/g, '/')}`}
+                        file={pdf}
                         onLoadSuccess={onDocumentLoadSuccess}
                         onLoadError={(error) => console.error("PDF Load Error:", error)}
                         loading={<Loader2 className="animate-spin text-blue-500" />}
@@ -3,7 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { Document as PDFDocument, Page, pdfjs } from 'react-pdf';
 import SignatureCanvas from 'react-signature-canvas';
 import { Button } from '../components/ui/Button';
-import { getDocument, signSignatureField, recallDocument, declineDocument } from '../api/documents';
+import { getDocument, signSignatureField, recallDocument, declineDocument, getDocumentPdf } from '../api/documents';
 import type { Document, SignatureField } from '../types';
 import { Loader2, Check, X, History } from 'lucide-react';
 import { HistorySidebar } from '../components/HistorySidebar';
@@ -17,6 +17,7 @@ export const SigningPage = () => {
     const { id } = useParams<{ id: string }>();
     const navigate = useNavigate();
     const [document, setDocument] = useState<Document | null>(null);
+    const [pdf, setPdf] = useState<Blob | null>(null);
     const [numPages, setNumPages] = useState<number>(0);
     const [fields, setFields] = useState<SignatureField[]>([]);
     const [isLoading, setIsLoading] = useState(true);
@@ -36,6 +37,9 @@ export const SigningPage = () => {
                 })
                 .catch(err => console.error(err))
                 .finally(() => setIsLoading(false));
+            getDocumentPdf(Number(id))
+                .then(setPdf)
+                .catch(err => console.error("PDF download failed:", err));
         }
     }, [id]);
 
@@ -196,7 +200,7 @@ export const SigningPage = () => {
             <div className="flex-1 overflow-auto p-8 flex justify-center relative bg-gray-800/50">
                 <div className="relative shadow-2xl">
                     <PDFDocument
-                        file={`http://127.0.0.1:8000/${document.file_path.replace(/\\/g, '/')}`}
+                        file={pdf}
                         onLoadSuccess={onDocumentLoadSuccess}
                         onLoadError={(error) => console.error("PDF Load Error:", error)}
                         className="max-w-full"
@@ -0,0 +1,124 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend.utils import anchors, pdf_inspect
+
+SCALE = 800 / 612  # Letter page in the frontend's 800px space
+
+def contract(path=None, pages=2):
+    import fitz
+
+    pdf = fitz.open()
+    first = pdf.new_page(width=612, height=792)
+    first.insert_text((72, 600), "Signature:")
+    # A label right next to a tag is one field, not two
+    first.insert_text((72, 400), "Signature: {{sig:client@example.com}}")
+    first.insert_text((500, 200), "Sign here")
+    second = pdf.new_page(width=612, height=792)
+    widget = fitz.Widget()
+    widget.field_type = fitz.PDF_WIDGET_TYPE_SIGNATURE
+    widget.field_name = "approver"
+    widget.rect = fitz.Rect(100, 100, 250, 150)
+    second.add_widget(widget)
+    for number in range(2, pages):
+        pdf.new_page(width=612, height=792).insert_text((72, 72), f"Page {number + 1}. Signature:")
+    data = pdf.tobytes()
+    pdf.close()
+    if path:
+        with open(path, "wb") as f:
+            f.write(data)
+    return data
+
+def test_anchor_geometry(tmp_path):
+    path = str(tmp_path / "contract.pdf")
+    contract(path)
+    found = anchors.detect_in_file(path)
+    by_source = lambda source: [f for f in found if f["source"] == source]
+    (widget,), (tag,), labels = by_source("widget"), by_source("tag"), by_source("label")
+
+    assert widget["source"] == "widget" and widget["page_number"] == 2
+    assert (widget["x_position"], widget["y_position"]) == (round(175 * SCALE, 1), round(125 * SCALE, 1))
+    assert (widget["width"], widget["height"]) == (round(150 * SCALE, 1), round(50 * SCALE, 1))
+
+    assert tag["source"] == "tag" and tag["signer_email"] == "client@example.com"
+    assert abs(tag["y_position"] - 396 * SCALE) < 8
+
+    # Labels put the field after them on the line, or above when the line is full
+    above, right = sorted(labels, key=lambda f: f["y_position"])
+    assert right["x_position"] > 72 * SCALE + pdf_inspect.DEFAULT_FIELD_WIDTH / 2
+    assert abs(right["y_position"] - 596 * SCALE) < 8
+    assert above["y_position"] < 200 * SCALE - pdf_inspect.DEFAULT_FIELD_HEIGHT / 2
+    assert above["x_position"] + above["width"] / 2 <= 800
+
+def test_page_parallel_scan_matches_serial(tmp_path, monkeypatch):
+    path = str(tmp_path / "long.pdf")
+    contract(path, pages=12)
+    monkeypatch.setattr(anchors, "ANCHOR_WORKERS", 1)
+    serial = anchors.detect_in_file(path)
+
+    ranges = []
+    inspect_pdf = anchors.inspect_pdf
+    monkeypatch.setattr(anchors, "inspect_pdf", lambda path, **kw: ranges.append(kw.get("pages")) or inspect_pdf(path, **kw))
+    monkeypatch.setattr(anchors, "ANCHOR_PARALLEL_PAGES", 4)
+    monkeypatch.setattr(anchors, "ANCHOR_WORKERS", 2)
+    assert anchors.detect_in_file(path) == serial
+    # One pass finds the page count, then each range runs in its own sandboxed worker
+    assert ranges[0] is None and sorted(ranges[1:]) == [(0, 4), (4, 8), (8, 12)]
+    assert [f["page_number"] for f in serial] == sorted(f["page_number"] for f in serial)
+    assert len(serial) == 4 + 10
+
+def test_upload_and_detect_endpoint(client):
+    email, password = "anchors_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.post(
+        "/api/docs/upload?title=Contract&detect_fields=true",
+        files={"file": ("contract.pdf", contract(), "application/pdf")},
+        headers=headers
+    )
+    assert res.status_code == 200
+    document = res.json()
+    assert len(document["signature_fields"]) == 4
+    assert document["version"] == 1
+    assert "4 signature field(s) detected" in document["audit_logs"][0]["details"]
+
+    # Re-detecting finds nothing new
+    field = document["signature_fields"][0]
+    res = client.post(f"/api/docs/{document['id']}/fields/detect", headers=headers)
+    assert res.status_code == 200 and res.json() == []
+
+    # A removed field comes back
+    client.delete(f"/api/docs/{document['id']}/fields/{field['id']}", headers=headers)
+    res = client.post(f"/api/docs/{document['id']}/fields/detect", headers=headers)
+    assert [(f["page_number"], f["x_position"], f["y_position"]) for f in res.json()] == [
+        (field["page_number"], field["x_position"], field["y_position"])
+    ]
+    assert res.headers["ETag"] == f'"{document["id"]}-3"'
+    os.remove(document["file_path"])
+
+def test_unreadable_pdf_is_rejected(client):
+    token = client.post("/api/auth/login", data={"username": "anchors_test@example.com", "password": "password"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post(
+        "/api/docs/upload?title=Broken&detect_fields=true",
+        files={"file": ("broken.pdf", b"%PDF-1.4 test content", "application/pdf")},
+        headers=headers
+    )
+    assert res.status_code == 422
+
+    # A stored file that went bad after upload
+    document = client.post(
+        "/api/docs/upload?title=Damaged",
+        files={"file": ("contract.pdf", contract(), "application/pdf")},
+        headers=headers
+    ).json()
+    with open(document["file_path"], "wb") as f:
+        f.write(b"%PDF-1.4 test content")
+    res = client.post(f"/api/docs/{document['id']}/fields/detect", headers=headers)
+    assert res.status_code == 422
+    os.remove(document["file_path"])
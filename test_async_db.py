@@ -0,0 +1,72 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend.database import Base, get_async_db, get_async_url
+from backend.routers import auth_async, documents_async
+
+@pytest.fixture(scope="module")
+def test_db(database_url):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+@pytest.fixture(scope="module")
+def client(test_db, database_url):
+    async_engine = create_async_engine(get_async_url(database_url))
+    TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(auth_async.router)
+    app.include_router(documents_async.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as c:
+        yield c
+
+def test_async_get_async_url():
+    assert get_async_url("sqlite:///./x.db") == "sqlite+aiosqlite:///./x.db"
+    assert get_async_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+def test_async_flow(client, dummy_pdf):
+    email = "async_test@example.com"
+    password = "password123"
+
+    res = client.post("/api/auth/register", json={"email": email, "password": password, "full_name": "Async"})
+    assert res.status_code == 200, res.text
+
+    res = client.post("/api/auth/login", data={"username": email, "password": password})
+    assert res.status_code == 200, res.text
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+    res = client.post(
+        "/api/docs/upload?title=Async%20Contract",
+        files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    assert res.status_code == 200, res.text
+    doc = res.json()
+    assert doc["audit_logs"][0]["action"] == "upload"
+    os.remove(doc["file_path"])
+
+    res = client.get("/api/docs/", headers=headers)
+    assert [d["title"] for d in res.json()] == ["Async Contract"]
+
+    res = client.get(f"/api/docs/{doc['id']}", headers=headers)
+    assert res.status_code == 200
+    assert res.json()["id"] == doc["id"]
+
+    res = client.get("/api/docs/999999", headers=headers)
+    assert res.status_code == 404
@@ -0,0 +1,152 @@
+import pytest
+from sqlalchemy import text
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+from backend.utils import audit_chain
+
+@pytest.fixture(scope="module", autouse=True)
+def small_checkpoints():
+    # Small blocks so a short trail spans several checkpoints plus an open tail
+    interval = audit_chain.AUDIT_CHECKPOINT_INTERVAL
+    audit_chain.AUDIT_CHECKPOINT_INTERVAL = 4
+    yield
+    audit_chain.AUDIT_CHECKPOINT_INTERVAL = interval
+
+@pytest.fixture(scope="module")
+def document(client, dummy_pdf, session_factory):
+    email, password = "chain_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post(
+        "/api/docs/upload?title=Chained",
+        files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    os.remove(res.json()["file_path"])
+    doc_id = res.json()["id"]
+
+    db = session_factory()
+    for i in range(20):
+        audit_chain.append_audit_log(db, doc_id, None, "view", f"view {i}")
+    db.commit()
+    db.close()
+    return doc_id, headers
+
+def test_merkle_proofs():
+    hashes = [audit_chain.compute_entry_hash(audit_chain.GENESIS_HASH, 1, i, None, "a", None, "2024-01-01 00:00:00") for i in range(7)]
+    root = audit_chain.merkle_root(hashes)
+    for index, entry_hash in enumerate(hashes):
+        proof = audit_chain.merkle_proof(hashes, index)
+        assert audit_chain.verify_merkle_proof(entry_hash, proof, root)
+    assert not audit_chain.verify_merkle_proof(hashes[0], audit_chain.merkle_proof(hashes, 1), root)
+
+def test_intact_trail_verifies(client, document):
+    doc_id, headers = document
+    report = client.get(f"/api/docs/{doc_id}/audit/verify", headers=headers).json()
+    assert report["valid"], report["errors"]
+    assert report["entries_checked"] == 21
+    assert report["checkpoints_checked"] == 5
+
+    entries = client.get(f"/api/docs/{doc_id}/audit", params={"limit": 100}, headers=headers).json()["items"]
+    by_seq = {entry["seq"]: entry for entry in entries}
+    # seq 6 sits inside checkpoint 5-8; seq 21 is past the last checkpoint
+    proof = client.get(f"/api/docs/{doc_id}/audit/{by_seq[6]['id']}/proof", headers=headers).json()
+    assert proof["valid"], proof["errors"]
+    assert proof["checkpoint"]["seq_start"] == 5
+    assert len(proof["proof"]) == 2
+    proof = client.get(f"/api/docs/{doc_id}/audit/{by_seq[21]['id']}/proof", headers=headers).json()
+    assert proof["valid"], proof["errors"]
+    assert proof["checkpoint"] is None
+
+def test_tampering_is_detected(client, document, engine):
+    doc_id, headers = document
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE audit_logs SET details = 'edited' WHERE document_id = :d AND seq = 3"),
+            {"d": doc_id}
+        )
+    report = client.get(f"/api/docs/{doc_id}/audit/verify", headers=headers).json()
+    assert not report["valid"]
+    assert any(error.startswith("seq 3:") for error in report["errors"])
+
+    # A range that doesn't touch the edited entry still verifies on its own
+    report = client.get(f"/api/docs/{doc_id}/audit/verify?from_seq=12&to_seq=15", headers=headers).json()
+    assert report["valid"], report["errors"]
+    assert report["entries_checked"] == 4
+
+    # Rewriting the entry's hash too just moves the break to its checkpoint and successor
+    with engine.begin() as conn:
+        row = conn.execute(text("SELECT * FROM audit_logs WHERE document_id = :d AND seq = 3"), {"d": doc_id}).mappings().one()
+        forged = audit_chain.compute_entry_hash(
+            row["prev_hash"], doc_id, 3, row["user_id"], row["action"], row["details"], row["created_at"]
+        )
+        conn.execute(text("UPDATE audit_logs SET entry_hash = :h WHERE id = :i"), {"h": forged, "i": row["id"]})
+    errors = client.get(f"/api/docs/{doc_id}/audit/verify?to_seq=4", headers=headers).json()["errors"]
+    assert "checkpoint 1-4: Merkle root mismatch" in errors
+    assert "seq 4: prev_hash does not match the preceding entry" in errors
+
+def test_seal_existing_chains_legacy_rows(test_db, session_factory, engine):
+    db = session_factory()
+    user = models.User(email="legacy_chain@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    document = models.Document(title="Legacy", file_path="legacy.pdf", user_id=user.id)
+    db.add(document)
+    db.flush()
+    db.add_all([models.AuditLog(document_id=document.id, user_id=user.id, action="legacy") for _ in range(3)])
+    db.commit()
+    assert not audit_chain.verify_trail(db, document.id)["valid"]
+
+    with engine.begin() as conn:
+        audit_chain.seal_existing(conn, [document.id])
+    db.expire_all()
+    report = audit_chain.verify_trail(db, document.id)
+    assert report["valid"], report["errors"]
+    assert report["entries_checked"] == 3
+    db.close()
+
+def test_concurrent_appends_serialize(test_db, session_factory):
+    import threading
+    import time
+
+    db = session_factory()
+    user = models.User(email="concurrent_chain@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    document = models.Document(title="Concurrent", file_path="concurrent.pdf", user_id=user.id)
+    db.add(document)
+    db.commit()
+    document_id = document.id
+    db.close()
+
+    # Both writers read the head before either commits
+    barrier, errors = threading.Barrier(2), []
+    def sign(n):
+        session = session_factory()
+        try:
+            barrier.wait()
+            audit_chain.append_audit_log(session, document_id, None, "sign", f"signer {n}")
+            time.sleep(0.2)
+            session.commit()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=sign, args=(n,)) for n in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    db = session_factory()
+    report = audit_chain.verify_trail(db, document_id)
+    assert report["valid"] and report["entries_checked"] == 2
+    db.close()
@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime
+import csv
+import io
+import json
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+
+@pytest.fixture(scope="module")
+def document(client, dummy_pdf, session_factory):
+    email, password = "audit_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post(
+        "/api/docs/upload?title=Audited",
+        files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    os.remove(res.json()["file_path"])
+    doc_id = res.json()["id"]
+
+    # Many entries share a timestamp, so paging has to break ties on id
+    db = session_factory()
+    for i in range(24):
+        db.add(models.AuditLog(
+            document_id=doc_id, user_id=None, action="view", details=f"view {i}",
+            created_at=datetime(2024, 1, 1 + i // 10, 12, 0, 0)
+        ))
+    db.commit()
+    db.close()
+    return doc_id, headers
+
+def test_cursor_pagination(client, document):
+    doc_id, headers = document
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 10} if cursor is None else {"limit": 10, "cursor": cursor}
+        res = client.get(f"/api/docs/{doc_id}/audit", params=params, headers=headers)
+        assert res.status_code == 200, res.text
+        page = res.json()
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 25  # 24 views + the upload
+    assert len({entry["id"] for entry in seen}) == 25
+    keys = [(entry["created_at"], entry["id"]) for entry in seen]
+    assert keys == sorted(keys, reverse=True)
+
+def test_export_ndjson_date_range(client, document):
+    doc_id, headers = document
+    res = client.get(
+        "/api/docs/audit/export",
+        params={"start": "2024-01-02T00:00:00", "end": "2024-01-03T00:00:00"},
+        headers=headers
+    )
+    assert res.status_code == 200, res.text
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [row["details"] for row in rows] == [f"view {i}" for i in range(10, 20)]
+
+def test_export_csv(client, document):
+    doc_id, headers = document
+    res = client.get("/api/docs/audit/export", params={"format": "csv"}, headers=headers)
+    assert res.status_code == 200, res.text
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert len(rows) == 25
+    assert rows[0]["action"] == "view"
+    assert rows[-1]["action"] == "upload"
+
+    assert client.get("/api/docs/audit/export", params={"format": "xml"}, headers=headers).status_code == 400
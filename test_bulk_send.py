@@ -0,0 +1,108 @@
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+from backend.utils import bulk_send, outbox
+
+@pytest.fixture(scope="module")
+def template(client, dummy_pdf):
+    email, password = "bulk_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.post(
+        "/api/docs/upload?title=NDA",
+        files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    doc = res.json()
+    client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+        "page_number": 1, "x_position": 100, "y_position": 100, "width": 120, "height": 40
+    })
+    client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+        "page_number": 1, "x_position": 100, "y_position": 300, "width": 120, "height": 40,
+        "signer_email": "countersign@example.com"
+    })
+    template = client.post(f"/api/templates/from-document/{doc['id']}", headers=headers).json()
+    yield template, headers
+    os.remove(doc["file_path"])
+
+def template_path(db, template):
+    return db.query(models.Template).filter(models.Template.id == template["id"]).first().file_path
+
+def test_bulk_send_json(client, template, session_factory):
+    template, headers = template
+    recipients = [{"email": f"party{i}@example.com", "name": f"Party {i}"} for i in range(250)]
+
+    res = client.post("/api/bulk-sends/", headers=headers, json={"template_id": template["id"], "recipients": recipients})
+    assert res.status_code == 202, res.text
+    job_id = res.json()["id"]
+
+    # TestClient runs background tasks before returning, so the job is already done
+    job = client.get(f"/api/bulk-sends/{job_id}", headers=headers).json()
+    assert job["status"] == "completed"
+    assert job["total"] == job["created_count"] == 250
+    # SMTP is not configured in tests: every email stays queued for retry
+    assert job["emails"]["pending"] == 500
+
+    db = session_factory()
+    try:
+        docs = db.query(models.Document).filter(models.Document.title.like("NDA - Party %")).all()
+        assert len(docs) == 250
+        assert len({d.signing_token for d in docs}) == 250
+        assert all(d.status == models.DocumentStatus.PENDING and d.file_path == template_path(db, template) for d in docs)
+        fields = docs[0].signature_fields
+        assert sorted(f.signer_email for f in fields) == ["countersign@example.com", "party0@example.com"]
+    finally:
+        db.close()
+
+def test_bulk_send_csv(client, template):
+    template, headers = template
+    csv_data = "email,name\nalice@example.com,Alice\nbob@example.com,\n"
+    res = client.post(
+        f"/api/bulk-sends/csv?template_id={template['id']}&title=Batch",
+        files={"file": ("recipients.csv", csv_data.encode(), "text/csv")},
+        headers=headers
+    )
+    assert res.status_code == 202, res.text
+    job = client.get(f"/api/bulk-sends/{res.json()['id']}", headers=headers).json()
+    assert job["created_count"] == 2
+
+    res = client.post(
+        f"/api/bulk-sends/csv?template_id={template['id']}",
+        files={"file": ("recipients.csv", b"email\nnot-an-email\n", "text/csv")},
+        headers=headers
+    )
+    assert res.status_code == 400
+
+def test_bulk_send_requires_single_source(client, template):
+    template, headers = template
+    res = client.post("/api/bulk-sends/", headers=headers, json={"recipients": [{"email": "x@example.com"}]})
+    assert res.status_code == 400
+
+def test_failed_job_still_sends_committed_chunks(client, template, session_factory, monkeypatch):
+    template, headers = template
+    sent = []
+    monkeypatch.setattr(outbox, "send_signing_request", lambda **kwargs: sent.append(kwargs["signer_email"]) or True)
+    monkeypatch.setattr(bulk_send, "BULK_SEND_CHUNK_SIZE", 2)
+    create_chunk = bulk_send.create_chunk
+
+    def fail_second_chunk(db, job, file_path, layout, recipients, sender_name):
+        if job.created_count:
+            raise RuntimeError("disk full")
+        return create_chunk(db, job, file_path, layout, recipients, sender_name)
+
+    monkeypatch.setattr(bulk_send, "create_chunk", fail_second_chunk)
+    recipients = [{"email": f"partial{i}@example.com", "name": None} for i in range(5)]
+    res = client.post("/api/bulk-sends/", headers=headers, json={"template_id": template["id"], "recipients": recipients})
+    job = client.get(f"/api/bulk-sends/{res.json()['id']}", headers=headers).json()
+    assert job["status"] == "failed"
+    assert job["created_count"] == 2
+    # The first chunk's emails went out instead of waiting for a retry
+    assert job["emails"] == {"pending": 0, "sent": 4, "failed": 0}
+    assert sorted(sent) == ["countersign@example.com"] * 2 + ["partial0@example.com", "partial1@example.com"]
@@ -0,0 +1,97 @@
+import pytest
+from datetime import datetime, timezone
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+from backend.utils import cold_tier
+from backend.utils.storage import storage_for
+
+@pytest.fixture(scope="module")
+def pdf(dummy_pdf) -> bytes:
+    return dummy_pdf + b"\n% cold tier test content " + b"0123456789" * 2000
+
+@pytest.fixture(scope="module")
+def documents(client, session_factory, pdf):
+    email, password = "cold_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    docs = []
+    for title in ("Done A", "Done B", "Still pending", "Just done"):
+        res = client.post(
+            f"/api/docs/upload?title={title}",
+            files={"file": ("contract.pdf", pdf, "application/pdf")},
+            headers=headers
+        )
+        docs.append(res.json())
+
+    db = session_factory()
+    # All created long ago; the last one only completed now
+    states = [("completed", datetime(2020, 2, 1)), ("completed", datetime(2020, 2, 1)), ("pending", None),
+              ("completed", datetime.now(timezone.utc))]
+    for doc, (status, completed_at) in zip(docs, states):
+        row = db.query(models.Document).filter(models.Document.id == doc["id"]).first()
+        row.status = models.DocumentStatus(status)
+        row.created_at = datetime(2020, 1, 1)
+        row.completed_at = completed_at
+    db.commit()
+    db.close()
+    yield docs, headers
+    for doc in docs:
+        ref = doc["file_path"]
+        if cold_tier.is_cold(ref):
+            blob = os.path.join(cold_tier.UPLOAD_DIR, cold_tier.read_pointer(ref)["blob"])
+            if os.path.exists(blob):
+                os.remove(blob)
+        storage_for(ref).delete(ref)
+
+def test_tiering_compresses_and_dedups(client, documents, session_factory, pdf):
+    docs, headers = documents
+    db = session_factory()
+    dry = cold_tier.tier_cold_originals(db, older_than_days=30, dry_run=True)
+    assert dry["files"] == 2 and os.path.exists(docs[0]["file_path"])
+
+    report = cold_tier.tier_cold_originals(db, older_than_days=30)
+    db.close()
+    assert report["files"] == 2
+    assert report["deduplicated"] == 1
+    assert report["bytes_before"] == 2 * len(pdf)
+    assert 0 < report["bytes_after"] < len(pdf)
+    assert report["bytes_reclaimed"] == report["bytes_before"] - report["bytes_after"]
+
+    completed, pending, just_completed = docs[:2], docs[2], docs[3]
+    assert all(cold_tier.is_cold(doc["file_path"]) for doc in completed)
+    assert cold_tier.read_pointer(completed[0]["file_path"])["blob"] == cold_tier.read_pointer(completed[1]["file_path"])["blob"]
+    assert not cold_tier.is_cold(pending["file_path"])
+    # Age counts from completion, not upload
+    assert not cold_tier.is_cold(just_completed["file_path"])
+
+def test_cold_reads_are_transparent(client, documents, pdf):
+    docs, headers = documents
+    ref = docs[0]["file_path"]
+    storage = storage_for(ref)
+    assert storage.exists(ref)
+    with storage.open(ref) as f:
+        assert f.read() == pdf
+    with storage.local_path(ref) as path:
+        with open(path, "rb") as f:
+            assert f.read() == pdf
+
+    # No static file to redirect to, so the download streams through the decompressor
+    res = client.get(f"/api/docs/{docs[0]['id']}/download", headers=headers, follow_redirects=False)
+    assert res.status_code == 200
+    assert res.content == pdf
+
+def test_recall_thaws_original(client, documents, pdf):
+    docs, headers = documents
+    res = client.post(f"/api/docs/{docs[1]['id']}/recall", headers=headers)
+    assert res.status_code == 200, res.text
+    ref = docs[1]["file_path"]
+    assert not cold_tier.is_cold(ref)
+    with open(ref, "rb") as f:
+        assert f.read() == pdf
@@ -11,6 +11,12 @@ sys.path.append(os.getcwd())
 from backend.main import app
 from backend.database import Base, get_db
 
+# Smallest PDF the upload validator accepts: one blank page
+DUMMY_PDF = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj 2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj"
+    b" 3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF"
+)
+
 # Setup Test Database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_docs.db"
 engine = create_engine(
@@ -60,7 +66,7 @@ def test_docs(client):
     
     print("Creating dummy PDF...")
     with open("dummy.pdf", "wb") as f:
-        f.write(b"%PDF-1.4 header dummy content")
+        f.write(DUMMY_PDF)
     
     try:
         print("Uploading document...")
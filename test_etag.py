@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+from backend.utils.etag import bump_version
+
+@pytest.fixture(scope="module")
+def document(client, dummy_pdf):
+    email, password = "etag_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post(
+        "/api/docs/upload?title=ETag",
+        files={"file": ("contract.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    yield res.json(), res.headers["ETag"], headers
+    os.remove(res.json()["file_path"])
+
+def test_conditional_get(client, document):
+    doc, etag, headers = document
+    assert etag == f'"{doc["id"]}-1"'
+    assert doc["version"] == 1
+
+    res = client.get(f"/api/docs/{doc['id']}", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["ETag"] == etag
+
+    res = client.get(f"/api/docs/{doc['id']}?fields=status", headers={**headers, "If-None-Match": '"0-0"'})
+    assert res.status_code == 200
+    assert res.headers["ETag"] == etag
+
+def test_mutations_bump_version_and_honour_if_match(client, document):
+    doc, etag, headers = document
+    field = {"page_number": 1, "x_position": 100, "y_position": 100, "width": 100, "height": 40}
+
+    res = client.post(f"/api/docs/{doc['id']}/fields", headers={**headers, "If-Match": etag}, json=field)
+    assert res.status_code == 200, res.text
+    new_etag = res.headers["ETag"]
+    assert new_etag == f'"{doc["id"]}-2"'
+
+    # A client still holding the old version loses instead of overwriting
+    res = client.post(f"/api/docs/{doc['id']}/fields", headers={**headers, "If-Match": etag}, json=field)
+    assert res.status_code == 412
+    assert res.headers["ETag"] == new_etag
+
+    res = client.get(f"/api/docs/{doc['id']}", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json()["version"] == 2
+    assert len(res.json()["signature_fields"]) == 1
+
+    res = client.put(f"/api/docs/{doc['id']}/send", headers={**headers, "If-Match": f"W/{new_etag}"})
+    assert res.status_code == 200, res.text
+    assert res.json()["version"] == 3
+
+def test_concurrent_writer_is_detected(test_db, document, session_factory):
+    doc, _, _ = document
+    first, second = session_factory(), session_factory()
+    try:
+        a = first.get(models.Document, doc["id"])
+        b = second.get(models.Document, doc["id"])
+        bump_version(a)
+        first.commit()
+        bump_version(b)
+        with pytest.raises(StaleDataError):
+            second.commit()
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import threading
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend.routers.events import stream_public_document_events
+from backend.utils.events import InMemoryBackend, get_broker
+
+def parse_frame(frame: str) -> dict:
+    lines = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return json.loads(lines["data"])
+
+def test_in_memory_backend_delivers_across_threads():
+    backend = InMemoryBackend()
+
+    async def scenario():
+        sub = await backend.subscribe("document:1")
+        assert backend.subscriber_count("document:1") == 1
+        # Handlers publish from threadpool threads
+        thread = threading.Thread(target=backend.publish, args=("document:1", {"type": "status"}))
+        thread.start()
+        thread.join()
+        event = await sub.get(timeout=1)
+        assert await sub.get(timeout=0.01) is None
+        await sub.close()
+        return event
+
+    assert asyncio.run(scenario()) == {"type": "status"}
+    assert backend.subscriber_count("document:1") == 0
+
+def test_public_stream_pushes_field_signed(client, dummy_pdf, session_factory):
+    email, password = "events_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.post(
+        "/api/docs/upload?title=Streamed",
+        files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    doc = res.json()
+    os.remove(doc["file_path"])
+    field_ids = [
+        client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+            "page_number": 1, "x_position": 100, "y_position": y, "width": 100, "height": 40
+        }).json()["id"]
+        for y in (100, 200)
+    ]
+    signing_token = client.put(f"/api/docs/{doc['id']}/send", headers=headers).json()["signing_token"]
+
+    async def scenario():
+        db = session_factory()
+        response = stream_public_document_events(signing_token, db)
+        frames = response.body_iterator
+        snapshot = parse_frame(await frames.__anext__())
+        # Sign from a worker thread while this stream is subscribed
+        sign = threading.Thread(target=client.post, args=(
+            f"/api/docs/public/{signing_token}/fields/{field_ids[0]}/sign",
+        ), kwargs={"json": {"signature_data": "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="}})
+        sign.start()
+        event = parse_frame(await asyncio.wait_for(frames.__anext__(), 5))
+        sign.join()
+        await frames.aclose()
+        return snapshot, event
+
+    snapshot, event = asyncio.run(scenario())
+    assert snapshot == {"type": "status", "document_id": doc["id"], "status": "pending", "signed_file_path": None}
+    assert event["type"] == "field_signed"
+    assert event["field_id"] == field_ids[0]
+    assert get_broker().subscriber_count(f"document:{doc['id']}") == 0
+
+def test_document_stream_requires_owner(client):
+    assert client.get("/api/docs/999/events").status_code == 401
+    assert client.get("/api/docs/public/missing/events").status_code == 404
@@ -0,0 +1,112 @@
+import pytest
+import json
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend.database import Base
+from backend import models
+from backend.utils.file_gc import collect_garbage, iter_stored_files
+
+OLD = time.time() - 3 * 24 * 3600
+# The tests' files were all changed (ctime) just now; sweep as of three days on
+LATER = time.time() + 3 * 24 * 3600
+
+@pytest.fixture
+def db(engine, session_factory):
+    Base.metadata.create_all(bind=engine)
+    session = session_factory()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def uploads(tmp_path, db):
+    root = str(tmp_path / "uploads")
+
+    def put(rel, content=b"%PDF-1.4 test content", recent=False):
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        os.utime(path, (LATER, LATER) if recent else (OLD, OLD))
+        return path
+
+    original = put("original.pdf")
+    signed = put("signed_1_original.pdf")
+    put("signed_1_recalled.pdf")                 # signed copy dropped by a recall
+    put("stray-upload.pdf")                      # upload that never got a row
+    put("in-flight.pdf", recent=True)            # upload whose row isn't committed yet
+    template = put("ab/template.pdf")
+    put("cold/live.zst")
+    put("cold/dead.zst")
+    put("frozen.pdf.cold", json.dumps({"blob": "cold/live.zst", "codec": "zstd"}).encode())
+    put("gone.pdf.cold", json.dumps({"blob": "cold/dead.zst", "codec": "zstd"}).encode())
+
+    owner = models.User(email="gc_test@example.com", hashed_password="x")
+    db.add(owner)
+    db.flush()
+    db.add_all([
+        models.Document(title="Signed", file_path=original, signed_file_path=signed, user_id=owner.id),
+        models.Document(title="Frozen", file_path=os.path.join(root, "frozen.pdf"), user_id=owner.id),
+        models.Template(title="Template", file_path=template, user_id=owner.id),
+    ])
+    db.commit()
+    return root
+
+SWEPT = ["cold/dead.zst", "gone.pdf.cold", "signed_1_recalled.pdf", "stray-upload.pdf"]
+
+def test_listing_is_sorted_and_skips_cold_store(uploads):
+    paths = [rel for rel, _ in iter_stored_files(uploads)]
+    assert paths == sorted(paths)
+    assert "ab/template.pdf" in paths
+    assert not any(p.startswith("cold/") for p in paths)
+
+def test_dry_run_reports_without_touching_files(db, uploads):
+    report = collect_garbage(db, root=uploads, mode="dry-run", list_paths=True, now=LATER)
+    assert sorted(report["paths"]) == SWEPT
+    assert (report["orphan_files"], report["orphan_blobs"], report["recent"]) == (3, 1, 1)
+    assert report["referenced"] == 4
+    assert all(os.path.exists(os.path.join(uploads, rel)) for rel in SWEPT)
+
+def test_quarantine_moves_orphans_and_keeps_everything_referenced(db, uploads, tmp_path):
+    quarantine = str(tmp_path / "quarantine")
+    report = collect_garbage(db, root=uploads, mode="quarantine", quarantine_dir=quarantine, now=LATER)
+    assert report["orphan_files"] + report["orphan_blobs"] == len(SWEPT)
+
+    remaining = sorted(rel for rel, _ in iter_stored_files(uploads))
+    assert remaining == ["ab/template.pdf", "frozen.pdf.cold", "in-flight.pdf", "original.pdf", "signed_1_original.pdf"]
+    assert os.path.exists(os.path.join(uploads, "cold/live.zst"))
+    assert not os.path.exists(os.path.join(uploads, "cold/dead.zst"))
+    (run,) = os.listdir(quarantine)
+    assert os.path.exists(os.path.join(quarantine, run, "stray-upload.pdf"))
+
+    # Nothing left to sweep
+    report = collect_garbage(db, root=uploads, mode="delete", now=LATER)
+    assert report["orphan_files"] + report["orphan_blobs"] == 0
+
+def test_freshly_linked_file_with_old_mtime_is_recent(db, uploads):
+    # shard_uploads hard-links the flat file: the new name shares its old mtime
+    flat = os.path.join(uploads, "stray-upload.pdf")
+    os.makedirs(os.path.join(uploads, "zz"))
+    os.link(flat, os.path.join(uploads, "zz", "stray-upload.pdf"))
+    assert os.stat(flat).st_mtime == OLD
+    report = collect_garbage(db, root=uploads, mode="delete", list_paths=True)
+    assert report["paths"] == []
+    assert os.path.exists(os.path.join(uploads, "zz", "stray-upload.pdf"))
+
+def test_cli_defaults_to_dry_run(monkeypatch):
+    from backend.utils import file_gc
+
+    modes = []
+    monkeypatch.setattr(file_gc, "collect_garbage", lambda db, mode, **kwargs: modes.append(mode) or {})
+    for argv in ([], ["--delete"], ["--quarantine"]):
+        monkeypatch.setattr("sys.argv", ["file_gc", *argv])
+        file_gc.main()
+    assert modes == ["dry-run", "delete", "quarantine"]
+    monkeypatch.setattr("sys.argv", ["file_gc", "--delete", "--quarantine"])
+    with pytest.raises(SystemExit):
+        file_gc.main()
@@ -0,0 +1,104 @@
+import pytest
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend.utils import pdf_processor
+from backend.utils.memory_budget import MemoryBudget, current_rss, peak_rss, MB
+
+SIGNATURE = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+
+def test_budget_is_fifo_and_caps_oversized_jobs():
+    budget = MemoryBudget(100)
+    order = []
+    assert budget.acquire(60) == 60
+
+    def job(name, cost):
+        with budget.reserve(cost):
+            order.append(name)
+
+    # The big job queued first runs before the small one that would already fit
+    big = threading.Thread(target=job, args=("big", 500))
+    big.start()
+    while budget.waiting < 1:
+        time.sleep(0.01)
+    small = threading.Thread(target=job, args=("small", 10))
+    small.start()
+    while budget.waiting < 2:
+        time.sleep(0.01)
+    assert order == []
+    budget.release(60)
+    big.join()
+    small.join()
+    assert order == ["big", "small"]
+    assert budget.in_use == 0 and budget.waiting == 0
+
+def test_budget_timeout_leaves_queue_clean():
+    budget = MemoryBudget(100)
+    budget.acquire(100)
+    with pytest.raises(TimeoutError):
+        budget.acquire(1, timeout=0.05)
+    assert budget.waiting == 0
+    budget.release(100)
+    assert budget.acquire(100, timeout=0.05) == 100
+
+def test_rss_readings():
+    assert current_rss() > 0
+    assert peak_rss() >= current_rss()
+
+def pdf_file(path, pages):
+    import fitz
+
+    pdf = fitz.open()
+    for number in range(pages):
+        pdf.new_page(width=612, height=792).insert_text((72, 72), f"Page {number + 1}")
+    pdf.save(path)
+    pdf.close()
+    return path
+
+def signed_document(document_id, pages):
+    fields = [
+        SimpleNamespace(id=number, page_number=number, x_position=400, y_position=500, width=200, height=80,
+                        status="signed", signature_data=SIGNATURE)
+        for number in pages
+    ] + [SimpleNamespace(id=99, page_number=1, status="pending", signature_data=None)]
+    return SimpleNamespace(id=document_id, page_count=None, signature_fields=fields)
+
+@pytest.mark.parametrize("threshold_mb, mode", [(1024, "full"), (0, "incremental")])
+def test_flatten_modes(tmp_path, monkeypatch, threshold_mb, mode):
+    import fitz
+
+    monkeypatch.setattr(pdf_processor, "FLATTEN_INCREMENTAL_MB", threshold_mb)
+    original = pdf_file(str(tmp_path / "original.pdf"), pages=20)
+    with open(original, "rb") as f:
+        original_bytes = f.read()
+
+    signed = pdf_processor._flatten(signed_document(7000 + threshold_mb, [2, 15]), original, "original.pdf")
+    try:
+        stats = pdf_processor.flatten_stats()
+        assert stats["last"]["mode"] == mode
+        assert stats["last"]["pages_stamped"] == 2
+        assert stats["reserved_mb"] == 0
+        with open(signed, "rb") as f:
+            signed_bytes = f.read()
+        # An incremental save appends to an untouched copy of the original
+        assert signed_bytes.startswith(original_bytes) == (mode == "incremental")
+        with open(original, "rb") as f:
+            assert f.read() == original_bytes
+
+        pdf = fitz.open(signed)
+        assert [bool(pdf[i].get_images()) for i in range(20)] == [i in (1, 14) for i in range(20)]
+        pdf.close()
+    finally:
+        os.remove(signed)
+
+def test_cost_estimates():
+    full = pdf_processor.flatten_cost(200 * MB, 1, incremental=False)
+    incremental = pdf_processor.flatten_cost(200 * MB, 1, incremental=True)
+    assert full - incremental == 200 * MB
+    assert pdf_processor.flatten_cost(0, 3, incremental=True) > incremental
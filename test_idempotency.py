@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend.main import app
+from backend import models
+from backend.routers import documents
+from backend.utils.idempotency import claim, request_scope
+
+SIGNATURE = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+
+@pytest.fixture(scope="module")
+def headers(client):
+    email, password = "idempotency_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def upload(client, headers, key, content):
+    return client.post(
+        "/api/docs/upload?title=Retried",
+        files={"file": ("contract.pdf", content, "application/pdf")},
+        headers={**headers, "Idempotency-Key": key}
+    )
+
+def test_retried_upload_is_replayed(client, headers, dummy_pdf, session_factory):
+    first = upload(client, headers, "upload-1", dummy_pdf)
+    assert first.status_code == 200, first.text
+    retry = upload(client, headers, "upload-1", dummy_pdf)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert retry.headers["ETag"] == first.headers["ETag"]
+
+    db = session_factory()
+    try:
+        assert db.query(models.Document).filter(models.Document.title == "Retried").count() == 1
+    finally:
+        db.close()
+
+    # Same key, different file
+    res = upload(client, headers, "upload-1", dummy_pdf + b"\n% other content")
+    assert res.status_code == 422
+    os.remove(first.json()["file_path"])
+
+def test_retried_send_and_sign_run_once(client, headers, dummy_pdf, monkeypatch, session_factory):
+    sent = []
+    monkeypatch.setattr(documents, "send_signing_request", lambda **kwargs: sent.append(kwargs))
+
+    doc = upload(client, headers, "upload-2", dummy_pdf).json()
+    field = client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+        "page_number": 1, "x_position": 100, "y_position": 100, "width": 100, "height": 40,
+        "signer_email": "signer@example.com"
+    }).json()
+    client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+        "page_number": 1, "x_position": 100, "y_position": 300, "width": 100, "height": 40
+    })
+
+    for _ in range(3):
+        res = client.put(f"/api/docs/{doc['id']}/send", headers={**headers, "Idempotency-Key": "send-1"})
+        assert res.status_code == 200, res.text
+    assert len(sent) == 1
+
+    url = f"/api/docs/public/{res.json()['signing_token']}/fields/{field['id']}/sign"
+    for _ in range(2):
+        res = client.post(url, json={"signature_data": SIGNATURE}, headers={"Idempotency-Key": "sign-1"})
+        assert res.status_code == 200, res.text
+
+    db = session_factory()
+    try:
+        signs = db.query(models.AuditLog).filter(
+            models.AuditLog.document_id == doc["id"], models.AuditLog.action == "sign"
+        ).count()
+        assert signs == 1
+    finally:
+        db.close()
+    os.remove(doc["file_path"])
+
+def test_key_in_progress_is_a_conflict(client, headers, dummy_pdf):
+    path = "/api/docs/upload"
+    assert claim(app, request_scope("POST", path, headers["Authorization"].encode()), "upload-3") is None
+    res = upload(client, headers, "upload-3", dummy_pdf)
+    assert res.status_code == 409
+
+def test_stale_claim_is_reclaimed(client, headers, dummy_pdf, session_factory):
+    path = "/api/docs/upload"
+    key_scope = request_scope("POST", path, headers["Authorization"].encode())
+    assert claim(app, key_scope, "upload-4") is None
+    # The worker running the first attempt died and its lease ran out
+    db = session_factory()
+    db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key == "upload-4").update(
+        {"locked_until": datetime.now(timezone.utc) - timedelta(seconds=1)}
+    )
+    db.commit()
+    db.close()
+
+    res = upload(client, headers, "upload-4", dummy_pdf)
+    assert res.status_code == 200 and "Idempotent-Replayed" not in res.headers
+    assert upload(client, headers, "upload-4", dummy_pdf).headers["Idempotent-Replayed"] == "true"
+    os.remove(res.json()["file_path"])
+
+def test_requests_without_key_are_untouched(client, headers, dummy_pdf):
+    res = client.post(
+        "/api/docs/upload?title=Plain",
+        files={"file": ("contract.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    assert res.status_code == 200
+    assert "Idempotent-Replayed" not in res.headers
+    os.remove(res.json()["file_path"])
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import migrations
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_migrations.db"
+
+@pytest.fixture
+def engine():
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    yield engine
+    engine.dispose()
+    if os.path.exists("test_migrations.db"):
+        os.remove("test_migrations.db")
+
+def test_fresh_database_upgrades_to_latest(engine):
+    applied = migrations.upgrade(engine)
+    assert applied == [version for version, _, _ in migrations.MIGRATIONS]
+    assert migrations.applied_versions(engine) == set(applied)
+
+    tables = set(inspect(engine).get_table_names())
+    assert {"users", "documents", "signature_fields", "audit_logs", "schema_migrations"} <= tables
+
+    # Second run is a no-op
+    assert migrations.upgrade(engine) == []
+
+def test_legacy_database_gains_missing_columns(engine):
+    # Shape of a database created before signing tokens / signer emails existed
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL, hashed_password VARCHAR NOT NULL, full_name VARCHAR, created_at DATETIME)"))
+        conn.execute(text("CREATE TABLE documents (id INTEGER PRIMARY KEY, title VARCHAR, status VARCHAR, file_path VARCHAR NOT NULL, user_id INTEGER, created_at DATETIME)"))
+        conn.execute(text("CREATE TABLE signature_fields (id INTEGER PRIMARY KEY, document_id INTEGER, page_number INTEGER NOT NULL, x_position FLOAT NOT NULL, y_position FLOAT NOT NULL, width FLOAT NOT NULL, height FLOAT NOT NULL, status VARCHAR, signature_data VARCHAR)"))
+
+    migrations.upgrade(engine)
+
+    columns = {c["name"] for c in inspect(engine).get_columns("documents")}
+    assert {"signed_file_path", "signing_token"} <= columns
+    columns = {c["name"] for c in inspect(engine).get_columns("signature_fields")}
+    assert "signer_email" in columns
+    assert "audit_logs" in inspect(engine).get_table_names()
+
+def test_completion_time_backfilled_from_audit_log(engine):
+    migrations.upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO documents (id, title, status, file_path, created_at) VALUES "
+                          "(1, 'Done', 'COMPLETED', 'a.pdf', '2020-01-01'), (2, 'Open', 'PENDING', 'b.pdf', '2020-01-01')"))
+        conn.execute(text("INSERT INTO audit_logs (document_id, action, created_at) VALUES "
+                          "(1, 'sign', '2020-02-01'), (1, 'complete', '2020-03-01'), (2, 'sign', '2020-02-01')"))
+        migrations.m013_document_completed_at(conn)
+        rows = conn.execute(text("SELECT id, completed_at FROM documents ORDER BY id")).all()
+    assert [(document_id, completed_at and str(completed_at)[:10]) for document_id, completed_at in rows] == [(1, "2020-03-01"), (2, None)]
@@ -0,0 +1,44 @@
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend.utils.pdf_processor import PDF_SAVE_PROFILES, save_options
+
+def test_profiles_shrink_output(tmp_path):
+    import fitz
+
+    sizes = {}
+    for profile in ("fast", "balanced", "compact"):
+        doc = fitz.open()
+        for _ in range(3):
+            doc.new_page().insert_text((72, 72), "Signed agreement " * 40)
+        path = tmp_path / f"{profile}.pdf"
+        doc.save(str(path), **save_options(profile))
+        doc.close()
+        assert fitz.open(str(path)).page_count == 3
+        sizes[profile] = path.stat().st_size
+    assert sizes["compact"] <= sizes["balanced"] < sizes["fast"]
+
+def test_unsupported_options_are_dropped():
+    import fitz
+
+    options = save_options("web")
+    mupdf_version = tuple(int(part) for part in fitz.VersionBind.split(".")[:2])
+    assert options.get("linear", False) == (mupdf_version < (1, 24))
+    assert set(options) <= set(PDF_SAVE_PROFILES["web"])
+
+    with pytest.raises(ValueError):
+        save_options("tiny")
+
+def test_unknown_profile_fails_startup(monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    from backend.utils import pdf_processor
+
+    monkeypatch.setattr(pdf_processor, "PDF_SAVE_PROFILE", "tiny")
+    with pytest.raises(ValueError, match="tiny"):
+        with TestClient(app):
+            pass
@@ -0,0 +1,127 @@
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+from backend.utils import pdf_validation
+from backend.utils.pdf_processor import merge_signatures
+
+SIGNATURE = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+
+def make_pdf(pages=3, **encryption):
+    import fitz
+
+    pdf = fitz.open()
+    for _ in range(pages):
+        pdf.new_page()
+    data = pdf.tobytes(**encryption)
+    pdf.close()
+    return data
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+def test_inspect_reports(tmp_path):
+    import fitz
+
+    report = pdf_validation.inspect_pdf(write(tmp_path, "ok.pdf", make_pdf()))
+    assert report["ok"] and report["pages"] == 3 and report["encrypted"] is False
+
+    garbage = pdf_validation.inspect_pdf(write(tmp_path, "garbage.pdf", b"%PDF-1.4 test content"))
+    assert garbage == {"ok": False, "error": "malformed", "detail": garbage["detail"]}
+
+    locked = make_pdf(encryption=fitz.PDF_ENCRYPT_AES_256, user_pw="secret", owner_pw="owner")
+    assert pdf_validation.inspect_pdf(write(tmp_path, "locked.pdf", locked))["error"] == "password"
+
+    # Permissions-only encryption opens without a password
+    restricted = make_pdf(encryption=fitz.PDF_ENCRYPT_AES_256, owner_pw="owner")
+    report = pdf_validation.inspect_pdf(write(tmp_path, "restricted.pdf", restricted))
+    assert report["ok"] and report["encrypted"] is True
+
+def test_limits_end_the_worker(tmp_path, monkeypatch):
+    path = write(tmp_path, "ok.pdf", make_pdf())
+    monkeypatch.setattr(pdf_validation, "PDF_VALIDATION_TIMEOUT", 0.01)
+    assert pdf_validation.inspect_pdf(path)["error"] == "timeout"
+    monkeypatch.undo()
+
+    # Stand-in workers that apply the real limits, then spin or allocate past them
+    worker_dir = os.path.dirname(pdf_validation.WORKER)
+    prelude = f"import sys; sys.path.insert(0, {worker_dir!r}); from pdf_inspect import _limit\n"
+    spin = write(tmp_path, "spin.py", (prelude + "_limit(1, 64)\nwhile True: pass\n").encode())
+    monkeypatch.setattr(pdf_validation, "WORKER", spin)
+    assert pdf_validation.inspect_pdf(path)["error"] == "timeout"
+
+    balloon = write(tmp_path, "balloon.py", (prelude + "_limit(10, 32)\nx = bytearray(256 * 1024 * 1024)\n").encode())
+    monkeypatch.setattr(pdf_validation, "WORKER", balloon)
+    assert pdf_validation.inspect_pdf(path)["error"] == "memory"
+
+def test_upload_is_validated_once(client, monkeypatch, session_factory):
+    import fitz
+
+    client.post("/api/auth/register", json={"email": "validation_test@example.com", "password": "password"})
+    token = client.post("/api/auth/login", data={"username": "validation_test@example.com", "password": "password"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.post(
+        "/api/docs/upload?title=Contract",
+        files={"file": ("contract.pdf", make_pdf(pages=2), "application/pdf")},
+        headers=headers
+    )
+    assert res.status_code == 200 and res.json()["page_count"] == 2
+    document = res.json()
+
+    # Flattening uses the cached result instead of validating again
+    monkeypatch.setattr(pdf_validation, "validate_pdf", lambda ref: pytest.fail("validated twice"))
+    db = session_factory()
+    try:
+        db.add(models.SignatureField(
+            document_id=document["id"], page_number=5, x_position=100, y_position=100, width=150, height=60,
+            status="signed", signature_data=SIGNATURE,
+        ))
+        db.commit()
+        # A field past the last page is skipped rather than failing the merge
+        signed = merge_signatures(document["id"], db)
+        assert signed is not None
+    finally:
+        db.close()
+    monkeypatch.undo()
+
+    validated = []
+    validate_pdf = pdf_validation.validate_pdf
+    monkeypatch.setattr(pdf_validation, "validate_pdf", lambda ref, **options: validated.append(ref) or validate_pdf(ref, **options))
+    locked = make_pdf(encryption=fitz.PDF_ENCRYPT_AES_256, user_pw="secret", owner_pw="owner")
+    res = client.post(
+        "/api/docs/upload?title=Locked",
+        files={"file": ("locked.pdf", locked, "application/pdf")},
+        headers=headers
+    )
+    assert res.status_code == 422 and res.json()["detail"] == "Password-protected PDFs are not supported"
+    # The rejected file isn't left in storage
+    assert len(validated) == 1 and not os.path.exists(validated[0])
+    os.remove(document["file_path"])
+    os.remove(signed)
+
+def test_legacy_document_is_validated_on_first_use(test_db, tmp_path, session_factory):
+    db = session_factory()
+    try:
+        user = models.User(email="legacy_validation@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        document = models.Document(
+            title="Legacy", file_path=write(tmp_path, "legacy.pdf", b"%PDF-1.4 test content"), user_id=user.id
+        )
+        db.add(document)
+        db.commit()
+        assert document.validated_at is None
+
+        assert merge_signatures(document.id, db) is None
+        db.refresh(document)
+        assert document.pdf_error == "malformed" and document.validated_at is not None
+        assert document.version == 2
+    finally:
+        db.close()
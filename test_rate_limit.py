@@ -0,0 +1,112 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.append(os.getcwd())
+
+from backend.utils.rate_limit import (
+    InMemoryBucketStore, RateLimiter, RateLimitMiddleware, RateLimitPolicy
+)
+
+def make_app(policies):
+    calls = []
+    app = FastAPI()
+
+    @app.post("/api/auth/login")
+    async def login(request: Request):
+        calls.append("login")
+        form = await request.form()
+        return {"ok": True, "username": form.get("username")}
+
+    @app.get("/api/docs/public/{token}")
+    def public(token: str):
+        calls.append(token)
+        return {"token": token}
+
+    limiter = RateLimiter(policies, InMemoryBucketStore())
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return TestClient(app), limiter, calls
+
+def test_bucket_refills_over_time():
+    store = InMemoryBucketStore()
+    assert store.take("k", rate=1, burst=2, now=0) == 0
+    assert store.take("k", rate=1, burst=2, now=0) == 0
+    assert store.take("k", rate=1, burst=2, now=0) == pytest.approx(1.0)
+    # Half a second later, half a token has accrued
+    assert store.take("k", rate=1, burst=2, now=0.5) == pytest.approx(0.5)
+    assert store.take("k", rate=1, burst=2, now=1.0) == 0
+
+def test_login_rejected_before_handler():
+    client, limiter, calls = make_app([
+        RateLimitPolicy("login", "POST", r"^/api/auth/login$", rate=0.01, burst=3)
+    ])
+    statuses = [client.post("/api/auth/login").status_code for _ in range(5)]
+    assert statuses == [200, 200, 200, 429, 429]
+    # The handler (and so the DB/bcrypt work) never ran for rejected requests
+    assert calls == ["login"] * 3
+
+    response = client.post("/api/auth/login")
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.json()["policy"] == "login"
+    assert limiter.stats() == {"login": {"allowed": 3, "rejected": 3}}
+
+def test_public_token_buckets_are_independent():
+    client, limiter, calls = make_app([
+        RateLimitPolicy("public_token", "*", r"^/api/docs/public/(?P<token>[^/]+)", rate=0.01, burst=2, per_token=True)
+    ])
+    assert [client.get("/api/docs/public/a").status_code for _ in range(3)] == [200, 200, 429]
+    # Another token from the same client has its own bucket
+    assert client.get("/api/docs/public/b").status_code == 200
+    # Unmatched routes are never limited
+    assert client.get("/docs").status_code == 200
+
+def test_rejected_request_consumes_no_other_budget():
+    ip = RateLimitPolicy("public_ip", "*", r"^/api/docs/public/(?P<token>[^/]+)", rate=0.01, burst=3)
+    token = RateLimitPolicy("public_token", "*", r"^/api/docs/public/(?P<token>[^/]+)", rate=0.01, burst=1, per_token=True)
+    client, limiter, calls = make_app([ip, token])
+    assert [client.get("/api/docs/public/a").status_code for _ in range(4)] == [200, 429, 429, 429]
+    # The throttled token didn't drain the IP bucket
+    assert [client.get(f"/api/docs/public/{t}").status_code for t in "bc"] == [200, 200]
+    assert client.get("/api/docs/public/d").status_code == 429
+    assert limiter.stats() == {
+        "public_ip": {"allowed": 3, "rejected": 1},
+        "public_token": {"allowed": 3, "rejected": 3},
+    }
+
+def test_prune_keeps_partly_drained_buckets():
+    store = InMemoryBucketStore()
+    store.take("slow", rate=0.01, burst=5, now=0)
+    store.take("fast", rate=10, burst=5, now=0)
+    # Pruning runs on an interval, not per request, and each bucket refills at its own rate
+    store.take("other", rate=10, burst=5, now=store.PRUNE_INTERVAL)
+    assert set(store._buckets) == {"slow", "other"}
+
+def test_login_account_limited_across_ips():
+    limiter = RateLimiter([
+        RateLimitPolicy("login", "POST", r"^/api/auth/login$", rate=0.01, burst=10),
+        RateLimitPolicy("login_account", "POST", r"^/api/auth/login$", rate=0.01, burst=2, per_account=True),
+    ])
+    assert limiter.wants_account("POST", "/api/auth/login")
+    assert not limiter.wants_account("GET", "/api/docs/public/a")
+    results = [limiter.check("POST", "/api/auth/login", f"10.0.0.{i}", "victim@example.com") for i in range(3)]
+    assert results[:2] == [None, None]
+    assert results[2][0].name == "login_account"
+    # Another account from the same IP is unaffected
+    assert limiter.check("POST", "/api/auth/login", "10.0.0.2", "other@example.com") is None
+
+def test_middleware_keys_login_by_submitted_username():
+    client, limiter, calls = make_app([
+        RateLimitPolicy("login_account", "POST", r"^/api/auth/login$", rate=0.01, burst=2, per_account=True)
+    ])
+    res = client.post("/api/auth/login", data={"username": "Victim@Example.com", "password": "x"})
+    # The body read for the key still reaches the handler
+    assert res.json() == {"ok": True, "username": "Victim@Example.com"}
+    assert client.post("/api/auth/login", data={"username": "victim@example.com ", "password": "y"}).status_code == 200
+    res = client.post("/api/auth/login", data={"username": "victim@example.com", "password": "z"})
+    assert res.status_code == 429
+    assert res.json()["policy"] == "login_account"
+    assert client.post("/api/auth/login", data={"username": "other@example.com", "password": "x"}).status_code == 200
+    # No username: left to validation, not counted against an account
+    assert client.post("/api/auth/login", data={"password": "x"}).status_code == 200
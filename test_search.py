@@ -0,0 +1,141 @@
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+from backend.utils.search import ensure_search_index, fts_query, reindex
+
+@pytest.fixture(scope="module")
+def test_db(test_db, engine):
+    with engine.begin() as conn:
+        ensure_search_index(conn)
+
+def pdf_with_text(*pages):
+    import fitz
+
+    pdf = fitz.open()
+    for body in pages:
+        pdf.new_page().insert_text((72, 72), body)
+    data = pdf.tobytes()
+    pdf.close()
+    return data
+
+def login(client, email):
+    client.post("/api/auth/register", json={"email": email, "password": "password"})
+    token = client.post("/api/auth/login", data={"username": email, "password": "password"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture(scope="module")
+def library(client):
+    headers = login(client, "search_test@example.com")
+    uploads = [
+        ("Lease agreement", pdf_with_text("Tenant pays rent monthly.", "Deposit is refundable.")),
+        ("Invoice 42", pdf_with_text("Consulting services, see the lease appendix.")),
+        ("Café <menu>", pdf_with_text("Nothing relevant here.")),
+    ]
+    paths = []
+    for title, content in uploads:
+        res = client.post(
+            f"/api/docs/upload?title={title}",
+            files={"file": ("doc.pdf", content, "application/pdf")},
+            headers=headers
+        )
+        assert res.status_code == 200
+        paths.append(res.json()["file_path"])
+    yield headers
+    for path in paths:
+        os.remove(path)
+
+def test_query_sanitizing():
+    assert fts_query('lease" OR (xy') == '"lease" "OR" "xy"*'
+    assert fts_query("  -- ") == ""
+    assert fts_query("lease a") == '"lease" "a"'
+
+def test_title_matches_rank_first(client, library):
+    res = client.get("/api/docs/search?q=lease", headers=library)
+    assert res.status_code == 200
+    items = res.json()["items"]
+    assert [hit["title"] for hit in items] == ["Lease agreement", "Invoice 42"]
+    assert items[0]["title_highlight"] == "<mark>Lease</mark> agreement"
+    assert "<mark>lease</mark>" in items[1]["snippet"]
+
+def test_body_text_prefix_and_diacritics(client, library):
+    items = client.get("/api/docs/search?q=refund", headers=library).json()["items"]
+    assert [hit["title"] for hit in items] == ["Lease agreement"]
+    assert "<mark>refundable</mark>" in items[0]["snippet"]
+
+    # Titles are escaped; accents fold
+    (hit,) = client.get("/api/docs/search?q=cafe", headers=library).json()["items"]
+    assert hit["title_highlight"] == "<mark>Café</mark> &lt;menu&gt;"
+
+def test_pagination(client, library):
+    page = client.get("/api/docs/search?q=lease&limit=1", headers=library).json()
+    assert len(page["items"]) == 1 and page["next_offset"] == 1
+    page = client.get("/api/docs/search?q=lease&limit=1&offset=1", headers=library).json()
+    assert page["items"][0]["title"] == "Invoice 42" and page["next_offset"] is None
+
+def test_other_users_documents_are_invisible(client, library):
+    headers = login(client, "search_other@example.com")
+    assert client.get("/api/docs/search?q=lease", headers=headers).json()["items"] == []
+    assert client.get("/api/docs/search?q=", headers=headers).status_code == 422
+
+def test_reindex_backfills_missing_entries(client, library, session_factory):
+    db = session_factory()
+    try:
+        owner = db.query(models.User).filter(models.User.email == "search_test@example.com").one()
+        db.add(models.Document(title="Imported lease", file_path="/nonexistent.pdf", user_id=owner.id))
+        db.commit()
+        assert reindex(db) == 1
+        assert reindex(db) == 0
+    finally:
+        db.close()
+    titles = [hit["title"] for hit in client.get("/api/docs/search?q=imported", headers=library).json()["items"]]
+    assert titles == ["Imported lease"]
+
+def test_template_and_bulk_documents_are_indexed(client, test_db):
+    headers = login(client, "search_bulk@example.com")
+    res = client.post(
+        "/api/docs/upload?title=Escrow",
+        files={"file": ("doc.pdf", pdf_with_text("Escrow holdback terms."), "application/pdf")},
+        headers=headers
+    )
+    doc = res.json()
+    client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+        "page_number": 1, "x_position": 100, "y_position": 100, "width": 120, "height": 40
+    })
+    template = client.post(f"/api/templates/from-document/{doc['id']}", headers=headers).json()
+    assert client.post(f"/api/templates/{template['id']}/instantiate?title=Escrow%20copy", headers=headers).status_code == 200
+    recipients = [{"email": f"escrow{i}@example.com", "name": f"Party {i}"} for i in range(3)]
+    res = client.post("/api/bulk-sends/", headers=headers, json={"template_id": template["id"], "recipients": recipients})
+    assert res.status_code == 202
+
+    titles = [hit["title"] for hit in client.get("/api/docs/search?q=holdback", headers=headers).json()["items"]]
+    assert sorted(titles) == sorted(["Escrow", "Escrow copy"] + [f"Escrow - Party {i}" for i in range(3)])
+    os.remove(doc["file_path"])
+
+def test_upload_text_comes_from_the_validation_pass(client, monkeypatch):
+    import fitz
+    import subprocess
+
+    headers = login(client, "search_pass@example.com")
+    # PyMuPDF isn't opened in-process; the sandboxed worker validates, scans and extracts at once
+    runs = []
+    run = subprocess.run
+    content = pdf_with_text("Quarterly retainer. Signature:")
+    monkeypatch.setattr(subprocess, "run", lambda command, **kw: runs.append(command) or run(command, **kw))
+    monkeypatch.setattr(fitz, "open", lambda *a, **kw: pytest.fail("PDF opened in the API process"))
+    res = client.post(
+        "/api/docs/upload?title=Retainer&detect_fields=true",
+        files={"file": ("retainer.pdf", content, "application/pdf")},
+        headers=headers
+    )
+    monkeypatch.undo()
+    assert res.status_code == 200 and len(res.json()["signature_fields"]) == 1
+    assert len(runs) == 1 and "--anchors" in runs[0] and "--text" in runs[0]
+
+    (hit,) = client.get("/api/docs/search?q=retainer", headers=headers).json()["items"]
+    assert hit["id"] == res.json()["id"] and "<mark>" in hit["snippet"]
+    os.remove(res.json()["file_path"])
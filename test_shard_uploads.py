@@ -0,0 +1,87 @@
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend.database import Base
+from backend import models
+from backend.utils.storage import LocalStorage, shard_name
+from backend.utils.shard_uploads import shard_existing
+
+@pytest.fixture
+def db(engine, session_factory):
+    Base.metadata.create_all(bind=engine)
+    session = session_factory()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def write(path, content=b"%PDF-1.4 test content"):
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+def test_shard_name_fans_out():
+    assert shard_name("a.pdf", depth=0) == "a.pdf"
+    sharded = shard_name("a.pdf", depth=2)
+    first, second, name = sharded.split("/")
+    assert len(first) == len(second) == 2 and name == "a.pdf"
+    assert shard_name("a.pdf", depth=2) == sharded
+
+def test_new_files_are_written_sharded(tmp_path):
+    import io
+
+    storage = LocalStorage(root=str(tmp_path))
+    ref = storage.put("new.pdf", io.BytesIO(b"%PDF"))
+    assert ref == os.path.join(str(tmp_path), *shard_name("new.pdf").split("/"))
+    assert storage.url(ref) == "/uploads/" + shard_name("new.pdf")
+
+def test_flat_files_move_and_rows_follow(db, tmp_path):
+    root = str(tmp_path)
+    shared = write(os.path.join(root, "shared.pdf"))
+    signed = write(os.path.join(root, "signed_1_shared.pdf"))
+    # A cold-tiered original is just its pointer
+    write(os.path.join(root, "frozen.pdf.cold"), b'{"blob": "cold/abc.zst"}')
+
+    db.add_all([
+        models.Document(title="A", file_path=shared, signed_file_path=signed),
+        models.Document(title="B", file_path=shared),
+        models.Document(title="C", file_path=os.path.join(root, "frozen.pdf")),
+        models.Document(title="D", file_path=os.path.join(root, "missing.pdf")),
+        models.Template(title="T", file_path=shared),
+    ])
+    db.commit()
+
+    report = shard_existing(db, batch_size=2, dry_run=True, root=root)
+    assert (report["refs"], report["missing"]) == (3, 1)
+    assert os.path.exists(shared)
+
+    report = shard_existing(db, batch_size=2, root=root)
+    assert (report["refs"], report["files"], report["missing"]) == (3, 3, 1)
+    db.expire_all()
+
+    a, b, c, d = db.query(models.Document).order_by(models.Document.id).all()
+    new_shared = os.path.join(root, *shard_name("shared.pdf").split("/"))
+    assert a.file_path == b.file_path == db.query(models.Template).one().file_path == new_shared
+    assert a.signed_file_path == os.path.join(root, *shard_name("signed_1_shared.pdf").split("/"))
+    assert (a.version, b.version, d.version) == (3, 2, 1)
+    assert os.path.exists(new_shared) and not os.path.exists(shared)
+    assert os.path.exists(c.file_path + ".cold")
+    assert d.file_path == os.path.join(root, "missing.pdf")
+
+    # Idempotent
+    assert shard_existing(db, root=root)["refs"] == 0
+
+def test_keep_old_leaves_flat_names(db, tmp_path):
+    root = str(tmp_path)
+    flat = write(os.path.join(root, "keep.pdf"))
+    db.add(models.Document(title="K", file_path=flat))
+    db.commit()
+
+    shard_existing(db, keep_old=True, root=root)
+    db.expire_all()
+    moved = db.query(models.Document).one().file_path
+    assert moved != flat
+    assert os.path.exists(flat) and os.path.exists(moved)
@@ -0,0 +1,123 @@
+import pytest
+from fastapi import HTTPException
+import base64
+import struct
+import zlib
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend.utils import signatures
+from backend.utils.signatures import normalize_raster_signature
+
+def canvas_png(width=3840, height=1280, ink=True) -> str:
+    """A transparent canvas export with a dark blue scribble in the middle."""
+    import fitz
+
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, width, height), True)
+    pixmap.clear_with()
+    if ink:
+        for x in range(1000, 2800, 4):
+            y = 600 + (x % 240) - 120
+            pixmap.set_rect(fitz.IRect(x, y, x + 12, y + 12), (20, 20, 80, 255))
+    return "data:image/png;base64," + base64.b64encode(pixmap.tobytes("png")).decode()
+
+def test_canvas_is_cropped_and_downscaled_to_palette_png():
+    import fitz
+
+    source = canvas_png()
+    stored = normalize_raster_signature(source, 240, 80)
+    png = base64.b64decode(stored.split(",", 1)[1])
+    assert png[25] == 3  # IHDR colour type: palette
+    assert len(stored) < len(source) / 5
+
+    pixmap = fitz.Pixmap(png)
+    # 240x80 field px is 2.55x0.85 in at 200 DPI; the ink (1808x248 px) fits within that
+    assert pixmap.width <= 240 * 612 / 800 / 72 * 200 + 1
+    assert pixmap.height <= 80 * 612 / 800 / 72 * 200 + 1
+    assert abs(pixmap.width / pixmap.height - 1808 / 248) < 0.2
+    # Ink colour survives quantization
+    assert fitz.Pixmap(fitz.csRGB, pixmap).pixel(pixmap.width // 2, 0)[:3] != (255, 255, 255)
+
+def test_small_signature_is_not_upscaled():
+    import fitz
+
+    stored = normalize_raster_signature(canvas_png(3000, 800), 2000, 2000)
+    pixmap = fitz.Pixmap(base64.b64decode(stored.split(",", 1)[1]))
+    assert (pixmap.width, pixmap.height) == (1808, 248)
+
+def test_rejected_payloads(monkeypatch):
+    cases = [
+        (canvas_png(400, 200, ink=False), 400),
+        ("data:image/png;base64,not-base64!", 400),
+        ("data:image/png;base64," + base64.b64encode(b"not a png").decode(), 400),
+        ("data:image/gif;base64,R0lGOD", 400),
+    ]
+    for payload, status in cases:
+        with pytest.raises(HTTPException) as exc:
+            normalize_raster_signature(payload, 240, 80)
+        assert exc.value.status_code == status, payload[:40]
+
+    monkeypatch.setattr(signatures, "SIGNATURE_MAX_BYTES", 1024)
+    with pytest.raises(HTTPException) as exc:
+        normalize_raster_signature(canvas_png(), 240, 80)
+    assert exc.value.status_code == 413
+
+def test_pixel_limit_is_checked_before_decoding(monkeypatch):
+    import fitz
+
+    # A few hundred bytes declaring a 100000 x 100000 canvas
+    bomb = b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        signatures._png_chunk(b"IHDR", struct.pack(">IIBBBBB", 100000, 100000, 8, 6, 0, 0, 0)),
+        signatures._png_chunk(b"IDAT", zlib.compress(b"\x00" * 100000)),
+        signatures._png_chunk(b"IEND", b""),
+    ])
+    monkeypatch.setattr(fitz, "Pixmap", lambda *args: pytest.fail("decoded before the size check"))
+    with pytest.raises(HTTPException) as exc:
+        normalize_raster_signature("data:image/png;base64," + base64.b64encode(bomb).decode(), 240, 80)
+    assert exc.value.status_code == 413
+
+def test_image_size_reads_headers():
+    import fitz
+
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 321, 123), False)
+    pixmap.clear_with(255)
+    assert signatures.image_size(pixmap.tobytes("png")) == (321, 123)
+    assert signatures.image_size(pixmap.tobytes("jpg")) == (321, 123)
+    with pytest.raises(ValueError):
+        signatures.image_size(b"\xff\xd8\xff\xda\x00\x02")
+
+def test_sign_endpoint_reports_payload_errors(client):
+    import fitz
+
+    email, password = "image_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    pdf = fitz.open()
+    pdf.new_page(width=612, height=792)
+    doc = client.post(
+        "/api/docs/upload?title=Images",
+        files={"file": ("contract.pdf", pdf.tobytes(), "application/pdf")},
+        headers=headers
+    ).json()
+    field = client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+        "page_number": 1, "x_position": 400, "y_position": 500, "width": 240, "height": 80
+    }).json()
+    try:
+        url = f"/api/docs/{doc['id']}/fields/{field['id']}/sign"
+        res = client.post(url, headers=headers, json={"signature_data": canvas_png(400, 200, ink=False)})
+        assert res.status_code == 400, res.text
+        assert res.json()["detail"] == "Signature is blank"
+
+        res = client.post(url, headers=headers, json={"signature_data": canvas_png()})
+        assert res.status_code == 200, res.text
+        assert res.json()["status"] == "signed"
+    finally:
+        for path in (doc["file_path"], client.get(f"/api/docs/{doc['id']}", headers=headers).json()["signed_file_path"]):
+            if path and os.path.exists(path):
+                os.remove(path)
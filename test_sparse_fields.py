@@ -0,0 +1,72 @@
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+@pytest.fixture(scope="module")
+def document(client, dummy_pdf):
+    email, password = "sparse_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.post(
+        "/api/docs/upload?title=Sparse",
+        files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    assert res.status_code == 200, res.text
+    doc = res.json()
+    for i in range(20):
+        client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+            "page_number": 1, "x_position": 10 * i, "y_position": 10, "width": 100, "height": 40
+        })
+    yield doc, headers
+    os.remove(doc["file_path"])
+
+def test_full_response_by_default(client, document):
+    doc, headers = document
+    body = client.get(f"/api/docs/{doc['id']}", headers=headers).json()
+    assert len(body["signature_fields"]) == 20
+    assert body["audit_logs"]
+
+def test_sparse_fieldset(client, document):
+    doc, headers = document
+    res = client.get(f"/api/docs/{doc['id']}?fields=status", headers=headers)
+    assert res.status_code == 200
+    assert res.json() == {"id": doc["id"], "status": "draft"}
+
+def test_include_relationship(client, document):
+    doc, headers = document
+    body = client.get(f"/api/docs/{doc['id']}?fields=id,status&include=audit_logs", headers=headers).json()
+    assert set(body) == {"id", "status", "audit_logs"}
+    assert body["audit_logs"][0]["action"] == "upload"
+
+def test_sparse_list(client, document):
+    doc, headers = document
+    body = client.get("/api/docs/?fields=title", headers=headers).json()
+    assert body == [{"id": doc["id"], "title": "Sparse"}]
+
+def test_unknown_field_rejected(client, document):
+    doc, headers = document
+    res = client.get(f"/api/docs/{doc['id']}?fields=status,secret", headers=headers)
+    assert res.status_code == 400
+    res = client.get(f"/api/docs/{doc['id']}?include=owner", headers=headers)
+    assert res.status_code == 400
+
+def test_large_responses_are_compressed(client, document):
+    doc, headers = document
+    res = client.get(f"/api/docs/{doc['id']}", headers={**headers, "Accept-Encoding": "gzip"})
+    assert res.headers.get("content-encoding") == "gzip"
+    res = client.get(f"/api/docs/{doc['id']}?fields=status", headers={**headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in res.headers
+
+def test_unknown_field_rejected_before_writes(client, document):
+    doc, headers = document
+    res = client.put(f"/api/docs/{doc['id']}/send?fields=bogus", headers=headers)
+    assert res.status_code == 400
+    body = client.get(f"/api/docs/{doc['id']}?fields=status,version&include=audit_logs", headers=headers).json()
+    assert body["status"] == "draft" and body["version"] == doc["version"] + 20
+    assert [log["action"] for log in body["audit_logs"]].count("send") == 0
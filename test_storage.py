@@ -0,0 +1,132 @@
+import pytest
+import base64
+import io
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+from backend.utils import storage
+from backend.utils.pdf_processor import merge_signatures
+
+class FakeS3Client:
+    """In-memory stand-in for the handful of boto3 S3 client calls the driver makes."""
+    class exceptions:
+        class ClientError(Exception):
+            pass
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+        chunks = iter(lambda: fileobj.read(64 * 1024), b"")
+        self.objects[(bucket, key)] = b"".join(chunks)
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.exceptions.ClientError("404")
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def download_file(self, bucket, key, path, Config=None):
+        with open(path, "wb") as f:
+            f.write(self.objects[(bucket, key)])
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://s3.test/{Params['Bucket']}/{Params['Key']}?expires={ExpiresIn}"
+
+def login(client, email):
+    client.post("/api/auth/register", json={"email": email, "password": "password"})
+    token = client.post("/api/auth/login", data={"username": email, "password": "password"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture(scope="module")
+def headers(client):
+    return login(client, "storage_test@example.com")
+
+@pytest.fixture
+def s3():
+    fake = FakeS3Client()
+    storage.set_storage(storage.S3Storage(bucket="docs", prefix="uploads/", client=fake))
+    yield fake
+    storage.set_storage(None)
+
+def pdf_bytes() -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    doc.new_page(width=600, height=800)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def signature_png() -> str:
+    import fitz
+
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 40, 20), False)
+    pixmap.clear_with(0)
+    return "data:image/png;base64," + base64.b64encode(pixmap.tobytes("png")).decode()
+
+def test_local_download_redirects_to_uploads_mount(client, headers, dummy_pdf):
+    res = client.post(
+        "/api/docs/upload?title=Local",
+        files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    doc = res.json()
+    res = client.get(f"/api/docs/{doc['id']}/download", headers=headers, follow_redirects=False)
+    assert res.status_code == 307
+    assert res.headers["location"] == "/uploads/" + os.path.relpath(doc["file_path"], storage.storage_for(doc["file_path"]).root)
+    assert client.get(f"/api/docs/{doc['id']}/download?signed=true", headers=headers).status_code == 404
+    os.remove(doc["file_path"])
+
+def test_assigned_signer_can_download(client, headers, dummy_pdf):
+    doc = client.post(
+        "/api/docs/upload?title=Shared",
+        files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    ).json()
+    client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+        "page_number": 1, "x_position": 100, "y_position": 100, "width": 120, "height": 40,
+        "signer_email": "Storage_Signer@example.com"
+    })
+    url = f"/api/docs/{doc['id']}/download"
+    signer, stranger = login(client, "storage_signer@example.com"), login(client, "storage_stranger@example.com")
+    # The signing page loads the PDF through this endpoint
+    assert client.get(url, headers=signer, follow_redirects=False).status_code == 307
+    assert client.get(url, headers=stranger, follow_redirects=False).status_code == 403
+    os.remove(doc["file_path"])
+
+def test_s3_upload_flatten_and_presigned_download(client, headers, s3, session_factory):
+    res = client.post(
+        "/api/docs/upload?title=Remote",
+        files={"file": ("contract.pdf", pdf_bytes(), "application/pdf")},
+        headers=headers
+    )
+    assert res.status_code == 200, res.text
+    doc = res.json()
+    assert doc["file_path"].startswith("s3://docs/uploads/")
+    assert len(s3.objects) == 1
+
+    db = session_factory()
+    db.add(models.SignatureField(
+        document_id=doc["id"], page_number=1, x_position=400, y_position=300, width=120, height=40,
+        status="signed", signature_data=signature_png()
+    ))
+    db.commit()
+    signed_ref = merge_signatures(doc["id"], db)
+    db.close()
+    assert signed_ref.startswith("s3://docs/uploads/")
+    assert os.path.basename(signed_ref).startswith("signed_")
+    assert s3.objects[("docs", signed_ref[len("s3://docs/"):])].startswith(b"%PDF")
+
+    res = client.get(f"/api/docs/{doc['id']}/download?signed=true", headers=headers, follow_redirects=False)
+    assert res.status_code == 307
+    assert res.headers["location"].startswith("https://s3.test/docs/" + signed_ref[len("s3://docs/"):])
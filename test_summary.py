@@ -0,0 +1,43 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+def test_summary(client, dummy_pdf):
+    email, password = "summary_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    ids = []
+    for title in ("Draft", "Pending", "Declined"):
+        res = client.post(
+            f"/api/docs/upload?title={title}",
+            files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+            headers=headers
+        )
+        ids.append(res.json()["id"])
+        os.remove(res.json()["file_path"])
+    draft_id, pending_id, declined_id = ids
+
+    field_ids = []
+    for i in range(3):
+        res = client.post(f"/api/docs/{pending_id}/fields", headers=headers, json={
+            "page_number": 1, "x_position": 100, "y_position": 100 * (i + 1), "width": 100, "height": 40
+        })
+        field_ids.append(res.json()["id"])
+    signing_token = client.put(f"/api/docs/{pending_id}/send", headers=headers).json()["signing_token"]
+    res = client.post(
+        f"/api/docs/public/{signing_token}/fields/{field_ids[0]}/sign",
+        json={"signature_data": "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="}
+    )
+    assert res.status_code == 200, res.text
+    client.post(f"/api/docs/{declined_id}/decline", headers=headers)
+
+    res = client.get("/api/docs/summary", headers=headers)
+    assert res.status_code == 200, res.text
+    assert res.json() == {
+        "counts": {"draft": 1, "pending": 1, "completed": 0, "declined": 1, "total": 3},
+        "progress": [{"document_id": pending_id, "signed": 1, "total": 3}],
+    }
@@ -0,0 +1,54 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+def test_template_roundtrip(client, dummy_pdf):
+    email, password = "template_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.post(
+        "/api/docs/upload?title=Contract",
+        files={"file": ("dummy.pdf", dummy_pdf, "application/pdf")},
+        headers=headers
+    )
+    source = res.json()
+    try:
+        for i in range(5):
+            client.post(f"/api/docs/{source['id']}/fields", headers=headers, json={
+                "page_number": 1, "x_position": 100, "y_position": 50 * (i + 1),
+                "width": 120, "height": 40, "signer_email": f"signer{i}@example.com"
+            })
+
+        res = client.post(f"/api/templates/from-document/{source['id']}?title=Sales%20Contract", headers=headers)
+        assert res.status_code == 200, res.text
+        template = res.json()
+        assert template["title"] == "Sales Contract"
+        assert len(template["fields"]) == 5
+
+        res = client.post(f"/api/templates/{template['id']}/instantiate?title=Acme%20Contract", headers=headers)
+        assert res.status_code == 200, res.text
+        doc = res.json()
+        assert doc["title"] == "Acme Contract"
+        assert doc["status"] == "draft"
+        # Original is shared, not re-uploaded
+        assert doc["file_path"] == source["file_path"]
+        assert sorted(f["signer_email"] for f in doc["signature_fields"]) == [f"signer{i}@example.com" for i in range(5)]
+        assert all(f["status"] == "pending" for f in doc["signature_fields"])
+        assert doc["audit_logs"][0]["action"] == "upload"
+
+        assert len(client.get("/api/templates/", headers=headers).json()) == 1
+    finally:
+        os.remove(source["file_path"])
+
+def test_template_requires_owner(client):
+    email, password = "template_other@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.post("/api/templates/1/instantiate", headers=headers).status_code == 403
+    assert client.get("/api/templates/999", headers=headers).status_code == 404
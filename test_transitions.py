@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import event
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+from backend.utils.transitions import reset_signatures, complete_if_signed
+
+@pytest.fixture
+def db(test_db, session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+def make_document(db, fields: int, status: str = "signed") -> int:
+    document = models.Document(title="Many fields", file_path="uploads/many.pdf", status=models.DocumentStatus.PENDING)
+    db.add(document)
+    db.flush()
+    db.add_all(
+        models.SignatureField(
+            document_id=document.id, page_number=1, x_position=10, y_position=10 * i, width=100, height=40,
+            status=status, signature_data="data:image/png;base64,AAAA" if status == "signed" else None
+        )
+        for i in range(fields)
+    )
+    db.commit()
+    return document.id
+
+def count_statements(db, fn) -> int:
+    engine = db.get_bind()
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements)
+
+def test_recall_reset_is_one_statement_at_any_size(db):
+    small, large = make_document(db, 3), make_document(db, 300)
+    costs = []
+    for document_id, expected in ((small, 3), (large, 300)):
+        cleared = []
+        costs.append(count_statements(db, lambda: cleared.append(reset_signatures(db, document_id))))
+        db.commit()
+        assert cleared == [expected]
+    assert costs == [1, 1]
+    assert db.query(models.SignatureField).filter(
+        models.SignatureField.document_id == large, models.SignatureField.status == "signed"
+    ).count() == 0
+    # Nothing left to clear
+    assert reset_signatures(db, large) == 0
+
+def test_completion_happens_once_when_last_field_is_signed(db):
+    document_id = make_document(db, 200, status="pending")
+    assert complete_if_signed(db, document_id) is False
+
+    db.query(models.SignatureField).filter(models.SignatureField.document_id == document_id).update({"status": "signed"})
+    assert count_statements(db, lambda: complete_if_signed(db, document_id)) == 1
+    db.rollback()
+
+    db.query(models.SignatureField).filter(models.SignatureField.document_id == document_id).update({"status": "signed"})
+    assert complete_if_signed(db, document_id) is True
+    assert complete_if_signed(db, document_id) is False
+    db.commit()
+    document = db.get(models.Document, document_id)
+    assert document.status == models.DocumentStatus.COMPLETED
+    assert document.version == 2
+    assert document.completed_at is not None
@@ -0,0 +1,116 @@
+import pytest
+import math
+from urllib.parse import quote
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from backend import models
+from backend.utils.signatures import strokes_to_svg, parse_svg_signature
+from backend.utils.pdf_processor import merge_signatures
+
+# A wavy signature line plus a dot, in 600x200 canvas pixels
+STROKES = [
+    [(40 + x, round(100 + 40 * math.sin(x / 20), 2)) for x in range(0, 500, 4)],
+    [(560, 60)],
+]
+
+@pytest.fixture(scope="module")
+def pending(client):
+    import fitz
+
+    email, password = "vector_test@example.com", "password"
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    pdf = fitz.open()
+    pdf.new_page(width=612, height=792)
+    res = client.post(
+        "/api/docs/upload?title=Vector",
+        files={"file": ("contract.pdf", pdf.tobytes(), "application/pdf")},
+        headers=headers
+    )
+    doc = res.json()
+    field = client.post(f"/api/docs/{doc['id']}/fields", headers=headers, json={
+        "page_number": 1, "x_position": 400, "y_position": 500, "width": 240, "height": 80
+    }).json()
+    signing_token = client.put(f"/api/docs/{doc['id']}/send", headers=headers).json()["signing_token"]
+    yield doc, field, signing_token
+    os.remove(doc["file_path"])
+
+def test_svg_round_trip():
+    svg = strokes_to_svg(600, 200, STROKES, stroke_width=3, color="#1a2b3c")
+    parsed = parse_svg_signature(svg)
+    assert (parsed["width"], parsed["height"], parsed["stroke_width"], parsed["color"]) == (600, 200, 3, "#1a2b3c")
+    assert len(parsed["strokes"]) == 2
+    for original, decoded in zip(STROKES, parsed["strokes"]):
+        assert len(original) == len(decoded)
+        assert all(abs(a - b) < 0.1 for p, q in zip(original, decoded) for a, b in zip(p, q))
+
+def test_rejects_arbitrary_svg(client, pending):
+    doc, field, signing_token = pending
+    hostile = "data:image/svg+xml,<svg><script>alert(1)</script></svg>"
+    res = client.post(f"/api/docs/public/{signing_token}/fields/{field['id']}/sign", json={"signature_data": hostile})
+    assert res.status_code == 400
+    res = client.post(f"/api/docs/public/{signing_token}/fields/{field['id']}/sign", json={})
+    assert res.status_code == 422
+    # Well-formed but with an empty viewBox, which can't be scaled into the field
+    empty = strokes_to_svg(600, 200, STROKES).replace('viewBox="0 0 600 200"', 'viewBox="0 0 0 0"')
+    with pytest.raises(ValueError):
+        parse_svg_signature(empty)
+    res = client.post(f"/api/docs/public/{signing_token}/fields/{field['id']}/sign", json={"signature_data": empty})
+    assert res.status_code == 400
+
+def svg_with_path(d: str) -> str:
+    svg = strokes_to_svg(600, 200, [[(10, 10), (15, 15)]])
+    return svg.replace(quote('d="M10 10l5 5"', safe=' ="'), quote(f'd="{d}"', safe=' ="'))
+
+def test_path_must_be_fully_parsed():
+    assert parse_svg_signature(svg_with_path("M10 10l5 5"))["strokes"] == [[(10, 10), (15, 15)]]
+    # Commas and extra whitespace are separators too
+    assert parse_svg_signature(svg_with_path("M 10,10 l 5,5"))["strokes"] == [[(10, 10), (15, 15)]]
+
+@pytest.mark.parametrize("d", [
+    "M 10,10 L 5,5",     # absolute lineto isn't part of the format
+    "M10 10l.5 5",       # no leading "."
+    "M10 10l1e-3 5",     # no exponents
+    "M10 10l5",          # unpaired coordinate
+    "M10 10l5 5 7M20 20",
+    "M10 10l5 5z",
+])
+def test_malformed_path_is_rejected(client, pending, d):
+    doc, field, signing_token = pending
+    with pytest.raises(ValueError):
+        parse_svg_signature(svg_with_path(d))
+    res = client.post(f"/api/docs/public/{signing_token}/fields/{field['id']}/sign", json={"signature_data": svg_with_path(d)})
+    assert res.status_code == 400
+
+def test_strokes_are_stored_and_flattened_as_vectors(client, pending, session_factory):
+    import fitz
+
+    doc, field, signing_token = pending
+    res = client.post(
+        f"/api/docs/public/{signing_token}/fields/{field['id']}/sign",
+        json={"signature_strokes": {"width": 600, "height": 200, "strokes": STROKES}}
+    )
+    assert res.status_code == 200, res.text
+    stored = res.json()["signature_data"]
+    assert stored.startswith("data:image/svg+xml,")
+    assert len(stored) < 2000
+
+    db = session_factory()
+    signed_path = db.query(models.Document).filter(models.Document.id == doc["id"]).first().signed_file_path
+    db.close()
+    assert signed_path
+    page = fitz.open(signed_path)[0]
+    assert page.get_images() == []
+    drawings = page.get_drawings()
+    assert len(drawings) == 2
+    # Drawn inside the field's box (x 400±120, y 500±40 canvas px, scaled 612/800)
+    scale = 612 / 800
+    box = fitz.Rect(280 * scale, 460 * scale, 520 * scale, 540 * scale)
+    assert all(box.contains(d["rect"]) for d in drawings)
+    os.remove(signed_path)